@@ -0,0 +1,85 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from nose.tools import assert_raises
+from ucsmsdk.ucscoremeta import MoPropertyMeta
+from ucsmsdk_samples.utils.simulator import UcsSimulator
+from ucsmsdk_samples.server import bios
+from ucsmsdk_samples.server.bios import bios_create, bios_conf_tokens
+
+
+def test_bios_conf_tokens():
+    with UcsSimulator() as sim:
+        handle = sim.handle()
+        handle.login()
+        bios_create(handle, parent_org_dn="org-root", name="bios1")
+        sim.reset_stats()
+
+        tokens = {"vp_quiet_boot": "enabled",
+                  "vp_intel_turbo_boost_tech": "disabled",
+                  "vp_baud_rate": "115200",
+                  "vp_terminal_type": "vt100"}
+        mo = bios_conf_tokens(handle, name="bios1", parent_org_dn="org-root",
+                              tokens=tokens)
+
+        # Verify all tokens went out in a single configConfMos
+        assert sim.stats["configConfMos"]["calls"] == 1
+        assert sim.get_mo(
+            "org-root/bios-prof-bios1/Quiet-Boot").vp_quiet_boot == "enabled"
+        console = sim.get_mo("org-root/bios-prof-bios1/Console-redirection")
+        assert console.vp_baud_rate == "115200"
+        assert console.vp_terminal_type == "vt100"
+        # Verify tokens of the same class share one child
+        assert len(mo.child) == 3
+
+        # Scenario: same tokens again, nothing to commit
+        sim.reset_stats()
+        mo = bios_conf_tokens(handle, name="bios1", parent_org_dn="org-root",
+                              tokens=tokens)
+        assert len(mo.child) == 0
+        assert "configConfMos" not in sim.stats
+
+
+def test_invalid_bios_conf_tokens():
+    with UcsSimulator() as sim:
+        handle = sim.handle()
+        handle.login()
+        bios_create(handle, parent_org_dn="org-root", name="bios1")
+
+        # Scenario: unknown token
+        assert_raises(ValueError, bios_conf_tokens, handle, "bios1",
+                      "org-root", {"vp_no_such_token": "enabled"})
+        # Scenario: invalid value
+        assert_raises(ValueError, bios_conf_tokens, handle, "bios1",
+                      "org-root", {"vp_quiet_boot": "sometimes"})
+        # Scenario: missing policy
+        assert_raises(ValueError, bios_conf_tokens, handle, "bios2",
+                      "org-root", {"vp_quiet_boot": "enabled"})
+
+
+def test_bios_token_registry():
+    bios._BIOS_CLASSES.pop("BiosVfQuietBoot", None)
+
+    # Scenario: a token resolves its class on first use, then memoizes it
+    mo_class, prop, xml_attribute = bios._bios_token("vp_quiet_boot")
+    assert mo_class.__name__ == "BiosVfQuietBoot"
+    assert (prop, xml_attribute) == ("vp_quiet_boot", "vpQuietBoot")
+    assert bios._BIOS_CLASSES["BiosVfQuietBoot"] is mo_class
+    assert bios._bios_class("BiosVfQuietBoot") is mo_class
+
+    # Scenario: every token in the table is a read-write property
+    for token in bios._BIOS_TOKEN_CLASSES:
+        mo_class = bios._bios_token(token)[0]
+        assert mo_class.prop_meta[token].access == MoPropertyMeta.READ_WRITE
+
+    assert_raises(ValueError, bios._bios_token, "vp_no_such_token")
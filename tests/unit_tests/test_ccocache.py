@@ -0,0 +1,68 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import tempfile
+
+from mock import patch
+from ucsmsdk.utils.ccoimage import UcsCcoImage
+from ucsmsdk_samples.firmware.ccocache import CcoImageCache
+from ucsmsdk_samples.firmware.ucsfirmware import firmware_available, \
+    firmware_download
+
+
+def _cco_image(image_name):
+    image = UcsCcoImage()
+    image.image_name = image_name
+    image.version = "3.1(3a)"
+    image.url = "https://cco/" + image_name
+    image.network_credential = "c2VjcmV0"
+    return image
+
+
+_LISTING = [_cco_image("ucs-k9-bundle-infra.3.1.3a.A.bin"),
+            _cco_image("ucs-k9-bundle-b-series.3.1.3a.B.bin")]
+
+
+@patch("ucsmsdk_samples.firmware.ccocache.get_ucs_cco_image_list",
+       return_value=_LISTING)
+def test_cco_image_cache(mock_list):
+    cache_file = os.path.join(tempfile.mkdtemp(), "cco.json")
+    cache = CcoImageCache(cache_file)
+
+    # Scenario: repeated listings hit CCO once
+    names = firmware_available("user", "passwd", cache=cache)
+    assert names == sorted(image.image_name for image in _LISTING)
+    assert firmware_available("user", "passwd", cache=cache) == names
+    assert mock_list.call_count == 1
+
+    # Verify the cache file holds no credential
+    with open(cache_file) as cache_fh:
+        assert "c2VjcmV0" not in cache_fh.read()
+
+    # Scenario: a new process, e.g. on an air-gapped host, reads the file
+    cache = CcoImageCache(cache_file, ttl=None)
+    with patch("ucsmsdk_samples.firmware.ucsfirmware.get_ucs_cco_image") \
+            as mock_get:
+        firmware_download("ucs-k9-bundle-infra.3.1.3a.A.bin", "user",
+                          "passwd", "/tmp", cache=cache)
+        image = mock_get.call_args[0][0]
+        assert image.url == "https://cco/ucs-k9-bundle-infra.3.1.3a.A.bin"
+        assert image.network_credential == "dXNlcjpwYXNzd2Q="
+    assert mock_list.call_count == 1
+
+    # Scenario: expired listing, other mdf ids
+    cache.ttl = 0
+    cache.index("user", "passwd")
+    cache.index("user", "passwd", mdf_id_list=["283612660"])
+    assert mock_list.call_count == 3
@@ -0,0 +1,134 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import shutil
+import tempfile
+
+from nose.tools import assert_raises
+
+from ucsmsdk_samples.utils.simulator import UcsSimulator, populate_domain
+from ucsmsdk_samples.reports.drift import drift_check, format_drift, \
+    load_desired_state
+
+
+def _desired(sp_dns):
+    objects = [
+        {"class_id": "FabricVlan", "dn": "fabric/lan/net-vlan100",
+         "properties": {"id": 100, "sharing": "none"}},
+        {"class_id": "FabricVlan", "dn": "fabric/lan/net-vlan200",
+         "properties": {"id": "200"}},
+        {"class_id": "fabricVlan", "dn": "fabric/lan/net-test",
+         "present": False},
+        {"class_id": "MacpoolPool", "dn": "org-root/mac-pool-web",
+         "properties": {"assignmentOrder": "sequential"}},
+        {"class_id": "LsServer", "parent_dn": "org-root",
+         "properties": {"assoc_state": "associated"}}]
+    for sp_dn in sp_dns:
+        objects.append({"class_id": "LsServer", "dn": sp_dn,
+                        "properties": {"config_state": "applied"}})
+    return {"objects": objects}
+
+
+def test_drift_check():
+    with UcsSimulator() as sim:
+        populate_domain(sim, chassis_count=5, blades_per_chassis=8)
+        sim.add("FabricVlan", "fabric/lan/net-vlan100", name="vlan100",
+                id="100", sharing="none")
+        sim.add("FabricVlan", "fabric/lan/net-test", name="test", id="999")
+        sim.add("MacpoolPool", "org-root/mac-pool-web", name="web",
+                assignment_order="default")
+        sp_dns = sim.dns("LsServer")
+        sim.update(sp_dns[3], assoc_state="unassociated")
+        handle = sim.handle()
+        handle.login()
+        sim.reset_stats()
+
+        # Scenario: audit 40 SPs, their policies and VLANs
+        diffs = drift_check(handle, _desired(sp_dns))
+
+        # Verify a single request and every difference
+        assert sim.request_count == 1
+        assert sorted((diff["kind"], diff["dn"]) for diff in diffs) == \
+            sorted([("changed", "org-root/mac-pool-web"),
+                    ("changed", sp_dns[3]),
+                    ("missing", "fabric/lan/net-vlan200"),
+                    ("unexpected", "fabric/lan/net-test")])
+        changed = [diff for diff in diffs if diff["dn"] == sp_dns[3]][0]
+        assert (changed["property"], changed["expected"],
+                changed["actual"]) == ("assoc_state", "associated",
+                                       "unassociated")
+        assert len(format_drift(diffs).splitlines()) == 4
+
+        # Scenario: a document naming an unknown property
+        with assert_raises(ValueError):
+            drift_check(handle, {"objects": [
+                {"class_id": "FabricVlan", "dn": "fabric/lan/net-vlan100",
+                 "properties": {"vlan_id": "100"}}]})
+
+        # Scenario: a json boolean instead of the UCSM value
+        with assert_raises(ValueError):
+            drift_check(handle, {"objects": [
+                {"class_id": "FabricVlan", "dn": "fabric/lan/net-vlan100",
+                 "properties": {"default_net": False}}]})
+
+        # Scenario: no VLAN but the declared ones
+        diffs = drift_check(handle, {"objects": [
+            {"class_id": "FabricVlan", "parent_dn": "fabric/lan",
+             "present": False}]})
+
+        # Verify every VLAN is reported as unexpected
+        assert [(diff["kind"], diff["dn"]) for diff in diffs] == [
+            ("unexpected", "fabric/lan/net-test"),
+            ("unexpected", "fabric/lan/net-vlan100")]
+
+
+def test_drift_check_file():
+    desired_dir = tempfile.mkdtemp()
+    try:
+        with UcsSimulator() as sim:
+            sim.add("FabricVlan", "fabric/lan/net-vlan100", name="vlan100",
+                    id="100", sharing="none")
+            sim.add("MacpoolPool", "org-root/mac-pool-web", name="web",
+                    descr=u"r\u00e9seau web")
+            handle = sim.handle()
+            handle.login()
+
+            # Scenario: a document read from a json file, strings included
+            path = os.path.join(desired_dir, "domain.json")
+            with open(path, "w") as desired_fh:
+                json.dump({"objects": [
+                    {"class_id": "FabricVlan",
+                     "dn": "fabric/lan/net-vlan100",
+                     "properties": {"id": "100", "sharing": "primary"}},
+                    {"class_id": "MacpoolPool",
+                     "dn": "org-root/mac-pool-web",
+                     "properties": {"descr": u"r\u00e9seau web"}}]},
+                    desired_fh)
+            diffs = drift_check(handle, load_desired_state(path))
+
+            # Verify the values compare as UCSM strings
+            assert [(diff["dn"], diff["property"], diff["actual"])
+                    for diff in diffs] == [
+                ("fabric/lan/net-vlan100", "sharing", "none")]
+
+            # Scenario: an empty desired state
+            sim.reset_stats()
+            assert drift_check(handle, {"objects": []}) == []
+            assert drift_check(handle, {}) == []
+
+            # Verify nothing is read
+            assert sim.request_count == 0
+    finally:
+        shutil.rmtree(desired_dir)
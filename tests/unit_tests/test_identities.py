@@ -0,0 +1,71 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import csv
+import io
+import json
+
+from nose.tools import assert_raises
+
+from ucsmsdk_samples.utils.simulator import UcsSimulator, populate_domain
+from ucsmsdk_samples.reports.identities import identity_export
+
+
+def _populate(sim):
+    populate_domain(sim, chassis_count=5, blades_per_chassis=8)
+    for index, sp_dn in enumerate(sim.dns("LsServer")):
+        for fabric in ("a", "b"):
+            sim.add("VnicEther", "%s/ether-eth-%s" % (sp_dn, fabric),
+                    name="eth-" + fabric, switch_id=fabric.upper(),
+                    addr="00:25:B5:%s0:00:%02X" % (fabric.upper(), index))
+            sim.add("VnicFc", "%s/fc-fc-%s" % (sp_dn, fabric),
+                    name="fc-" + fabric, switch_id=fabric.upper(),
+                    addr="20:00:00:25:B5:%s0:00:%02X" % (fabric.upper(),
+                                                         index))
+    # vNICs of a policy and an unassigned address are not SP identities
+    sim.add("VnicEther", "org-root/lan-conn-pol-web/ether-eth0",
+            name="eth0", addr="derived")
+    sim.update("org-root/ls-sp-5-8/ether-eth-b", addr="derived")
+
+
+def test_identity_export():
+    with UcsSimulator() as sim:
+        _populate(sim)
+        handle = sim.handle()
+        handle.login()
+        sim.reset_stats()
+
+        # Scenario: export 40 SPs to csv
+        out = io.StringIO()
+        index = identity_export(handle, out)
+
+        # Verify one request, 4 rows per SP and a reverse index
+        assert sim.request_count == 1
+        rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+        assert len(rows) == 160
+        assert rows[0]["sp_dn"] == "org-root/ls-sp-1-1"
+        assert rows[0]["server_dn"] == "sys/chassis-1/blade-1"
+        assert len(index) == 159
+        assert index.sp_dn("00:25:b5:a0:00:00") == "org-root/ls-sp-1-1"
+        assert index.lookup("20:00:00:25:B5:B0:00:27")["vnic"] == "fc-b"
+        assert index.sp_dn("00:25:b5:ff:ff:ff") is None
+
+        # Scenario: export to json lines
+        out = io.StringIO()
+        identity_export(handle, out, output_format="jsonl")
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert len(rows) == 160
+        assert set(row["type"] for row in rows) == set(["mac", "wwpn"])
+
+        with assert_raises(ValueError):
+            identity_export(handle, out, output_format="xml")
@@ -0,0 +1,134 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import shutil
+import tempfile
+
+from ucsmsdk_samples.utils.simulator import UcsSimulator, populate_domain, \
+    populate_bundle
+from ucsmsdk_samples.firmware.orchestrator import FirmwareOrchestrator
+
+VERSION = "3.1(2b)"
+B_BUNDLE = "ucs-k9-bundle-b-series.3.1.2b.B.bin"
+
+
+def _downloaded(sim, dn, status):
+    # mock the FI download of the uploaded B bundle
+    if "deleted" not in status:
+        populate_bundle(sim, VERSION, bundle="B")
+        sim.update(dn, transfer_state="downloaded")
+
+
+def _domain(with_b_bundle, chassis_count=1):
+    sim = UcsSimulator()
+    sim.start()
+    populate_domain(sim, chassis_count=chassis_count, blades_per_chassis=2,
+                    version=VERSION)
+    populate_bundle(sim, VERSION, bundle="A")
+    if with_b_bundle:
+        populate_bundle(sim, VERSION, bundle="B")
+    sim.add_hook("FirmwareDownloader", _downloaded)
+    return sim
+
+
+def test_firmware_orchestrator():
+    image_dir = tempfile.mkdtemp()
+    state_file = os.path.join(image_dir, "state.json")
+    sims = {"pod1": _domain(True), "pod2": _domain(False),
+            "pod3": _domain(False)}
+    try:
+        with open(os.path.join(image_dir, B_BUNDLE), "wb") as image:
+            image.write(b"\0" * 128)
+        # pod3 cannot upload, its image is not found locally
+        sims["pod3"].remove(sims["pod3"].dns("FirmwareDistributable")[0])
+
+        events = []
+        handles = dict((name, sim.handle()) for name, sim in sims.items())
+        states = FirmwareOrchestrator(handles, VERSION, image_dir,
+                                      state_file, max_workers=2,
+                                      progress=events.append).run()
+
+        assert states["pod1"]["status"] == "done"
+        assert states["pod1"]["completed"] == ["upload", "infra", "blade"]
+        assert states["pod2"]["status"] == "done"
+        assert B_BUNDLE in sims["pod2"].uploads
+        assert B_BUNDLE not in sims["pod1"].uploads
+        assert states["pod3"]["status"] == "failed"
+        assert "Download images" in states["pod3"]["error"]
+        assert set(event["domain"] for event in events) == \
+            set(["pod1", "pod2", "pod3"])
+        with open(state_file) as state_fh:
+            assert json.load(state_fh)["domains"]["pod3"]["status"] == \
+                "failed"
+
+        # Scenario: resume, only the failed domain runs again
+        for sim in sims.values():
+            sim.reset_stats()
+        populate_bundle(sims["pod3"], VERSION, bundle="A")
+        states = FirmwareOrchestrator(handles, VERSION, image_dir,
+                                      state_file).run()
+        assert states["pod3"]["status"] == "done"
+        assert sims["pod1"].stats == {}
+        assert sims["pod2"].stats == {}
+    finally:
+        for sim in sims.values():
+            sim.stop()
+        shutil.rmtree(image_dir)
+
+
+def test_firmware_orchestrator_rack_only():
+    image_dir = tempfile.mkdtemp()
+    sim = _domain(True, chassis_count=0)
+    try:
+        # Scenario: a domain without blades
+        assert not sim.dns("ComputeBlade")
+        events = []
+        states = FirmwareOrchestrator(
+            {"rack1": sim.handle()}, VERSION, image_dir,
+            os.path.join(image_dir, "state.json"),
+            progress=events.append).run()
+
+        # Verify the blade stage has nothing to do rather than failing
+        assert states["rack1"]["status"] == "done"
+        assert states["rack1"]["completed"] == ["upload", "infra", "blade"]
+        assert "no blades" in [event["message"] for event in events]
+    finally:
+        sim.stop()
+        shutil.rmtree(image_dir)
+
+
+def test_firmware_orchestrator_progress_lock():
+    image_dir = tempfile.mkdtemp()
+    sim = _domain(True, chassis_count=0)
+    try:
+        # Scenario: a progress callback reading the state under its lock
+        events = []
+        orchestrator = FirmwareOrchestrator(
+            {"rack1": sim.handle()}, VERSION, image_dir,
+            os.path.join(image_dir, "state.json"))
+
+        def progress(event):
+            with orchestrator._lock:
+                events.append((event["status"], dict(
+                    orchestrator.state["domains"]["rack1"])))
+        orchestrator.progress = progress
+        states = orchestrator.run()
+
+        # Verify the callback runs without the state lock held
+        assert states["rack1"]["status"] == "done"
+        assert events
+    finally:
+        sim.stop()
+        shutil.rmtree(image_dir)
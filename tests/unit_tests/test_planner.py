@@ -0,0 +1,62 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from ucsmsdk_samples.utils.simulator import UcsSimulator, populate_domain, \
+    populate_bundle
+from ucsmsdk_samples.firmware.planner import firmware_plan, \
+    format_firmware_plan
+
+
+def test_firmware_plan():
+    with UcsSimulator() as sim:
+        populate_domain(sim, chassis_count=2, blades_per_chassis=2)
+        populate_bundle(sim, "3.1(3a)", bundle="A")
+        # one blade already upgraded, one without service profile
+        sim.update("sys/chassis-1/blade-1/mgmt/fw-system", version="3.1(3a)")
+        sim.update("sys/chassis-2/blade-2", assigned_to_dn="")
+        sim.update("org-root/ls-sp-1-2", oper_host_fw_policy_name=(
+            "org-root/fw-host-pack-web"))
+        handle = sim.handle()
+        handle.login()
+        sim.reset_stats()
+
+        plan = firmware_plan(handle, "3.1(3a)")
+
+        # Verify one read and no change
+        assert sim.request_count == 1
+        assert sim.stats["configResolveClasses"]["calls"] == 1
+
+        assert [(step["action"], step["target"]) for step in
+                plan["steps"]] == [
+            ("upload", "ucs-k9-bundle-b-series.3.1.3a.B.bin"),
+            ("activate-ucsm", "sys"),
+            ("activate-fi", "sys/switch-A"),
+            ("activate-fi", "sys/switch-B"),
+            ("activate-host-pack", "org-root/fw-host-pack-default"),
+            ("activate-host-pack", "org-root/fw-host-pack-web")]
+        assert plan["steps"][1]["current"] == {"system": "3.1(2b)"}
+        assert plan["steps"][1]["expected"] == {"system": "3.1(3a)"}
+        assert plan["steps"][4]["blades"] == ["sys/chassis-2/blade-1",
+                                              "sys/chassis-2/blade-2"]
+        assert plan["reboots"] == 2 + 3
+        assert plan["round_trips"] == 2 + 3 + 1 + 1 + 4 + 4
+        assert "5 reboots" in format_firmware_plan(plan)
+
+        # Scenario: blades already at version
+        sim.update("sys/chassis-1/blade-1/mgmt/fw-system", version="3.1(2b)")
+        plan = firmware_plan(handle, "3.1(2b)", infra=False)
+        assert plan["steps"] == [
+            {"action": "upload",
+             "target": "ucs-k9-bundle-b-series.3.1.2b.B.bin",
+             "current": None, "expected": "3.1(2b)B", "reboots": 0,
+             "round_trips": 2}]
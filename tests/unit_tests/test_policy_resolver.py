@@ -0,0 +1,129 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+
+from nose.tools import assert_raises
+
+from ucsmsdk_samples.utils.simulator import UcsSimulator
+from ucsmsdk_samples.server.policy_resolver import PolicyResolver
+from ucsmsdk_samples.firmware.hostfirmwarepack import hfp_sp_attach
+
+_FRONT = "org-root/org-web/org-front"
+
+
+def _populate(sim):
+    sim.add("OrgOrg", "org-root/org-web", name="web")
+    sim.add("OrgOrg", _FRONT, name="front")
+    sim.add("FirmwareComputeHostPack", "org-root/fw-host-pack-hfp",
+            name="hfp")
+    sim.add("FirmwareComputeHostPack", "org-root/org-web/fw-host-pack-hfp",
+            name="hfp")
+    sim.add("LsServer", "org-root/ls-temp", name="temp",
+            type="updating-template")
+    sim.add("LsServer", _FRONT + "/ls-sp1", name="sp1", type="instance")
+
+
+def _eventually(call, expected, timeout=5):
+    deadline = time.time() + timeout
+    while call() != expected and time.time() < deadline:
+        time.sleep(0.05)
+    return call()
+
+
+def test_policy_resolver():
+    with UcsSimulator() as sim:
+        _populate(sim)
+        handle = sim.handle()
+        handle.login()
+        sim.reset_stats()
+        resolver = PolicyResolver(handle)
+
+        # Scenario: names resolve to the nearest org, from one load
+        for _ in range(100):
+            assert resolver.resolve("FirmwareComputeHostPack", "hfp",
+                                    _FRONT) == \
+                "org-root/org-web/fw-host-pack-hfp"
+            assert resolver.resolve("FirmwareComputeHostPack", "hfp") == \
+                "org-root/fw-host-pack-hfp"
+            assert resolver.resolve("LsServer", "temp", _FRONT) == \
+                "org-root/ls-temp"
+        assert sim.request_count == 1
+        # instances are not templates
+        assert resolver.resolve("LsServer", "sp1", _FRONT) is None
+        with assert_raises(ValueError):
+            resolver.resolve("VnicEther", "eth0")
+
+        # Scenario: a name that does not resolve, looked up again and again
+        resolver = PolicyResolver(handle, reload_interval=0.5)
+        for _ in range(100):
+            assert resolver.resolve("FirmwareComputeHostPack", "new",
+                                    _FRONT) is None
+        # Verify the index is read once, as it is fresh
+        assert resolver.loads == 1
+
+        # Scenario: the policy is created later
+        sim.add("FirmwareComputeHostPack", "org-root/fw-host-pack-new",
+                name="new")
+        time.sleep(0.5)
+        assert resolver.resolve("FirmwareComputeHostPack", "new",
+                                _FRONT) == "org-root/fw-host-pack-new"
+        assert resolver.loads == 2
+
+        # Scenario: attach a policy without walking the org tree
+        sim.reset_stats()
+        hfp_sp_attach(handle, _FRONT + "/ls-sp1", "hfp", resolver=resolver)
+        assert sim.stats["configResolveDns"]["calls"] == 1
+        with assert_raises(ValueError):
+            hfp_sp_attach(handle, _FRONT + "/ls-sp1", "missing",
+                          resolver=resolver)
+
+
+def test_policy_resolver_events():
+    with UcsSimulator() as sim:
+        _populate(sim)
+        handle = sim.handle()
+        handle.login()
+
+        with PolicyResolver(handle) as resolver:
+            def resolve():
+                return resolver.resolve("FirmwareComputeHostPack", "hfp",
+                                        _FRONT)
+            assert _eventually(lambda: resolver.loads, 1) == 1
+
+            # Scenario: a policy created closer to the org
+            sim.add("FirmwareComputeHostPack", _FRONT + "/fw-host-pack-hfp",
+                    name="hfp")
+            assert _eventually(resolve, _FRONT + "/fw-host-pack-hfp") == \
+                _FRONT + "/fw-host-pack-hfp"
+
+            # Scenario: an org deleted with its policies
+            sim.remove("org-root/org-web/org-front")
+            sim.add("OrgOrg", _FRONT, name="front")
+            assert _eventually(resolve, "org-root/org-web/fw-host-pack-hfp") \
+                == "org-root/org-web/fw-host-pack-hfp"
+
+            # Verify every change came from the events, not from a reload
+            assert resolver.loads == 1
+
+            # Scenario: stopped, then started again right after
+            thread = resolver._thread
+            start = time.time()
+            resolver.stop()
+
+            # Verify the thread and its session end at once
+            assert time.time() - start < 2
+            assert not thread.is_alive()
+            assert sim.stats["aaaLogout"]["calls"] == 1
+            resolver.start()
+            assert _eventually(lambda: resolver.loads, 2) == 2
@@ -0,0 +1,84 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from mock import patch
+from nose.tools import assert_raises
+from ucsmsdk_samples.utils import poller as poller_module
+from ucsmsdk_samples.utils.poller import Poller
+
+
+@patch("ucsmsdk_samples.utils.poller.time.sleep")
+def test_poller_backoff(sleep_mock):
+    states = iter(["a", "b", "c", "d", "done"])
+    poller = Poller(initial_interval=1, max_interval=4, backoff=2, jitter=0)
+
+    assert poller.poll(lambda: next(states),
+                       done=lambda state: state == "done") == "done"
+    assert poller.outcome == "done"
+    # Verify sleeps double up to max_interval
+    assert [c[0][0] for c in sleep_mock.call_args_list] == [1, 2, 4, 4]
+    assert poller.metrics["polls"] == 5
+    assert poller.metrics["slept"] == 11
+
+
+@patch("ucsmsdk_samples.utils.poller.time.sleep")
+def test_poller_jitter(sleep_mock):
+    poller = Poller(timeout=None, initial_interval=10, max_interval=10,
+                    jitter=0.1)
+    states = iter([False] * 20 + [True])
+    poller.poll(lambda: next(states), done=lambda state: state)
+    for call in sleep_mock.call_args_list:
+        assert 9 <= call[0][0] <= 11
+
+
+def test_poller_fail_and_timeout():
+    # Scenario: fail predicate ends the wait early
+    poller = Poller(timeout=10, initial_interval=0)
+    assert poller.poll(lambda: "failed", done=lambda state: False,
+                       fail=lambda state: state == "failed") == "failed"
+    assert poller.outcome == "failed"
+    assert poller.metrics["polls"] == 1
+
+    # Scenario: deadline
+    poller = Poller(timeout=0.05, initial_interval=0.01)
+    poller.poll(lambda: None, done=lambda state: False)
+    assert poller.outcome == "timeout"
+    assert poller.metrics["elapsed"] >= 0.05
+
+
+def test_poller_retry_on_and_listeners():
+    metrics = []
+    poller_module.add_listener(metrics.append)
+    try:
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise IOError("connection refused")
+            return True
+
+        poller = Poller(timeout=10, initial_interval=0, name="flaky")
+        assert poller.poll(flaky, done=lambda state: state,
+                           retry_on=(IOError,))
+        assert poller.metrics["errors"] == 2
+
+        # Scenario: exceptions not listed in retry_on end the wait
+        assert_raises(ValueError, Poller(initial_interval=0).poll,
+                      lambda: int("x"), lambda state: True)
+    finally:
+        poller_module.remove_listener(metrics.append)
+
+    assert metrics[0]["name"] == "flaky"
+    assert metrics[0]["outcome"] == "done"
+    assert metrics[0]["polls"] == 3
@@ -0,0 +1,52 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from ucsmsdk_samples.utils.simulator import UcsSimulator, populate_domain
+from ucsmsdk_samples.utils.profiler import UcsProfiler
+from ucsmsdk_samples.server.bios import bios_create, bios_conf_quiet_boot
+from ucsmsdk_samples.server.service_profile import sp_power_on
+
+
+def test_profiler_attributes_calls_to_helpers():
+    with UcsSimulator() as sim:
+        populate_domain(sim, chassis_count=1, blades_per_chassis=8)
+        handle = sim.handle()
+        handle.login()
+        sim.reset_stats()
+
+        with UcsProfiler(handle) as profiler:
+            bios_create(handle, parent_org_dn="org-root", name="bios1")
+            bios_conf_quiet_boot(handle, name="bios1",
+                                 parent_org_dn="org-root",
+                                 vp_quiet_boot="enabled")
+            for slot in range(1, 9):
+                sp_power_on(handle, sp_name="sp-1-%d" % slot)
+
+        report = profiler.report()
+        # Verify each helper got its own accounting
+        assert report["bios_conf_quiet_boot"]["ops"]["query_dn"]["calls"] == 1
+        assert report["bios_conf_quiet_boot"]["ops"]["commit"]["calls"] == 1
+        assert report["sp_power_on"]["ops"]["query_dn"]["calls"] == 8
+        # Verify round-trips match what the simulator served
+        total = sum(record["round_trips"] for record in report.values())
+        assert total == sim.request_count
+        assert report["sp_power_on"]["bytes_sent"] > 0
+
+        # Verify the repeated query_dn shows up as a N+1 suspect
+        suspects = profiler.suspects(threshold=8)
+        assert [s[0] for s in suspects] == ["sp_power_on"] * len(suspects)
+        assert "query_dn" in [s[2] for s in suspects]
+
+        # Verify the handle is restored after stop
+        assert "query_dn" not in handle.__dict__
+        assert profiler.format_report().startswith("helper")
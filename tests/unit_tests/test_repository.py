@@ -0,0 +1,65 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import tempfile
+
+from mock import patch
+from ucsmsdk_samples.firmware.repository import FirmwareRepository, \
+    parse_bundle_name
+from ucsmsdk_samples.firmware.ucsfirmware import get_firmware_file_names
+
+
+def _write(image_dir, image_name, data=b"bundle"):
+    with open(os.path.join(image_dir, image_name), "wb") as image:
+        image.write(data)
+
+
+def test_parse_bundle_name():
+    for version in ["3.1(2b)", "3.2(3a)", "2.2(8f)"]:
+        for bundle, (image_name, _) in get_firmware_file_names(
+                version).items():
+            assert parse_bundle_name(image_name) == (version, bundle)
+    assert parse_bundle_name("readme.txt") is None
+
+
+def test_firmware_repository():
+    image_dir = tempfile.mkdtemp()
+    index_file = os.path.join(tempfile.mkdtemp(), "index.json")
+    for version in ["3.1(2b)", "3.2(3a)", "3.2(3d)"]:
+        for image_name, _ in get_firmware_file_names(version).values():
+            _write(image_dir, image_name)
+    _write(image_dir, "notes.txt")
+
+    repository = FirmwareRepository(image_dir, index_file=index_file)
+    infra = "ucs-k9-bundle-infra.3.2.3a.A.bin"
+    assert repository.bundle("3.2(3a)", "A") == infra
+    assert repository.bundle("3.2(3b)", "A") is None
+    assert sorted(repository.find("3.2(3*)")) == ["3.2(3a)", "3.2(3d)"]
+    assert repository.image(infra)["md5"] is not None
+    assert not repository.has("notes.txt")
+
+    # Scenario: a new process loads the index without scanning
+    with patch("ucsmsdk_samples.firmware.repository.os.listdir") as listdir:
+        repository = FirmwareRepository(image_dir, index_file=index_file)
+        assert not listdir.called
+    assert repository.bundles("3.1(2b)")["C"] == \
+        "ucs-k9-bundle-c-series.3.1.2b.C.bin"
+
+    # Scenario: rescan hashes only the changed bundle
+    _write(image_dir, infra, b"bundle, updated")
+    with patch("ucsmsdk_samples.firmware.repository.firmware_image_md5",
+               return_value="md5") as md5:
+        assert repository.scan() == 9
+        assert md5.call_count == 1
+    assert repository.image(infra)["md5"] == "md5"
@@ -0,0 +1,259 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+
+from mock import patch, MagicMock
+from nose.tools import assert_raises
+
+from ucsmsdk_samples.utils.simulator import UcsSimulator, populate_domain
+from ucsmsdk_samples.server.serverdeployment import sp_associate_bulk, \
+    wait_assoc_completion, AssociationWaiter, sp_disassociate
+
+
+def _associate_later(sim, dn, status):
+    # mock the association FSM, which completes a little after the binding
+    if "deleted" in status:
+        return
+    sp_dn = dn[:-len("/pn")]
+    server_dn = sim.get_mo(dn).pn_dn
+
+    def complete():
+        sim.update(server_dn, association="associated",
+                   assigned_to_dn=sp_dn)
+        sim.update(sp_dn, assoc_state="associated", pn_dn=server_dn)
+    threading.Timer(0.2, complete).start()
+
+
+def test_sp_associate_bulk():
+    with UcsSimulator() as sim:
+        blade_dns = populate_domain(sim, chassis_count=2,
+                                    blades_per_chassis=4, associate=False)
+        sim.add_hook("LsBinding", _associate_later)
+        pairs = []
+        for blade_dn in blade_dns:
+            sp_dn = "org-root/ls-" + blade_dn.replace("/", "-")
+            sim.add("LsServer", sp_dn, name=sp_dn[len("org-root/ls-"):],
+                    assoc_state="unassociated", config_state="not-applied")
+            pairs.append((sp_dn, blade_dn))
+        pairs.append(("org-root/ls-missing", "sys/chassis-9/blade-1"))
+
+        handle = sim.handle()
+        handle.login()
+        sim.reset_stats()
+        results = sp_associate_bulk(handle, pairs, poll_interval=0.1)
+
+        # Verify one commit for all bindings, and a handful of polls
+        assert sim.stats["configConfMos"]["calls"] == 1
+        assert sim.stats["configResolveDns"]["calls"] < 10
+        for sp_dn, blade_dn in pairs[:-1]:
+            assert results[sp_dn]["status"] == "associated"
+            assert sim.get_mo(blade_dn).association == "associated"
+        assert results["org-root/ls-missing"]["status"] == "invalid"
+
+        # Scenario: associating the same pairs again is rejected per pair
+        results = sp_associate_bulk(handle, pairs[:2], poll_interval=0.1)
+        assert [result["status"] for result in results.values()] == \
+            ["invalid", "invalid"]
+
+
+def _bind(sim, blade_dns):
+    # mock bindings committed by sp_associate(wait_for_assoc_completion=False)
+    pairs = []
+    for blade_dn in blade_dns:
+        sp_dn = "org-root/ls-" + blade_dn.replace("/", "-")
+        sim.add("LsServer", sp_dn, name=sp_dn[len("org-root/ls-"):],
+                assoc_state="unassociated", config_state="applying")
+        pairs.append((sp_dn, blade_dn))
+    return pairs
+
+
+def _wait_all(call, pairs):
+    results = {}
+
+    def wait(sp_dn, blade_dn):
+        try:
+            results[sp_dn] = call(sp_dn, blade_dn)
+        except Exception as e:
+            results[sp_dn] = e
+    threads = [threading.Thread(target=wait, args=pair) for pair in pairs]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+    return results
+
+
+def test_wait_assoc_completion():
+    with UcsSimulator() as sim:
+        blade_dns = populate_domain(sim, chassis_count=2,
+                                    blades_per_chassis=4, associate=False)
+        pairs = _bind(sim, blade_dns)
+        handle = sim.handle()
+        handle.login()
+        sim.reset_stats()
+
+        def complete():
+            for sp_dn, blade_dn in pairs[:-1]:
+                sim.update(blade_dn, association="associated")
+            sim.update(pairs[-1][0], config_state="failed-to-apply")
+        threading.Timer(0.5, complete).start()
+
+        # Scenario: 8 concurrent waits share one event subscription
+        results = _wait_all(
+            lambda sp_dn, blade_dn: wait_assoc_completion(
+                handle, sp_dn, blade_dn, assoc_completion_timeout=20),
+            pairs)
+
+        # Verify every wait returned on its event, the last one failed
+        for sp_dn, _ in pairs[:-1]:
+            assert results[sp_dn] is None
+        assert "config failure" in str(results[pairs[-1][0]])
+        assert sim.stats["eventSubscribe"]["calls"] == 1
+        # two queries per call, one after subscribing, two for the failure
+        assert sim.stats["configResolveDns"]["calls"] <= 2 * len(pairs) + 3
+
+        # Scenario: a server already associated returns at once
+        sim.reset_stats()
+        wait_assoc_completion(handle, pairs[0][0], pairs[0][1])
+        assert sim.request_count == 1
+
+
+def test_association_waiter_fallback():
+    with UcsSimulator() as sim:
+        blade_dns = populate_domain(sim, chassis_count=2,
+                                    blades_per_chassis=4, associate=False)
+        pairs = _bind(sim, blade_dns)
+        handle = sim.handle()
+        handle.login()
+
+        # Scenario: the event channel is unavailable, waits poll together
+        sim.events_enabled = False
+        sim.reset_stats()
+        waiter = AssociationWaiter(handle, poll_interval=0.1,
+                                   stall_timeout=5)
+
+        def complete():
+            for _, blade_dn in pairs[:4]:
+                sim.update(blade_dn, association="associated")
+        threading.Timer(0.5, complete).start()
+        results = _wait_all(lambda sp_dn, blade_dn: waiter.wait(
+            sp_dn, blade_dn, timeout=1.5), pairs)
+
+        # Verify one batched query per tick, not one per server
+        for sp_dn, _ in pairs[:4]:
+            assert results[sp_dn] == "associated"
+        for sp_dn, _ in pairs[4:]:
+            assert results[sp_dn] == "timeout"
+        assert sim.stats["configResolveDns"]["calls"] < len(pairs) + 20
+
+        # Scenario: the event channel drops while waits are pending
+        sim.events_enabled = True
+        waiter = AssociationWaiter(handle, poll_interval=0.1,
+                                   stall_timeout=0.5)
+
+        def drop_and_complete():
+            sim.close_event_channels()
+            for _, blade_dn in pairs[4:]:
+                sim.update(blade_dn, association="associated")
+        threading.Timer(0.3, drop_and_complete).start()
+        results = _wait_all(lambda sp_dn, blade_dn: waiter.wait(
+            sp_dn, blade_dn, timeout=5), pairs[4:])
+
+        # Verify the waits completed all the same
+        assert set(results.values()) == set(["associated"])
+
+
+def test_association_waiter_session():
+    with UcsSimulator() as sim:
+        blade_dns = populate_domain(sim, chassis_count=1,
+                                    blades_per_chassis=4, associate=False)
+        pairs = _bind(sim, blade_dns)
+        handle = sim.handle()
+        handle.login()
+
+        # record the threads using the handle of the caller
+        callers = set()
+        query_dns = handle.query_dns
+
+        def record(*args, **kwargs):
+            callers.add(threading.current_thread().name)
+            return query_dns(*args, **kwargs)
+        handle.query_dns = record
+
+        # Scenario: the channel stalls while the waits are pending
+        waiter = AssociationWaiter(handle, poll_interval=0.1,
+                                   stall_timeout=0.5)
+        sim.reset_stats()
+        threading.Timer(1.2, lambda: [
+            sim.update(blade_dn, association="associated")
+            for blade_dn in blade_dns]).start()
+        results = _wait_all(lambda sp_dn, blade_dn: waiter.wait(
+            sp_dn, blade_dn, timeout=5), pairs)
+
+        # Verify the waiter polled between two subscriptions, on a session
+        # of its own
+        assert set(results.values()) == set(["associated"])
+        assert sim.stats["eventSubscribe"]["calls"] <= 2
+        assert sim.stats["aaaLogin"]["calls"] == 1
+        assert "association-waiter" not in callers
+
+        # Scenario: a wait completes with the channel open
+        waiter = AssociationWaiter(handle, poll_interval=0.1,
+                                   stall_timeout=60)
+        sim.update(blade_dns[0], association="unassociated")
+        threading.Timer(0.3, sim.update, args=(blade_dns[0],),
+                        kwargs={"association": "associated"}).start()
+        assert waiter.wait(*pairs[0], timeout=5) == "associated"
+
+        # Verify the thread and its session end with the last wait
+        thread = waiter._thread
+        if thread is not None:
+            thread.join(2)
+            assert not thread.is_alive()
+        assert sim.stats["aaaLogout"]["calls"] == 2
+
+        # Scenario: a wait times out with the channel open
+        sim.update(blade_dns[1], association="unassociated")
+        assert waiter.wait(*pairs[1], timeout=0.5) == "timeout"
+
+        # Verify the thread does not stay blocked on the channel
+        thread = waiter._thread
+        if thread is not None:
+            thread.join(2)
+            assert not thread.is_alive()
+        assert sim.stats["aaaLogout"]["calls"] == 3
+
+
+@patch("ucsmsdk_samples.server.serverdeployment.UcsEventHandle",
+       autospec=True)
+def test_sp_disassociate(event_handle_mock):
+    def add(**kwargs):
+        # the watch completes once UCSM reports the disassociation
+        kwargs["call_back"](MagicMock(mo=MagicMock(
+            dn=kwargs["managed_object"].dn, assoc_state="unassociated")))
+
+    # autospec checks the arguments against the event handler of the sdk
+    event_handle_mock.return_value.add.side_effect = add
+    with UcsSimulator() as sim:
+        populate_domain(sim, chassis_count=1, blades_per_chassis=2)
+        handle = sim.handle()
+        handle.login()
+
+        # Scenario: disassociate a service profile
+        sp_dn = sim.dns("LsServer")[0]
+        sp_disassociate(handle, sp_dn, disassoc_completion_timeout=5)
+
+        # Verify the binding is removed and the watch cleaned up
+        assert sim.get_mo(sp_dn + "/pn") is None
+        assert event_handle_mock.return_value.clean.called
@@ -0,0 +1,146 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+
+from nose.tools import assert_raises
+
+from ucsmsdk_samples.utils.simulator import UcsSimulator, populate_domain
+from ucsmsdk_samples.server.service_profile import \
+    sp_create_from_template_bulk, sp_power_on_bulk, sp_power_off_bulk
+
+
+def test_sp_create_from_template_bulk():
+    with UcsSimulator() as sim:
+        sim.add("OrgOrg", "org-root/org-web", name="web")
+        sim.add("OrgOrg", "org-root/org-web/org-front", name="front")
+        sim.add("LsServer", "org-root/ls-db_temp", name="db_temp",
+                type="updating-template")
+        sim.add("LsServer", "org-root/org-web/ls-web_temp", name="web_temp",
+                type="updating-template")
+        handle = sim.handle()
+        handle.login()
+        sim.reset_stats()
+
+        # Scenario: 250 + 40 SPs of two templates, the web one found in a
+        # parent org
+        sps = sp_create_from_template_bulk(
+            handle,
+            requests=[{"naming_prefix": "web",
+                       "name_suffix_starting_number": "1",
+                       "number_of_instance": "250",
+                       "sp_template_name": "web_temp",
+                       "parent_dn": "org-root/org-web/org-front"},
+                      {"naming_prefix": "db",
+                       "name_suffix_starting_number": "1",
+                       "number_of_instance": "40",
+                       "sp_template_name": "db_temp"}],
+            chunk_size=100, max_sessions=3)
+
+        # Verify the first chunk streams before the others are consumed
+        first = next(sps)
+        assert first.get_class_id() == "LsServer"
+        dns = set([first.dn]) | set(sp.dn for sp in sps)
+        assert len(dns) == 290
+        assert "org-root/org-web/org-front/ls-web250" in dns
+        assert sim.get_mo("org-root/ls-db40").src_templ_name == "db_temp"
+        # one query for the templates, one request per chunk
+        assert sim.stats["configResolveDns"]["calls"] == 1
+        assert sim.stats["lsInstantiateNNamedTemplate"]["calls"] == 4
+
+        # Scenario: existing names fail their chunk only
+        sps = sp_create_from_template_bulk(
+            handle,
+            requests=[{"naming_prefix": "db",
+                       "name_suffix_starting_number": "36",
+                       "number_of_instance": "10",
+                       "sp_template_name": "db_temp"}],
+            chunk_size=5)
+        created = []
+        with assert_raises(Exception):
+            for sp in sps:
+                created.append(sp.dn)
+        assert sorted(created) == ["org-root/ls-db%d" % num
+                                   for num in range(41, 46)]
+
+        # Scenario: a template missing in every parent org
+        with assert_raises(ValueError):
+            list(sp_create_from_template_bulk(
+                handle, requests=[{"naming_prefix": "x",
+                                   "name_suffix_starting_number": "1",
+                                   "number_of_instance": "1",
+                                   "sp_template_name": "missing"}]))
+
+
+def _power_later(sim, dn, status):
+    # mock the power FSM, the server follows its SP a little later
+    sp_dn = dn[:-len("/power")]
+    server_dn = sim.get_mo(sp_dn).pn_dn
+    if "deleted" in status or not server_dn:
+        return
+    oper_power = "on" if sim.get_mo(dn).state == "up" else "off"
+    threading.Timer(0.2, sim.update, args=(server_dn,),
+                    kwargs={"oper_power": oper_power}).start()
+
+
+def test_sp_power_bulk():
+    with UcsSimulator() as sim:
+        blade_dns = populate_domain(sim, chassis_count=5,
+                                    blades_per_chassis=8)
+        sps = sim.dns("LsServer")
+        for sp_dn in sps[:16]:
+            sim.update(sp_dn, src_templ_name="web_temp")
+        sim.add("LsRequirement", sps[20] + "/pn-req", name="rack-12")
+        sim.add("LsServer", "org-root/ls-spare", name="spare",
+                type="instance", pn_dn="")
+        sim.add_hook("LsPower", _power_later)
+        handle = sim.handle()
+        handle.login()
+
+        # Scenario: power off a rack of 40 SPs and wait for all servers
+        sim.reset_stats()
+        results = sp_power_off_bulk(
+            handle, sp_names=[sp_dn[len("org-root/ls-"):]
+                              for sp_dn in sps] + ["spare"],
+            wait_for_power=True, poll_interval=0.1)
+
+        # Verify one query, one commit and a handful of status queries
+        assert sim.stats["configConfMos"]["calls"] == 1
+        assert sim.stats["configResolveDns"]["calls"] < 10
+        assert results.pop("org-root/ls-spare") == "unassociated"
+        assert set(results.values()) == set(["off"])
+        assert set(sim.get_mo(blade_dn).oper_power
+                   for blade_dn in blade_dns) == set(["off"])
+
+        # Scenario: power on by template, then by pool, without waiting
+        results = sp_power_on_bulk(handle, org_dn="org-root",
+                                   template_name="web_temp")
+        assert sorted(results) == sps[:16]
+        assert set(results.values()) == set(["submitted"])
+        results = sp_power_on_bulk(handle, pool_name="rack-12")
+        assert list(results) == [sps[20]]
+        assert sim.get_mo(sps[20] + "/power").state == "up"
+
+        # Scenario: an unknown name fails the whole batch
+        sim.reset_stats()
+        with assert_raises(ValueError):
+            sp_power_on_bulk(handle, sp_names=["sp-1-1", "missing"])
+        assert "configConfMos" not in sim.stats
+
+        # Scenario: no selection, or names and filters together
+        with assert_raises(ValueError):
+            sp_power_off_bulk(handle)
+        with assert_raises(ValueError):
+            sp_power_off_bulk(handle, sp_names=["sp-1-1"],
+                              template_name="web_temp")
+        assert sim.request_count == 1
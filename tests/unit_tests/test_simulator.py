@@ -0,0 +1,86 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+
+from nose.tools import assert_raises
+from ucsmsdk.ucsexception import UcsException
+from ucsmsdk.mometa.org.OrgOrg import OrgOrg
+from ucsmsdk_samples.utils.simulator import UcsSimulator, populate_domain
+from ucsmsdk_samples.server.service_profile import sp_power_on
+
+
+def test_simulator_queries():
+    with UcsSimulator() as sim:
+        populate_domain(sim, chassis_count=2, blades_per_chassis=4)
+        handle = sim.handle()
+        assert handle.login()
+
+        # Scenario: class query, with and without filter
+        assert len(handle.query_classid("ComputeBlade")) == 8
+        running = handle.query_classid(
+            "FirmwareRunning",
+            filter_str='(type, "blade-controller", type="eq")')
+        assert len(running) == 8
+
+        # Scenario: dn and children queries
+        assert handle.query_dn("sys/chassis-1/blade-1").slot_id == "1"
+        assert handle.query_dn("sys/chassis-9") is None
+        children = handle.query_children(in_dn="sys/chassis-2",
+                                         class_id="ComputeBlade")
+        assert len(children) == 4
+        handle.logout()
+
+
+def test_simulator_conf_mos():
+    with UcsSimulator() as sim:
+        handle = sim.handle()
+        handle.login()
+
+        # Scenario: create, then create again without modify_present
+        handle.add_mo(OrgOrg(parent_mo_or_dn="org-root", name="test"))
+        handle.commit()
+        assert sim.exists("org-root/org-test")
+        handle.add_mo(OrgOrg(parent_mo_or_dn="org-root", name="test"))
+        assert_raises(UcsException, handle.commit)
+
+        # Scenario: delete
+        handle.remove_mo(handle.query_dn("org-root/org-test"))
+        handle.commit()
+        assert not sim.exists("org-root/org-test")
+
+
+def test_simulator_round_trips_and_latency():
+    with UcsSimulator(latency=0.05) as sim:
+        populate_domain(sim, chassis_count=1, blades_per_chassis=1)
+        handle = sim.handle()
+        handle.login()
+        sim.reset_stats()
+
+        start = time.time()
+        sp_power_on(handle, sp_name="sp-1-1")
+        elapsed = time.time() - start
+
+        # query_dn, configConfMos and the refresh of the dirty LsPower child
+        assert sim.request_count == 3
+        assert sim.stats["configConfMos"]["calls"] == 1
+        assert elapsed >= 3 * 0.05
+        assert sim.get_mo("org-root/ls-sp-1-1/power").state == "up"
+
+
+def test_simulator_expired_session():
+    with UcsSimulator() as sim:
+        handle = sim.handle()
+        handle.login()
+        sim.expire_sessions()
+        assert_raises(UcsException, handle.query_dn, "sys")
@@ -0,0 +1,64 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import tempfile
+
+from ucsmsdk_samples.utils import telemetry
+from ucsmsdk_samples.utils.telemetry import Histogram, UpgradeTelemetry
+from ucsmsdk_samples.utils.simulator import UcsSimulator
+from ucsmsdk_samples.firmware.ucsfirmware import firmware_add_local
+
+
+def test_histogram():
+    histogram = Histogram([1, 10, 100])
+    for value in [0.5, 2, 3, 4, 50, 500]:
+        histogram.observe(value)
+    assert histogram.buckets == [1, 3, 1, 1]
+    assert histogram.percentile(50) == 10
+    assert histogram.percentile(100) == 500
+    assert histogram.to_dict()["mean"] == sum([0.5, 2, 3, 4, 50, 500]) / 6
+
+
+def test_upgrade_telemetry():
+    with UcsSimulator() as sim:
+        sim.add_hook("FirmwareDownloader", lambda sim, dn, status: sim.update(
+            dn, transfer_state="downloaded"))
+        handle = sim.handle()
+        handle.login()
+
+        image_dir = tempfile.mkdtemp()
+        image_name = "ucs-k9-bundle-b-series.3.1.3a.B.bin"
+        with open(os.path.join(image_dir, image_name), "wb") as image:
+            image.write(b"\0" * 4096)
+
+        path = os.path.join(image_dir, "upgrade.jsonl")
+        with UpgradeTelemetry(path) as upgrade_telemetry:
+            firmware_add_local(handle, image_dir, image_name)
+        # Verify nothing is recorded once stopped
+        telemetry.emit("upload.start", image=image_name)
+
+        with open(path) as events_fh:
+            events = [json.loads(line) for line in events_fh]
+        assert [event["event"] for event in events] == [
+            "upload.start", "upload.end", "wait", "download.end"]
+        assert events[1]["size"] == 4096
+        assert events[1]["domain"] == handle.uri
+        assert len(upgrade_telemetry.events) == 4
+
+        summary = upgrade_telemetry.summary()
+        assert summary["upload.end.seconds"]["count"] == 1
+        assert summary["upload.end.bytes_per_second"]["count"] == 1
+        assert summary["download.end.seconds"]["count"] == 1
+        assert "upload.end.seconds" in upgrade_telemetry.format_summary()
@@ -0,0 +1,458 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import os
+import tempfile
+
+from mock import patch
+from nose.tools import assert_raises
+from ucsmsdk.ucshandle import UcsHandle
+from ucsmsdk_samples.utils.simulator import UcsSimulator, populate_domain, \
+    populate_bundle
+from ucsmsdk_samples.utils.telemetry import add_listener, remove_listener
+from ucsmsdk_samples.firmware.ucsfirmware import wait_for_blade_activation, \
+    firmware_activate_blade, get_infra_firmware_version, \
+    wait_for_firmware_activation, firmware_version_cache_clear, \
+    firmware_add_local, firmware_add_local_parallel, \
+    firmware_add_local_verified, firmware_image_md5, \
+    rolling_blade_activation, validate_connection, \
+    get_bundle_firmware_versions
+
+
+def _activate_on_ack(sim, dn, status):
+    # mock the blade reboot, which activates the new firmware once acked
+    ack = sim.get_mo(dn)
+    if ack.admin_state != "trigger-immediate":
+        return
+    sp = sim.get_mo(dn[:-len("/ack")])
+    sim.update(sp.pn_dn + "/mgmt/fw-system", version="3.1(3a)")
+    sim.update(dn, oper_state="idle")
+
+
+def test_wait_for_blade_activation():
+    with UcsSimulator() as sim:
+        blade_dns = populate_domain(sim, chassis_count=4,
+                                    blades_per_chassis=8)
+        for sp_dn in sim.dns("LsServer"):
+            sim.update(sp_dn + "/ack", oper_state="waiting-for-user")
+        sim.add_hook("LsmaintAck", _activate_on_ack)
+
+        handle = sim.handle()
+        handle.login()
+        firmware_running_map = {}
+        for blade_dn in blade_dns:
+            firmware_running_map[blade_dn] = [
+                handle.query_dn(blade_dn + "/mgmt/fw-system"),
+                sim.get_mo(blade_dn).assigned_to_dn]
+
+        sim.reset_stats()
+        assert wait_for_blade_activation(handle, "3.1(3a)",
+                                         firmware_running_map,
+                                         require_user_confirmation=False,
+                                         poll_interval=0)
+
+        # Verify the per tick cost does not depend on the number of blades
+        # tick 1: resolve, ack query, ack commit; tick 2: resolve
+        assert sim.stats["configResolveDns"]["calls"] == 2
+        assert sim.stats["configResolveClass"]["calls"] == 1
+        assert sim.stats["configConfMos"]["calls"] == 1
+        for blade_dn in blade_dns:
+            assert firmware_running_map[blade_dn][0].version == "3.1(3a)"
+
+
+@patch("ucsmsdk_samples.firmware.ucsfirmware.input", create=True)
+def test_wait_for_blade_activation_ack_once(input_mock):
+    input_mock.return_value = "yes"
+    with UcsSimulator() as sim:
+        blade_dns = populate_domain(sim, chassis_count=1,
+                                    blades_per_chassis=4)
+        for sp_dn in sim.dns("LsServer"):
+            sim.update(sp_dn + "/ack", oper_state="waiting-for-user")
+
+        handle = sim.handle()
+        handle.login()
+        firmware_running_map = dict(
+            (blade_dn, [handle.query_dn(blade_dn + "/mgmt/fw-system"),
+                        sim.get_mo(blade_dn).assigned_to_dn])
+            for blade_dn in blade_dns)
+
+        # Scenario: UCSM is slow to pick up the acknowledgements
+        sim.reset_stats()
+        assert not wait_for_blade_activation(handle, "3.1(3a)",
+                                             firmware_running_map,
+                                             timeout=0.5, poll_interval=0)
+
+        # Verify the user is asked once and the acks are not toggled again
+        assert input_mock.call_count == 1
+        assert sim.stats["configConfMos"]["calls"] == 1
+        for sp_dn in sim.dns("LsServer"):
+            assert sim.get_mo(sp_dn + "/ack").admin_state == \
+                "trigger-immediate"
+
+
+@patch("ucsmsdk_samples.firmware.ucsfirmware.wait_for_blade_activation")
+def test_firmware_activate_blade_discovery(wait_mock):
+    wait_mock.return_value = True
+    with UcsSimulator() as sim:
+        blade_dns = populate_domain(sim, chassis_count=4,
+                                    blades_per_chassis=8)
+        handle = sim.handle()
+        handle.login()
+        sim.reset_stats()
+
+        assert firmware_activate_blade(handle, "3.1(3a)",
+                                       require_user_confirmation=False)
+
+        # Verify discovery does not issue queries per blade
+        assert sim.stats["configResolveClasses"]["calls"] == 1
+        assert "configResolveChildren" not in sim.stats
+        assert sim.request_count == 5
+        hfp = sim.get_mo("org-root/fw-host-pack-default")
+        assert hfp.blade_bundle_version == "3.1(3a)B"
+        for sp_dn in sim.dns("LsServer"):
+            assert sim.get_mo(sp_dn + "/ack").admin_state == \
+                "trigger-immediate"
+
+        firmware_running_map = wait_mock.call_args[0][2]
+        assert sorted(firmware_running_map) == sorted(blade_dns)
+        assert firmware_running_map[blade_dns[0]][1] == \
+            "org-root/ls-sp-1-1"
+
+
+def test_infra_firmware_version_cache():
+    with UcsSimulator() as sim:
+        populate_domain(sim, chassis_count=1, blades_per_chassis=1)
+        populate_bundle(sim, "3.1(2b)", bundle="A")
+        handle = sim.handle()
+        handle.login()
+        firmware_version_cache_clear()
+        sim.reset_stats()
+
+        firmware_map = get_infra_firmware_version(handle, "3.1(2b)",
+                                                  use_cache=True)
+        assert firmware_map["system"]["version"] == "3.1(2b)"
+        resolved = sim.request_count
+
+        # Scenario: cached maps cost nothing and are copies
+        firmware_map["system"]["version"] = None
+        firmware_map = get_infra_firmware_version(handle, "3.1(2b)",
+                                                  use_cache=True)
+        assert firmware_map["system"]["version"] == "3.1(2b)"
+        assert sim.request_count == resolved
+
+        # Scenario: the activation loop only polls the running firmware
+        sim.reset_stats()
+        assert wait_for_firmware_activation(
+            handle, "3.1(2b)", subject="system", image_types=["system"],
+            wait_for_upgrade_completion=False, acknowledge_reboot=False,
+            timeout=60)
+        # MgmtController class query, then its FirmwareRunning children
+        assert sim.stats["configResolveClass"]["calls"] == 1
+        assert sim.stats["configResolveChildren"]["calls"] == 1
+
+        # Scenario: clearing the cache resolves again
+        firmware_version_cache_clear(handle)
+        sim.reset_stats()
+        get_infra_firmware_version(handle, "3.1(2b)", use_cache=True)
+        assert sim.request_count == resolved
+
+
+def test_get_bundle_firmware_versions():
+    with UcsSimulator() as sim:
+        populate_bundle(sim, "3.1(2b)", bundle="B")
+        populate_bundle(sim, "3.1(3a)", bundle="B")
+        populate_bundle(sim, "3.1(3a)", bundle="A")
+        handle = sim.handle()
+        handle.login()
+        sim.reset_stats()
+
+        firmware_maps = get_bundle_firmware_versions(
+            handle, "b-series-bundle", ["3.1(2b)", "3.1(3a)"],
+            ["blade-controller", "adaptor"])
+
+        # Verify both versions cost one round-trip
+        assert sim.request_count == 1
+        assert firmware_maps["3.1(2b)"]["adaptor"] == {
+            "image_name": "ucs-adaptor.3.1.2b.B.bin", "version": "3.1(2b)"}
+        assert firmware_maps["3.1(3a)"]["blade-controller"]["version"] == \
+            "3.1(3a)"
+
+        # Scenario: image type not in the bundle
+        assert_raises(Exception, get_bundle_firmware_versions, handle,
+                      "b-series-bundle", ["3.1(3a)"], ["system"])
+
+
+def test_firmware_add_local():
+    with UcsSimulator() as sim:
+        # mock the FI download, completed by the time it is first polled
+        sim.add_hook("FirmwareDownloader", lambda sim, dn, status: sim.update(
+            dn, transfer_state="downloaded"))
+        handle = sim.handle()
+        handle.login()
+
+        image_dir = tempfile.mkdtemp()
+        image_name = "ucs-k9-bundle-b-series.3.1.3a.B.bin"
+        with open(os.path.join(image_dir, image_name), "wb") as image:
+            image.write(b"\0" * 1024)
+        sim.reset_stats()
+
+        downloader = firmware_add_local(handle, image_dir, image_name)
+        assert downloader.transfer_state == "downloaded"
+        assert sim.uploads[image_name]["size"] == 1024
+        # Verify the download is not polled in a tight loop
+        assert sim.stats["configResolveDns"]["calls"] == 1
+
+
+def test_firmware_add_local_parallel():
+    with UcsSimulator() as sim:
+        sim.add_hook("FirmwareDownloader", lambda sim, dn, status: sim.update(
+            dn, transfer_state="downloaded"))
+        handle = sim.handle()
+        handle.login()
+
+        image_dir = tempfile.mkdtemp()
+        image_names = ["ucs-k9-bundle-infra.3.1.3a.A.bin",
+                       "ucs-k9-bundle-b-series.3.1.3a.B.bin",
+                       "ucs-k9-bundle-c-series.3.1.3a.C.bin"]
+        for size, image_name in enumerate(image_names, 1):
+            with open(os.path.join(image_dir, image_name), "wb") as image:
+                image.write(b"\0" * size * 100000)
+        sim.reset_stats()
+
+        progress = {}
+
+        def on_progress(image_name, sent, total):
+            progress.setdefault(image_name, []).append((sent, total))
+
+        events = []
+        add_listener(events.append)
+        try:
+            downloaders = firmware_add_local_parallel(
+                handle, image_dir, image_names, progress=on_progress)
+        finally:
+            remove_listener(events.append)
+
+        assert sorted(downloaders) == sorted(image_names)
+        for size, image_name in enumerate(image_names, 1):
+            assert sim.uploads[image_name]["size"] == size * 100000
+            # Verify progress is streamed chunk by chunk up to the file size
+            assert len(progress[image_name]) > 1
+            assert progress[image_name][-1] == (size * 100000,
+                                                size * 100000)
+        # Verify every download is timed from the end of its own upload
+        uploads = dict((event["image"], event["time"]) for event in events
+                       if event["event"] == "upload.end")
+        downloads = [event for event in events
+                     if event["event"] == "download.end"]
+        assert sorted(event["image"] for event in downloads) == \
+            sorted(image_names)
+        for event in downloads:
+            assert event["outcome"] == "done"
+            assert abs(event["time"] - event["seconds"] -
+                       uploads[event["image"]]) < 0.5
+        # Verify one session per upload, and one poll for all downloads
+        assert sim.stats["aaaLogin"]["calls"] == 3
+        assert sim.stats["configResolveDns"]["calls"] == 1
+        # Verify the caller session survived
+        assert handle.query_dn("sys") is not None
+
+
+def test_firmware_add_local_verified():
+    with UcsSimulator() as sim:
+        transfers = []
+        corrupted = [1]
+
+        def download(sim, dn, status):
+            # mock the FI catalogue, corrupting the first transfers
+            image_name = sim.get_mo(dn).file_name
+            transfers.append(image_name)
+            md5sum = sim.uploads[image_name]["md5"]
+            if corrupted[0]:
+                corrupted[0] -= 1
+                md5sum = "0" * 32
+            sim.add("FirmwareDistributable",
+                    "sys/fw-catalogue/distrib-" + image_name,
+                    name=image_name, md5sum=md5sum)
+            sim.update(dn, transfer_state="downloaded")
+
+        sim.add_hook("FirmwareDownloader", download)
+        handle = sim.handle()
+        handle.login()
+
+        image_dir = tempfile.mkdtemp()
+        image_name = "ucs-k9-bundle-infra.3.1.3a.A.bin"
+        with open(os.path.join(image_dir, image_name), "wb") as image:
+            image.write(os.urandom(300000))
+        md5sum = firmware_image_md5(os.path.join(image_dir, image_name))
+        assert md5sum == firmware_image_md5(
+            os.path.join(image_dir, image_name), block_size=4096)
+
+        # Scenario: a corrupted transfer is uploaded again
+        distributable = firmware_add_local_verified(handle, image_dir,
+                                                    image_name)
+        assert distributable.md5sum == md5sum
+        assert len(transfers) == 2
+
+        # Scenario: an intact image already on UCSM is not uploaded again
+        sim.reset_stats()
+        firmware_add_local_verified(handle, image_dir, image_name)
+        assert len(transfers) == 2
+        assert sim.request_count == 1
+
+        # Scenario: every transfer corrupted
+        sim.update("sys/fw-catalogue/distrib-" + image_name, md5sum="bad")
+        corrupted[0] = 2
+        assert_raises(Exception, firmware_add_local_verified, handle,
+                      image_dir, image_name, retries=1)
+        assert len(transfers) == 4
+
+        # Scenario: an image hashed while it streams
+        image_name = "ucs-k9-bundle-b-series.3.1.3a.B.bin"
+        data = os.urandom(200000)
+        with open(os.path.join(image_dir, image_name), "wb") as image:
+            image.write(data)
+        with patch("ucsmsdk_samples.firmware.ucsfirmware.hashlib") as \
+                hashlib_mock:
+            hashlib_mock.md5.side_effect = hashlib.md5
+            distributable = firmware_add_local_verified(handle, image_dir,
+                                                        image_name)
+        # Verify the md5 of the upload was reused, not computed again
+        assert hashlib_mock.md5.call_count == 1
+        assert distributable.md5sum == hashlib.md5(data).hexdigest()
+
+        # Scenario: UCSM older than 3.2(1d) reports no md5
+        events = []
+        add_listener(events.append)
+        try:
+            sim.update("sys/fw-catalogue/distrib-" + image_name, md5sum="")
+            firmware_add_local_verified(handle, image_dir, image_name)
+        finally:
+            remove_listener(events.append)
+        assert [event["outcome"] for event in events
+                if event["event"] == "image.verify"] == ["unverified"]
+
+
+def test_rolling_blade_activation():
+    with UcsSimulator() as sim:
+        blade_dns = populate_domain(sim, chassis_count=3,
+                                    blades_per_chassis=4)
+        for sp_dn in sim.dns("LsServer"):
+            sim.update(sp_dn + "/ack", oper_state="waiting-for-user")
+
+        # mock the blade reboots, acked blades upgrade during the next sleep
+        rebooting = set()
+        stuck = set(["sys/chassis-3/blade-1"])
+        waves = []
+
+        def ack(sim, dn, status):
+            if sim.get_mo(dn).admin_state == "trigger-immediate":
+                rebooting.add(sim.get_mo(dn[:-len("/ack")]).pn_dn)
+                sim.update(dn, oper_state="idle")
+
+        def reboot(seconds):
+            waves.append(sorted(rebooting))
+            for blade_dn in rebooting - stuck:
+                sim.update(blade_dn + "/mgmt/fw-system", version="3.1(3a)")
+            rebooting.clear()
+
+        sim.add_hook("LsmaintAck", ack)
+        handle = sim.handle()
+        handle.login()
+        firmware_running_map = dict(
+            (blade_dn, [handle.query_dn(blade_dn + "/mgmt/fw-system"),
+                        sim.get_mo(blade_dn).assigned_to_dn])
+            for blade_dn in blade_dns)
+
+        stats = []
+        with patch("ucsmsdk_samples.utils.poller.time.sleep",
+                   side_effect=reboot):
+            status = rolling_blade_activation(
+                handle, "3.1(3a)", firmware_running_map, max_per_chassis=1,
+                max_per_domain=2, require_user_confirmation=False,
+                blade_timeout=0, progress=stats.append)
+
+        # Verify the caps held in every wave
+        for wave in waves:
+            assert len(wave) <= 2
+            assert len(set(blade_dn.rsplit("/", 1)[0] for blade_dn in
+                           wave)) == len(wave)
+        assert len(waves) == 5
+
+        # Verify the stuck blade holds its chassis slot
+        assert status["sys/chassis-3/blade-1"] == "timeout"
+        assert list(status.values()).count("done") == 8
+        assert list(status.values()).count("skipped") == 3
+        assert stats[-1]["pending"] == 0
+        assert stats[-1]["throughput"] > 0
+
+
+def test_rolling_blade_activation_late_acks():
+    with UcsSimulator() as sim:
+        blade_dns = populate_domain(sim, chassis_count=2,
+                                    blades_per_chassis=2)
+        sim.add_hook("LsmaintAck", _activate_on_ack)
+        handle = sim.handle()
+        handle.login()
+        firmware_running_map = dict(
+            (blade_dn, [handle.query_dn(blade_dn + "/mgmt/fw-system"),
+                        sim.get_mo(blade_dn).assigned_to_dn])
+            for blade_dn in blade_dns)
+
+        # Scenario: the acks wait for user only after the first poll
+        polls = []
+
+        def sleep(seconds):
+            polls.append(seconds)
+            for sp_dn in sim.dns("LsServer"):
+                sim.update(sp_dn + "/ack", oper_state="waiting-for-user")
+
+        with patch("ucsmsdk_samples.utils.poller.time.sleep",
+                   side_effect=sleep):
+            status = rolling_blade_activation(
+                handle, "3.1(3a)", firmware_running_map, max_per_chassis=1,
+                require_user_confirmation=False, blade_timeout=60)
+
+        # Verify the first wave is acknowledged once its acks show up
+        assert status == dict((blade_dn, "done") for blade_dn in blade_dns)
+
+
+def test_validate_connection():
+    with UcsSimulator() as sim:
+        handle = sim.handle()
+        handle.login()
+
+        # Scenario: the session is still valid
+        sim.reset_stats()
+        assert validate_connection(handle, timeout=5)
+        assert "aaaLogin" not in sim.stats
+        assert sim.request_count == 1
+
+        # Scenario: UCSM restarted, the cookie is gone
+        sim.expire_sessions()
+        sim.reset_stats()
+        assert validate_connection(handle, timeout=5)
+        assert sim.stats["aaaRefresh"]["calls"] == 1
+        assert sim.stats["aaaLogin"]["calls"] == 1
+        assert handle.is_valid()
+
+        # Scenario: the FI is down, only the TCP probe runs until timeout
+        port = sim.port
+        sim.stop()
+        handle = UcsHandle("127.0.0.1", "admin", "password", port=port,
+                           secure=False)
+        with patch("ucsmsdk.ucshandle.UcsHandle.login") as login, \
+                patch("ucsmsdk_samples.utils.poller.time.sleep"):
+            assert_raises(Exception, validate_connection, handle,
+                          timeout=0.2, probe_timeout=0.01)
+            assert not login.called
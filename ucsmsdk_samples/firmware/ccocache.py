@@ -0,0 +1,175 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains a cache of the CCO image listings, kept in memory and
+optionally in a json file, so that repeated runs skip the remote listing.
+"""
+
+import base64
+import copy
+import json
+import logging
+import os
+import threading
+import time
+
+from ucsmsdk.utils.ccoimage import UcsCcoImage, get_ucs_cco_image_list
+
+log = logging.getLogger('ucs')
+
+CCO_CACHE_TTL = 24 * 60 * 60
+
+# UcsCcoImage attributes written to the cache file, the credential and the
+# proxy are filled in again when a listing is read
+_IMAGE_FIELDS = ["image_name", "version", "url", "ip_url", "size",
+                 "checksum_md5", "file_description"]
+
+_DEFAULT_KEY = "default"
+
+
+def _key(mdf_id_list):
+    if not mdf_id_list:
+        return _DEFAULT_KEY
+    return ",".join(sorted(str(mdf_id) for mdf_id in mdf_id_list))
+
+
+class CcoImageCache(object):
+    """
+    Caches the CCO image listing of every mdf id list for ttl seconds, in
+    memory and in cache_file when given, with an index of the images by
+    name.
+
+    The cache file holds no credential. It can be copied to an air-gapped
+    host and used there with ttl=None, which never expires a listing.
+
+    Args:
+        cache_file (string): path of the json cache file, None keeps the
+            cache in memory only
+        ttl (number): seconds a listing stays valid, None never expires
+
+    Example:
+        cache = CcoImageCache("/home/user/.ucs-cco-images.json")
+        firmware_available(username="cecuser", password="cecpasswd",
+                           cache=cache)
+    """
+
+    def __init__(self, cache_file=None, ttl=CCO_CACHE_TTL):
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._listings = {}
+        self._index = {}
+        if cache_file and os.path.exists(cache_file):
+            with open(cache_file) as cache_fh:
+                self._listings = json.load(cache_fh)
+
+    def _save(self):
+        # caller holds self._lock
+        if not self.cache_file:
+            return
+        tmp_file = self.cache_file + ".tmp"
+        with open(tmp_file, "w") as cache_fh:
+            json.dump(self._listings, cache_fh, indent=2, sort_keys=True)
+        # os.replace is atomic on every platform, py2 only has os.rename
+        getattr(os, "replace", os.rename)(tmp_file, self.cache_file)
+
+    def _fresh(self, key):
+        listing = self._listings.get(key)
+        if listing is None:
+            return False
+        return self.ttl is None or time.time() - listing["time"] < self.ttl
+
+    def put(self, images, mdf_id_list=None):
+        """
+        Stores a listing, e.g. to prefill the cache by hand
+
+        Args:
+            images (list): UcsCcoImage objects
+            mdf_id_list (list of string): mdf ids the listing is for
+        """
+
+        key = _key(mdf_id_list)
+        with self._lock:
+            self._listings[key] = {
+                "time": time.time(),
+                "images": [dict((field, getattr(image, field)) for field
+                                in _IMAGE_FIELDS) for image in images]}
+            self._index.pop(key, None)
+            self._save()
+
+    def clear(self):
+        with self._lock:
+            self._listings = {}
+            self._index = {}
+            self._save()
+
+    def index(self, username, password, mdf_id_list=None, proxy=None,
+              refresh=False):
+        """
+        Returns the images of a listing by name, fetching the listing from
+        CCO only if it is not cached or expired
+
+        Args:
+            username (string): cec username
+            password (string): cec password
+            mdf_id_list (list of string): mdf ids
+            proxy (string): proxy address
+            refresh (bool): fetch the listing even if it is cached
+
+        Returns:
+            dict: {image_name: UcsCcoImage}
+        """
+
+        key = _key(mdf_id_list)
+        with self._lock:
+            fresh = not refresh and self._fresh(key)
+        if not fresh:
+            log.debug("Fetching the CCO image listing '%s'", key)
+            self.put(get_ucs_cco_image_list(username=username,
+                                            password=password,
+                                            mdf_id_list=mdf_id_list,
+                                            proxy=proxy), mdf_id_list)
+
+        credential = base64.b64encode(
+            (username + ":" + password).encode()).decode()
+        with self._lock:
+            index = self._index.get(key)
+            if index is None:
+                index = {}
+                for entry in self._listings[key]["images"]:
+                    image = UcsCcoImage()
+                    for field in _IMAGE_FIELDS:
+                        setattr(image, field, entry.get(field))
+                    index[image.image_name] = image
+                self._index[key] = index
+        images = {}
+        for name, image in index.items():
+            image = copy.copy(image)
+            image.network_credential = credential
+            image.proxy = proxy
+            images[name] = image
+        return images
+
+    def images(self, username, password, mdf_id_list=None, proxy=None,
+               refresh=False):
+        """
+        Returns the images of a listing sorted by name, see index
+
+        Returns:
+            list of UcsCcoImage
+        """
+
+        index = self.index(username, password, mdf_id_list=mdf_id_list,
+                           proxy=proxy, refresh=refresh)
+        return [index[name] for name in sorted(index)]
@@ -235,7 +235,7 @@ def hfp_firmware_pack_item_remove(handle, org_dn, hfp_name, hw_vendor,
     handle.commit()
 
 
-def hfp_sp_attach(handle, sp_dn, hfp_name):
+def hfp_sp_attach(handle, sp_dn, hfp_name, resolver=None):
     """
     Attaches a hfp policy to the specified service profile
 
@@ -243,6 +243,8 @@ def hfp_sp_attach(handle, sp_dn, hfp_name):
         handle (UcsHandle)
         sp_dn (string): the dn of the service profile to attach to
         hfp_name (string) : name of the host firmware pack policy
+        resolver (PolicyResolver): resolves the policy from its index
+            instead of querying every parent org
 
     Returns:
         LsServer: Managed object
@@ -261,16 +263,22 @@ def hfp_sp_attach(handle, sp_dn, hfp_name):
     if sp is None:
         raise ValueError("sp does not exist.")
 
-    obj = None
-    org_dn = os.path.dirname(sp.dn)
-    while obj is None:
-        dn = org_dn + "/fw-host-pack-" + hfp_name
-        obj = handle.query_dn(dn)
-        if obj:
-            break
-        elif obj is None and org_dn == 'org-root':
+    if resolver is not None:
+        if resolver.resolve("FirmwareComputeHostPack", hfp_name,
+                            os.path.dirname(sp.dn)) is None:
             raise ValueError("host firmware pack policy does not exist.")
-        org_dn = os.path.dirname(org_dn)
+    else:
+        obj = None
+        org_dn = os.path.dirname(sp.dn)
+        while obj is None:
+            dn = org_dn + "/fw-host-pack-" + hfp_name
+            obj = handle.query_dn(dn)
+            if obj:
+                break
+            elif obj is None and org_dn == 'org-root':
+                raise ValueError("host firmware pack policy does not "
+                                 "exist.")
+            org_dn = os.path.dirname(org_dn)
 
     sp.host_fw_policy_name = hfp_name
     handle.set_mo(sp)
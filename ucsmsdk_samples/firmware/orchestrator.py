@@ -0,0 +1,277 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains an orchestrator that runs the firmware_auto_install
+stages (upload, infra activation, blade activation) on many UCS domains
+concurrently, with resumable on-disk state and one progress stream.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+from ucsmsdk_samples.firmware.ucsfirmware import get_firmware_file_names, \
+    is_image_available_on_ucsm, firmware_add_local, \
+    firmware_activate_infra, firmware_activate_blade
+from ucsmsdk_samples.firmware.planner import firmware_plan
+
+log = logging.getLogger('ucs')
+
+STAGE_UPLOAD = "upload"
+STAGE_INFRA = "infra"
+STAGE_BLADE = "blade"
+
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+class _DomainObserver(object):
+    """
+    Forwards the fw_observer_cb messages of firmware_activate_infra to the
+    progress stream of the orchestrator
+    """
+
+    def __init__(self, orchestrator, name, stage):
+        self.orchestrator = orchestrator
+        self.name = name
+        self.stage = stage
+
+    def fw_observer_cb(self, message, *args):
+        if args:
+            message = message % args
+        self.orchestrator._progress(self.name, self.stage, STATUS_RUNNING,
+                                    message)
+
+
+class FirmwareOrchestrator(object):
+    """
+    Upgrades the firmware of many UCS domains in parallel. Each domain goes
+    through the upload, infra and blade stages in order, a domain failing
+    does not stop the others.
+
+    The state of every domain is written to state_file after each stage.
+    Running again with the same state_file skips the domains and stages
+    that already completed, so an interrupted run resumes where it stopped.
+
+    Args:
+        handles (dict): {domain name: UcsHandle}
+        version (string): firmware version, e.g. "3.1(2b)"
+        image_dir (string): local directory holding the bundles
+        state_file (string): path of the json state file
+        max_workers (int): number of domains upgraded at the same time
+        infra (bool): activate the infra bundle
+        blade (bool): activate the blade bundle
+        progress (callable): progress(event) called for every event, event
+            is {"domain", "stage", "status", "message", "time"}
+
+    Example:
+        orchestrator = FirmwareOrchestrator(
+                            handles={"pod1": handle1, "pod2": handle2},
+                            version="3.1(2b)", image_dir="/home/imagedir",
+                            state_file="/home/upgrade-3.1.2b.json",
+                            max_workers=8)
+        states = orchestrator.run()
+    """
+
+    def __init__(self, handles, version, image_dir, state_file,
+                 max_workers=4, infra=True, blade=True, progress=None):
+        self.handles = handles
+        self.version = version
+        self.image_dir = image_dir
+        self.state_file = state_file
+        self.max_workers = max_workers
+        self.stages = [STAGE_UPLOAD]
+        if infra:
+            self.stages.append(STAGE_INFRA)
+        if blade:
+            self.stages.append(STAGE_BLADE)
+        self.progress = progress
+        self._lock = threading.Lock()
+        # serialises the progress callbacks only, never held with _lock
+        self._progress_lock = threading.Lock()
+        self.state = self._load_state()
+
+    def _load_state(self):
+        state = {}
+        if os.path.exists(self.state_file):
+            with open(self.state_file) as state_fh:
+                state = json.load(state_fh)
+        if state.get("version") not in (None, self.version):
+            raise ValueError("State file '%s' is for version %s" %
+                             (self.state_file, state["version"]))
+        domains = state.get("domains", {})
+        for name in self.handles:
+            domain = domains.setdefault(name, {"status": STATUS_PENDING,
+                                               "completed": [],
+                                               "error": None})
+            # a domain still running when the previous run stopped resumes
+            if domain["status"] == STATUS_RUNNING:
+                domain["status"] = STATUS_PENDING
+        return {"version": self.version, "domains": domains}
+
+    def _save_state(self):
+        # caller holds self._lock
+        tmp_file = self.state_file + ".tmp"
+        with open(tmp_file, "w") as state_fh:
+            json.dump(self.state, state_fh, indent=2, sort_keys=True)
+        # os.replace is atomic on every platform, py2 only has os.rename
+        getattr(os, "replace", os.rename)(tmp_file, self.state_file)
+
+    def _update(self, name, **kwargs):
+        with self._lock:
+            self.state["domains"][name].update(kwargs)
+            self._save_state()
+
+    def _progress(self, name, stage, status, message=""):
+        event = {"domain": name, "stage": stage, "status": status,
+                 "message": message, "time": time.time()}
+        log.info("[%s] %s %s %s", name, stage, status, message)
+        if self.progress:
+            with self._progress_lock:
+                self.progress(event)
+
+    def _upload(self, name, handle):
+        bundle_map = get_firmware_file_names(self.version)
+        bundles = [bundle_map['A'][0]]
+        if STAGE_BLADE in self.stages:
+            bundles.append(bundle_map['B'][0])
+
+        images_to_upload = [image for image in bundles
+                            if not is_image_available_on_ucsm(handle, image)]
+        missing = [image for image in images_to_upload if not os.path.exists(
+            os.path.join(self.image_dir, image))]
+        if missing:
+            raise ValueError("Download images %s using firmware_download" %
+                             missing)
+
+        for image in images_to_upload:
+            self._progress(name, STAGE_UPLOAD, STATUS_RUNNING,
+                           "uploading %s" % image)
+            firmware_add_local(handle, self.image_dir, image)
+
+    def _infra(self, name, handle):
+        firmware_activate_infra(
+            handle, version=self.version, require_user_confirmation=False,
+            observer=_DomainObserver(self, name, STAGE_INFRA))
+
+    def _blade(self, name, handle):
+        if not handle.query_classid("ComputeBlade"):
+            # a rack-only domain has no blade to activate
+            self._progress(name, STAGE_BLADE, STATUS_RUNNING, "no blades")
+            return
+        if firmware_activate_blade(handle, version=self.version,
+                                   require_user_confirmation=False) is False:
+            raise Exception("Blade activation to version %s did not "
+                            "complete" % self.version)
+
+    def _run_domain(self, name):
+        handle = self.handles[name]
+        domain = self.state["domains"][name]
+        stage_funcs = {STAGE_UPLOAD: self._upload, STAGE_INFRA: self._infra,
+                       STAGE_BLADE: self._blade}
+        self._update(name, status=STATUS_RUNNING, error=None)
+        stage = None
+        try:
+            handle.login()
+            for stage in self.stages:
+                if stage in domain["completed"]:
+                    continue
+                self._progress(name, stage, STATUS_RUNNING)
+                stage_funcs[stage](name, handle)
+                self._update(name, completed=domain["completed"] + [stage])
+                self._progress(name, stage, STATUS_DONE)
+        except Exception as e:
+            log.exception("Upgrade of domain '%s' failed", name)
+            self._update(name, status=STATUS_FAILED, error=str(e))
+            self._progress(name, stage, STATUS_FAILED, str(e))
+            return
+        finally:
+            try:
+                handle.logout()
+            except Exception:
+                pass
+        self._update(name, status=STATUS_DONE)
+
+    def _worker(self, pending):
+        while True:
+            try:
+                name = pending.get_nowait()
+            except queue.Empty:
+                return
+            self._run_domain(name)
+
+    def plan(self):
+        """
+        Computes the upgrade plan of every domain without changing any of
+        them, see firmware_plan
+
+        Returns:
+            dict: {domain name: plan}, {"error": message} for a domain that
+            could not be planned
+        """
+
+        plans = {}
+        for name in sorted(self.handles):
+            handle = self.handles[name]
+            try:
+                handle.login()
+                plans[name] = firmware_plan(
+                    handle, self.version, infra=STAGE_INFRA in self.stages,
+                    blade=STAGE_BLADE in self.stages)
+            except Exception as e:
+                log.exception("Planning of domain '%s' failed", name)
+                plans[name] = {"error": str(e)}
+            finally:
+                try:
+                    handle.logout()
+                except Exception:
+                    pass
+        return plans
+
+    def run(self):
+        """
+        Upgrades every domain not already done and waits for all of them
+
+        Returns:
+            dict: {domain name: {"status", "completed", "error"}}
+        """
+
+        pending = queue.Queue()
+        for name in sorted(self.handles):
+            if self.state["domains"][name]["status"] == STATUS_DONE:
+                self._progress(name, None, STATUS_DONE, "already upgraded")
+                continue
+            pending.put(name)
+
+        with self._lock:
+            self._save_state()
+        workers = [threading.Thread(target=self._worker, args=(pending,))
+                   for _ in range(min(self.max_workers, pending.qsize()))]
+        for worker in workers:
+            worker.daemon = True
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        return dict((name, dict(self.state["domains"][name]))
+                    for name in self.handles)
@@ -0,0 +1,213 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains a read-only planner that tells what
+firmware_auto_install would change on a UCS domain, without changing it.
+"""
+
+import logging
+
+from ucsmsdk_samples.firmware.ucsfirmware import get_firmware_file_names, \
+    _select_blade_firmware_running
+
+log = logging.getLogger('ucs')
+
+ACTION_UPLOAD = "upload"
+ACTION_UCSM = "activate-ucsm"
+ACTION_FI = "activate-fi"
+ACTION_HOST_PACK = "activate-host-pack"
+
+_PLAN_CLASS_IDS = ["FirmwareDistributable", "FirmwareDistImage",
+                   "FirmwareImage", "FirmwareComputeHostPack",
+                   "MgmtController", "FirmwareRunning", "ComputeBlade",
+                   "LsServer"]
+
+_DEFAULT_HOST_PACK_DN = "org-root/fw-host-pack-default"
+
+# requests issued by each step outside of its polling loops, see
+# firmware_add_local, firmware_activate_infra and firmware_activate_blade
+_STEP_ROUND_TRIPS = {ACTION_UPLOAD: 2, ACTION_UCSM: 3, ACTION_FI: 1,
+                     ACTION_HOST_PACK: 4}
+
+
+def _parent_dn(dn):
+    return dn.rsplit("/", 1)[0]
+
+
+def _step(action, target, current, expected, reboots, **kwargs):
+    step = {"action": action, "target": target, "current": current,
+            "expected": expected, "reboots": reboots,
+            "round_trips": _STEP_ROUND_TRIPS[action]}
+    step.update(kwargs)
+    return step
+
+
+def firmware_plan(handle, version, infra=True, blade=True):
+    """
+    Computes, without changing anything, the ordered steps that
+    firmware_auto_install would go through to bring a domain to version:
+    the bundles to upload, UCS Manager, the Fabric Interconnects and the
+    host firmware packs whose blades are below version.
+
+    The whole inventory is read with a single configResolveClasses request.
+    When the infra bundle is not on UCSM yet, the image versions it holds
+    are unknown and UCSM and the FIs are planned for activation.
+
+    Args:
+        handle (UcsHandle)
+        version (string): firmware version, e.g. "3.1(2b)"
+        infra (bool): plan the infra bundle
+        blade (bool): plan the blade bundle
+
+    Returns:
+        dict: {"version", "steps", "reboots", "round_trips"}, every step
+        being {"action", "target", "current", "expected", "reboots",
+        "round_trips"}, host pack steps also list their "blades".
+        round_trips counts the requests of the steps outside of their
+        polling loops.
+
+    Example:
+        plan = firmware_plan(handle, version="3.1(2b)")
+        print(format_firmware_plan(plan))
+    """
+
+    mos = handle.query_classids(*_PLAN_CLASS_IDS)
+    children = {}
+    for class_id in ["FirmwareDistImage", "FirmwareRunning"]:
+        for mo in mos[class_id]:
+            children.setdefault(_parent_dn(mo.dn), []).append(mo)
+    images = dict((image.name, image) for image in mos["FirmwareImage"])
+    distributables = dict((distributable.name, distributable)
+                          for distributable in mos["FirmwareDistributable"])
+
+    bundle_names = get_firmware_file_names(version)
+    steps = []
+    for bundle, wanted in (("A", infra), ("B", blade)):
+        image_name = bundle_names[bundle][0]
+        distributable = distributables.get(image_name)
+        present = distributable is not None and not [
+            dist_image for dist_image in children.get(distributable.dn, [])
+            if dist_image.image_deleted != ""]
+        if wanted and not present:
+            steps.append(_step(ACTION_UPLOAD, image_name, None,
+                               bundle_names[bundle][1], 0))
+
+    if infra:
+        steps.extend(_plan_infra(mos, children, images, distributables,
+                                 bundle_names["A"][0]))
+    if blade:
+        steps.extend(_plan_blade(mos, version))
+
+    return {"version": version, "steps": steps,
+            "reboots": sum(step["reboots"] for step in steps),
+            "round_trips": sum(step["round_trips"] for step in steps)}
+
+
+def _plan_infra(mos, children, images, distributables, bundle_name):
+    # image type -> version held by the infra bundle, None if not uploaded
+    expected = {}
+    distributable = distributables.get(bundle_name)
+    if distributable is not None:
+        for dist_image in children.get(distributable.dn, []):
+            image = images.get(dist_image.name)
+            if image is not None:
+                expected[dist_image.type] = image.version
+
+    ucsm_steps = []
+    fi_steps = []
+    for mgmt_controller in sorted(mos["MgmtController"],
+                                  key=lambda mo: mo.dn):
+        if mgmt_controller.subject == "system":
+            image_types = ["system"]
+        elif mgmt_controller.subject == "switch":
+            image_types = ["switch-software", "switch-kernel"]
+        else:
+            continue
+
+        runnings = dict((running.type, running.version) for running in
+                        children.get(mgmt_controller.dn, []))
+        current = dict((image_type, runnings.get(image_type))
+                       for image_type in image_types)
+        wanted = dict((image_type, expected.get(image_type))
+                      for image_type in image_types)
+        if current == wanted:
+            continue
+
+        target = _parent_dn(mgmt_controller.dn)
+        if mgmt_controller.subject == "system":
+            ucsm_steps.append(_step(ACTION_UCSM, target, current, wanted, 0))
+        else:
+            fi_steps.append(_step(ACTION_FI, target, current, wanted, 1))
+
+    # firmware_activate_infra sets the infra pack once, UCSM restarts on
+    # the new version before the FIs reboot
+    if fi_steps and not ucsm_steps:
+        fi_steps[0]["round_trips"] += _STEP_ROUND_TRIPS[ACTION_UCSM]
+    return ucsm_steps + fi_steps
+
+
+def _plan_blade(mos, version):
+    blade_dns = set(blade.dn for blade in mos["ComputeBlade"])
+    mgmt_controllers = dict(
+        (mgmt_controller.dn, _parent_dn(mgmt_controller.dn))
+        for mgmt_controller in mos["MgmtController"]
+        if mgmt_controller.subject == "blade" and
+        _parent_dn(mgmt_controller.dn) in blade_dns)
+    firmware_runnings = {}
+    for firmware_running in mos["FirmwareRunning"]:
+        blade_dn = mgmt_controllers.get(_parent_dn(firmware_running.dn))
+        if blade_dn is not None:
+            firmware_runnings.setdefault(blade_dn, []).append(
+                firmware_running)
+    sps = dict((sp.dn, sp) for sp in mos["LsServer"])
+    host_packs = dict((host_pack.dn, host_pack)
+                      for host_pack in mos["FirmwareComputeHostPack"])
+
+    # host firmware pack dn -> [(blade dn, running version)]
+    pack_blades = {}
+    for blade in sorted(mos["ComputeBlade"], key=lambda mo: mo.dn):
+        firmware_running = _select_blade_firmware_running(
+            firmware_runnings.get(blade.dn, []))
+        if firmware_running is None or firmware_running.version == version:
+            continue
+        host_pack_dn = _DEFAULT_HOST_PACK_DN
+        if blade.assigned_to_dn and blade.assigned_to_dn in sps:
+            host_pack_dn = sps[blade.assigned_to_dn].oper_host_fw_policy_name
+        pack_blades.setdefault(host_pack_dn, []).append(
+            (blade.dn, firmware_running.version))
+
+    steps = []
+    for host_pack_dn in sorted(pack_blades):
+        host_pack = host_packs.get(host_pack_dn)
+        blades = pack_blades[host_pack_dn]
+        steps.append(_step(
+            ACTION_HOST_PACK, host_pack_dn,
+            host_pack.blade_bundle_version if host_pack else None,
+            version + "B", len(blades),
+            blades=[blade_dn for blade_dn, _ in blades]))
+    return steps
+
+
+def format_firmware_plan(plan):
+    """
+    Returns a plan as a text table, one line per step
+    """
+
+    lines = ["Upgrade to %s: %d steps, %d reboots, %d round-trips" % (
+        plan["version"], len(plan["steps"]), plan["reboots"],
+        plan["round_trips"])]
+    for step in plan["steps"]:
+        lines.append("  %-20s %-45s %3d reboots" % (
+            step["action"], step["target"], step["reboots"]))
+    return "\n".join(lines)
@@ -0,0 +1,193 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains an index of a local firmware repository, the
+directory holding the UCS bundles, so that lookups by version do not touch
+the filesystem.
+"""
+
+import fnmatch
+import json
+import logging
+import os
+import re
+import threading
+
+from ucsmsdk_samples.firmware.ucsfirmware import firmware_image_md5
+
+log = logging.getLogger('ucs')
+
+# ucs-k9-bundle-infra.3.1.2b.A.bin is bundle A of version 3.1(2b), see
+# get_firmware_file_names
+_BUNDLE_RE = re.compile(r'^ucs-k9-bundle-[a-z-]+\.(?P<major>\d+\.\d+)\.'
+                        r'(?P<build>[^.]+)\.(?P<bundle>[A-Z])\.[a-z]+$')
+
+
+def parse_bundle_name(image_name):
+    """
+    Returns (version, bundle) of a bundle file name, None if the name is
+    not the one of a UCS bundle
+
+    Example:
+        parse_bundle_name("ucs-k9-bundle-b-series.3.1.2b.B.bin") returns
+        ("3.1(2b)", "B")
+    """
+
+    match = _BUNDLE_RE.match(image_name)
+    if match is None:
+        return None
+    return ("%s(%s)" % (match.group("major"), match.group("build")),
+            match.group("bundle"))
+
+
+class FirmwareRepository(object):
+    """
+    Indexes the UCS bundles of image_dir by version and bundle type, with
+    their size and md5.
+
+    The directory is scanned when the index is built and on scan() only. A
+    rescan reads the size and mtime of every file but hashes only the new
+    or changed ones. The index is saved to index_file when given, and read
+    back from it instead of scanning when it exists.
+
+    Args:
+        image_dir (string): firmware repository
+        index_file (string): path of the json index, None keeps the index
+            in memory only
+        checksum (bool): record the md5 of every bundle
+
+    Example:
+        repository = FirmwareRepository("/nfs/ucs-images",
+                                        index_file="/nfs/ucs-images.json")
+        repository.find("3.2(3*)")
+        firmware_auto_install(handle, version="3.2(3a)",
+                              image_dir=repository.image_dir,
+                              repository=repository)
+    """
+
+    def __init__(self, image_dir, index_file=None, checksum=True):
+        self.image_dir = image_dir
+        self.index_file = index_file
+        self.checksum = checksum
+        self._lock = threading.Lock()
+        self._images = {}
+        self._versions = {}
+        if index_file and os.path.exists(index_file):
+            with open(index_file) as index_fh:
+                index = json.load(index_fh)
+            if index.get("image_dir") == image_dir:
+                self._set_images(index["images"])
+                return
+        self.scan()
+
+    def _set_images(self, images):
+        versions = {}
+        for image_name, entry in images.items():
+            versions.setdefault(entry["version"], {})[entry["bundle"]] = \
+                image_name
+        with self._lock:
+            self._images = images
+            self._versions = versions
+
+    def _save(self):
+        if not self.index_file:
+            return
+        tmp_file = self.index_file + ".tmp"
+        with open(tmp_file, "w") as index_fh:
+            json.dump({"image_dir": self.image_dir, "images": self._images},
+                      index_fh, indent=1, sort_keys=True)
+        # os.replace is atomic on every platform, py2 only has os.rename
+        getattr(os, "replace", os.rename)(tmp_file, self.index_file)
+
+    def scan(self):
+        """
+        Rescans image_dir, hashing only the bundles that are new or changed
+
+        Returns:
+            int: number of bundles indexed
+        """
+
+        images = {}
+        for image_name in os.listdir(self.image_dir):
+            parsed = parse_bundle_name(image_name)
+            if parsed is None:
+                continue
+            path = os.path.join(self.image_dir, image_name)
+            stat = os.stat(path)
+            entry = self._images.get(image_name)
+            if entry is None or entry["size"] != stat.st_size or \
+                    entry["mtime"] != stat.st_mtime:
+                entry = {"version": parsed[0], "bundle": parsed[1],
+                         "size": stat.st_size, "mtime": stat.st_mtime,
+                         "md5": None}
+            if self.checksum and entry["md5"] is None:
+                log.debug("Hashing '%s'", path)
+                entry["md5"] = firmware_image_md5(path)
+            images[image_name] = entry
+
+        self._set_images(images)
+        self._save()
+        log.debug("Indexed %d bundles in '%s'", len(images), self.image_dir)
+        return len(images)
+
+    def has(self, image_name):
+        """
+        Returns True if the repository holds the bundle image_name
+        """
+
+        return image_name in self._images
+
+    def image(self, image_name):
+        """
+        Returns {"version", "bundle", "size", "mtime", "md5"} of a bundle,
+        None if it is not in the repository
+        """
+
+        entry = self._images.get(image_name)
+        return dict(entry) if entry is not None else None
+
+    def bundle(self, version, bundle):
+        """
+        Returns the file name of a bundle, None if it is not in the
+        repository
+
+        Args:
+            version (string): firmware version, e.g. "3.1(2b)"
+            bundle (string): "A", "B" or "C"
+        """
+
+        return self._versions.get(version, {}).get(bundle)
+
+    def bundles(self, version):
+        """
+        Returns {bundle: file name} of the bundles of a version
+        """
+
+        return dict(self._versions.get(version, {}))
+
+    def find(self, pattern="*"):
+        """
+        Returns the bundles of the versions matching a shell style pattern
+
+        Args:
+            pattern (string): e.g. "3.2(3*)"
+
+        Returns:
+            dict: {version: {bundle: file name}}
+        """
+
+        with self._lock:
+            versions = self._versions
+        return dict((version, dict(bundles)) for version, bundles in
+                    versions.items() if fnmatch.fnmatchcase(version, pattern))
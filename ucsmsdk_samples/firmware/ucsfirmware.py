@@ -11,13 +11,22 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import copy
+import hashlib
+import json
 import logging
 import os
+import socket
+import threading
 import time
-import datetime
 import sys
 from imp import reload
 
+try:
+    from urllib.parse import urlparse
+except ImportError:
+    from urlparse import urlparse
+
 from ucsmsdk.utils.ccoimage import get_ucs_cco_image_list
 from ucsmsdk.utils.ccoimage import get_ucs_cco_image
 
@@ -27,10 +36,21 @@ from ucsmsdk.mometa.firmware.FirmwareDownloader import FirmwareDownloader
 from ucsmsdk.mometa.firmware.FirmwareDownloader import FirmwareDownloaderConsts
 from ucsmsdk.mometa.firmware.FirmwareAck import FirmwareAckConsts
 
+from ucsmsdk_samples.utils.poller import Poller, OUTCOME_DONE, \
+    OUTCOME_FAILED, OUTCOME_TIMEOUT
+from ucsmsdk_samples.utils.telemetry import emit
+
 log = logging.getLogger('ucs')
 
+# (domain, bundle type, bundle version, image types) -> firmware map
+_firmware_version_cache = {}
+
+# (path, size, mtime) -> md5 of a local image
+_image_md5_cache = {}
 
-def firmware_available(username, password, mdf_id_list=None, proxy=None):
+
+def firmware_available(username, password, mdf_id_list=None, proxy=None,
+                       cache=None):
     """
     Returns the names of firmware images available on cco
 
@@ -39,6 +59,7 @@ def firmware_available(username, password, mdf_id_list=None, proxy=None):
         password (string): cec password
         mdf_id_list (list of string): mdf ids
         proxy (string): proxy address
+        cache (CcoImageCache): serves the image listing while it is fresh
 
     Returns:
         list
@@ -47,6 +68,10 @@ def firmware_available(username, password, mdf_id_list=None, proxy=None):
         firmware_available(username="cecuser", password="cecpasswd")
     """
 
+    if cache is not None:
+        return sorted(cache.index(username, password,
+                                  mdf_id_list=mdf_id_list, proxy=proxy))
+
     images = get_ucs_cco_image_list(username=username, password=password,
                                     mdf_id_list=mdf_id_list, proxy=proxy)
 
@@ -81,8 +106,117 @@ def get_firmware_bundles(handle, bundle_type=None):
     return bundles
 
 
+def _firmware_version_cache_key(handle, bundle_type, bundle_version,
+                                image_types):
+    return (handle.uri, bundle_type, bundle_version,
+            tuple(sorted(image_types)))
+
+
+def firmware_version_cache_clear(handle=None):
+    """
+    Clears the memoized bundle to image version maps, of one domain or of
+    all of them. Called whenever a bundle is added or removed.
+
+    Args:
+        handle (UcsHandle): domain to clear, all domains if None
+
+    Returns:
+        None
+
+    Example:
+        firmware_version_cache_clear(handle)
+    """
+
+    for key in list(_firmware_version_cache):
+        if handle is None or key[0] == handle.uri:
+            _firmware_version_cache.pop(key, None)
+
+
+def get_bundle_firmware_versions(handle, bundle_type, bundle_versions,
+                                 image_types, use_cache=False):
+    """
+    Return the image firmware versions of several bundle versions, read
+    with a single configResolveClasses request for the bundles, their
+    images and the image versions
+
+    Args:
+        handle (UcsHandle)
+        bundle_type (string): e.g. "infrastructure-bundle"
+        bundle_versions (list of string): versions
+        image_types (list of string)
+        use_cache (bool): by default False. If True, the maps resolved
+            earlier for the same domain, bundle and image types are reused
+            and only the other versions are read.
+
+    Returns:
+        dict: {bundle_version: {image_type: {'image_name', 'version'}}}
+
+    Raises:
+        Exception if an image type is not present in a bundle
+
+    Example:
+        get_bundle_firmware_versions(handle, "b-series-bundle",
+                                     ["2.2(6f)", "3.1(2b)"],
+                                     ["blade-controller"])
+    """
+
+    firmware_maps = {}
+    unresolved = []
+    for bundle_version in bundle_versions:
+        key = _firmware_version_cache_key(handle, bundle_type,
+                                          bundle_version, image_types)
+        if use_cache and key in _firmware_version_cache:
+            firmware_maps[bundle_version] = copy.deepcopy(
+                _firmware_version_cache[key])
+        else:
+            unresolved.append(bundle_version)
+    if not unresolved:
+        return firmware_maps
+
+    mos = handle.query_classids("FirmwareDistributable", "FirmwareDistImage",
+                                "FirmwareImage")
+    bundles = [bundle for bundle in mos["FirmwareDistributable"]
+               if bundle.type == bundle_type]
+    # bundle dn -> {image type: image name}
+    bundle_images = {}
+    for dist_image in mos["FirmwareDistImage"]:
+        bundle_images.setdefault(dist_image.dn.rsplit("/", 1)[0], {})[
+            dist_image.type] = dist_image.name
+    image_versions = dict((image.name, image.version)
+                          for image in mos["FirmwareImage"])
+
+    for bundle_version in unresolved:
+        images = {}
+        for bundle in bundles:
+            log.debug("Bundle type: %s, version: %s. Bundle version: %s",
+                      bundle.type, bundle.version, bundle_version)
+            if bundle.version.startswith(bundle_version):
+                images = bundle_images.get(bundle.dn, {})
+                break
+
+        firmware_map = {}
+        for image_type in image_types:
+            image_name = images.get(image_type)
+            if image_name is None:
+                raise Exception("Infra image type '%s' version '%s' is not "
+                                "present", image_type, bundle_version)
+            firmware_map[image_type] = {
+                'image_name': image_name,
+                'version': image_versions.get(image_name)}
+            log.debug("Found bundle/image version mapping. Image type: %s,"
+                      " img version: %s, bundle: %s", image_type,
+                      firmware_map[image_type]['version'], bundle_version)
+
+        key = _firmware_version_cache_key(handle, bundle_type,
+                                          bundle_version, image_types)
+        _firmware_version_cache[key] = copy.deepcopy(firmware_map)
+        firmware_maps[bundle_version] = firmware_map
+    return firmware_maps
+
+
 def get_blade_firmware_version(handle, bundle_version,
-                               image_types=['blade-controller']):
+                               image_types=['blade-controller'],
+                               use_cache=False):
     """
     Return the image firmware versions given the bundle version
 
@@ -90,6 +224,8 @@ def get_blade_firmware_version(handle, bundle_version,
         handle (UcsHandle)
         bundle_version (string): version
         image_types (list of string)
+        use_cache (bool): by default False. If True, a map resolved
+            earlier for the same domain, bundle and image types is reused.
 
     Returns:
         dict
@@ -98,57 +234,15 @@ def get_blade_firmware_version(handle, bundle_version,
         get_blade_firmware_version(handle, bundle_version="2.2(6f)")
     """
 
-    bundles = get_firmware_bundles(handle,
-                                   bundle_type='b-series-bundle')
-    firmware_map = {}
-    for image_type in image_types:
-        firmware_map[image_type] = {'image_name': None, 'version': None}
-
-    for bundle in bundles:
-        log.debug("Bundle type: %s, version: %s. Bundle version: %s",
-                  bundle.type, bundle.version, bundle_version)
-        if bundle.type == 'b-series-bundle' and \
-                bundle.version.startswith(bundle_version):
-            dist_images = handle.query_children(in_mo=bundle,
-                                                class_id="FirmwareDistImage")
-            for dist_image in dist_images:
-                # print dist_image
-                for image_type in image_types:
-                    if dist_image.type == image_type:
-                        firmware_map[image_type]['image_name'] = \
-                            dist_image.name
-                        log.debug('Bundle version %s, infra firmware image '
-                                  'name: %s', bundle_version, dist_image.name)
-            break
-
-    filter_str = None
-    for image_type in image_types:
-        if firmware_map[image_type]['image_name'] is None:
-            raise Exception("Infra image type '%s' version '%s' is not "
-                            "present", image_type, bundle_version)
-        else:
-            str_ = '(name, %s, type="eq")' % (
-                firmware_map[image_type]['image_name'])
-            if filter_str is None:
-                filter_str = str_
-            else:
-                filter_str = filter_str + " or " + str_
-
-    firmware_images = handle.query_classid(class_id="FirmwareImage",
-                                           filter_str=filter_str)
-    for firmware_image in firmware_images:
-        for image_type in image_types:
-            if firmware_image.name == firmware_map[image_type]['image_name']:
-                log.debug("Found bundle/image version mapping. Image type: %s,"
-                          " img version: %s, bundle: %s",
-                          image_type, firmware_image.version, bundle_version)
-                firmware_map[image_type]['version'] = firmware_image.version
-    return firmware_map
+    return get_bundle_firmware_versions(
+        handle, 'b-series-bundle', [bundle_version], image_types,
+        use_cache=use_cache)[bundle_version]
 
 
 def get_infra_firmware_version(handle, bundle_version,
                                image_types=['system', 'switch-kernel',
-                                            'switch-software']):
+                                            'switch-software'],
+                               use_cache=False):
     """
     Return the image firmware versions given the bundle version
 
@@ -156,6 +250,8 @@ def get_infra_firmware_version(handle, bundle_version,
         handle (UcsHandle)
         bundle_version (string): version
         image_types (list of string)
+        use_cache (bool): by default False. If True, a map resolved
+            earlier for the same domain, bundle and image types is reused.
 
     Returns:
         dict
@@ -164,50 +260,9 @@ def get_infra_firmware_version(handle, bundle_version,
         get_infra_firmware_version(handle, bundle_version="2.2(6f)")
     """
 
-    bundles = get_firmware_bundles(handle, bundle_type='infrastructure-bundle')
-    firmware_map = {}
-    for image_type in image_types:
-        firmware_map[image_type] = {'image_name': None, 'version': None}
-
-    for bundle in bundles:
-        log.debug("Bundle type: %s, version: %s. Bundle version: %s",
-                  bundle.type, bundle.version, bundle_version)
-        if bundle.type == 'infrastructure-bundle' and \
-                bundle.version.startswith(bundle_version):
-            dist_images = handle.query_children(in_mo=bundle,
-                                                class_id="FirmwareDistImage")
-            for dist_image in dist_images:
-                for image_type in image_types:
-                    if dist_image.type == image_type:
-                        firmware_map[image_type]['image_name'] = \
-                            dist_image.name
-                        log.debug('Bundle version %s, infra firmware image '
-                                  'name: %s', bundle_version, dist_image.name)
-            break
-
-    filter_str = None
-    for image_type in image_types:
-        if firmware_map[image_type]['image_name'] is None:
-            raise Exception("Infra image type '%s' version '%s' is not "
-                            "present", image_type, bundle_version)
-        else:
-            str_ = '(name, %s, type="eq")' % (
-                firmware_map[image_type]['image_name'])
-            if filter_str is None:
-                filter_str = str_
-            else:
-                filter_str = filter_str + " or " + str_
-
-    firmware_images = handle.query_classid(class_id="FirmwareImage",
-                                           filter_str=filter_str)
-    for firmware_image in firmware_images:
-        for image_type in image_types:
-            if firmware_image.name == firmware_map[image_type]['image_name']:
-                log.debug("Found bundle/image version mapping. Image type: %s,"
-                          " img version: %s, bundle: %s",
-                          image_type, firmware_image.version, bundle_version)
-                firmware_map[image_type]['version'] = firmware_image.version
-    return firmware_map
+    return get_bundle_firmware_versions(
+        handle, 'infrastructure-bundle', [bundle_version], image_types,
+        use_cache=use_cache)[bundle_version]
 
 
 def has_firmware_bundle(handle, version):
@@ -235,7 +290,7 @@ def has_firmware_bundle(handle, version):
 
 
 def firmware_download(image_name, username, password, download_dir,
-                      mdf_id_list=None, proxy=None):
+                      mdf_id_list=None, proxy=None, cache=None):
     """
     Downloads the firmware image from cco
 
@@ -246,6 +301,7 @@ def firmware_download(image_name, username, password, download_dir,
         download_dir (string): path of download directory
         mdf_id_list (list of string): mdf ids
         proxy (string): proxy address
+        cache (CcoImageCache): serves the image listing while it is fresh
 
     Returns:
         None
@@ -259,12 +315,13 @@ def firmware_download(image_name, username, password, download_dir,
                           download_dir="/home/imagedir")
     """
 
-    images = get_ucs_cco_image_list(username=username, password=password,
-                                    mdf_id_list=mdf_id_list, proxy=proxy)
-
-    image_dict = {}
-    for image in images:
-        image_dict[image.image_name] = image
+    if cache is not None:
+        image_dict = cache.index(username, password, mdf_id_list=mdf_id_list,
+                                 proxy=proxy)
+    else:
+        images = get_ucs_cco_image_list(username=username, password=password,
+                                        mdf_id_list=mdf_id_list, proxy=proxy)
+        image_dict = dict((image.image_name, image) for image in images)
 
     if image_name not in image_dict:
         raise ValueError("Image not available")
@@ -274,7 +331,8 @@ def firmware_download(image_name, username, password, download_dir,
     get_ucs_cco_image(image, file_dir=download_dir, proxy=proxy)
 
 
-def firmware_add_local(handle, image_dir, image_name, timeout=10 * 60):
+def firmware_add_local(handle, image_dir, image_name, timeout=10 * 60,
+                       progress=None, checksum=False):
     """
     Downloads the firmware image on ucsm from local server
 
@@ -282,6 +340,11 @@ def firmware_add_local(handle, image_dir, image_name, timeout=10 * 60):
         image_dir (string): path of download directory
         image_name (string): firmware image name
         timeout (number): timeout in seconds
+        progress (callable): progress(image_name, sent, total) called for
+                             every chunk read from the image file
+        checksum (bool): compute the md5 of the image while streaming it,
+                         firmware_image_md5 then returns it without reading
+                         the file again
 
     Returns:
         FirmwareDownloader: Managed Object
@@ -305,6 +368,82 @@ def firmware_add_local(handle, image_dir, image_name, timeout=10 * 60):
     if not os.path.exists(file_path):
         raise IOError("File does not exist")
 
+    firmware_downloader = _upload_image(handle, image_dir, image_name,
+                                        progress=progress,
+                                        checksum=checksum)
+
+    poller = Poller(timeout=timeout, initial_interval=2, max_interval=30,
+                    name="download of '%s'" % image_name)
+    firmware_downloader = poller.poll(
+        lambda: handle.query_dn(firmware_downloader.dn),
+        done=lambda mo: mo.transfer_state ==
+        FirmwareDownloaderConsts.TRANSFER_STATE_DOWNLOADED,
+        fail=lambda mo: mo.transfer_state ==
+        FirmwareDownloaderConsts.TRANSFER_STATE_FAILED)
+    emit("download.end", domain=handle.uri, image=image_name,
+         outcome=poller.outcome, seconds=poller.metrics["elapsed"])
+    if poller.outcome == "failed":
+        raise Exception("Download of '%s' failed. Error: %s" %
+                        (image_name,
+                         firmware_downloader.fsm_rmt_inv_err_descr))
+    if poller.outcome == "timeout":
+        raise Exception("Download of '%s' timed out" % image_name)
+
+    firmware_version_cache_clear(handle)
+
+    #reset encoding
+    if sys.version_info[:2] <= (2, 7):
+        # If Python 2.7 or older, then set 'ISO-8859-1' as default encoding
+        reload(sys)
+        sys.setdefaultencoding(encoding)
+
+    return firmware_downloader
+
+
+class _UploadProgress(object):
+    """
+    ucsgenutils progress object that reports the bytes sent of one image
+    to call_back(image_name, bytes_sent, total_bytes), and computes their
+    md5 when given the path of the image
+    """
+
+    def __init__(self, image_name, call_back=None, file_path=None):
+        self.image_name = image_name
+        self.call_back = call_back
+        self.sent = 0
+        self.md5 = None
+        self._image = None
+        if file_path is not None:
+            self.md5 = hashlib.md5()
+            self._image = open(file_path, "rb")
+
+    def update(self, total, size, name=None):
+        if self._image is not None:
+            # the stream hands out sizes only, the chunk it has just read
+            # is read again in step with it, from the page cache
+            self.md5.update(self._image.read(size))
+        # the stream reports the size it was asked for, not what it read
+        self.sent = min(self.sent + size, total)
+        if self.call_back is not None:
+            self.call_back(self.image_name, self.sent, total)
+
+    def close(self):
+        if self._image is not None:
+            self._image.close()
+            self._image = None
+
+
+def _upload_image(handle, image_dir, image_name, progress=None,
+                  checksum=False):
+    """
+    Streams a local image to UCSM and starts its FirmwareDownloader. With
+    checksum, the md5 computed on the way is remembered for
+    firmware_image_md5
+
+    Returns:
+        FirmwareDownloader: Managed Object
+    """
+
     top_system = TopSystem()
     firmware_catalogue = FirmwareCatalogue(parent_mo_or_dn=top_system)
     firmware_downloader = FirmwareDownloader(
@@ -316,33 +455,307 @@ def firmware_add_local(handle, image_dir, image_name, timeout=10 * 60):
         FirmwareDownloaderConsts.ADMIN_STATE_RESTART
 
     uri_suffix = "operations/file-%s/image.txt" % image_name
-    handle.file_upload(url_suffix=uri_suffix,
-                       file_dir=image_dir,
-                       file_name=image_name)
+    file_path = os.path.join(image_dir, image_name)
+    key = _image_md5_key(file_path)
+    size = key[1]
+    emit("upload.start", domain=handle.uri, image=image_name, size=size)
+    start = time.time()
+    if progress is None and not checksum:
+        handle.file_upload(url_suffix=uri_suffix,
+                           file_dir=image_dir,
+                           file_name=image_name)
+    else:
+        upload_progress = _UploadProgress(
+            image_name, progress, file_path if checksum else None)
+        try:
+            handle.file_upload(url_suffix=uri_suffix,
+                               file_dir=image_dir,
+                               file_name=image_name,
+                               progress=upload_progress)
+        finally:
+            upload_progress.close()
+        if checksum and _image_md5_key(file_path) == key:
+            _image_md5_cache[key] = upload_progress.md5.hexdigest()
+    seconds = time.time() - start
+    emit("upload.end", domain=handle.uri, image=image_name, size=size,
+         seconds=seconds,
+         bytes_per_second=size / seconds if seconds else None)
 
     handle.add_mo(firmware_downloader, modify_present=True)
     # handle.set_dump_xml()
     handle.commit()
+    return firmware_downloader
 
-    start = datetime.datetime.now()
-    while not firmware_downloader.transfer_state == \
-            FirmwareDownloaderConsts.TRANSFER_STATE_DOWNLOADED:
-        firmware_downloader = handle.query_dn(firmware_downloader.dn)
-        if firmware_downloader.transfer_state == \
-                FirmwareDownloaderConsts.TRANSFER_STATE_FAILED:
-            raise Exception("Download of '%s' failed. Error: %s" %
-                            (image_name,
-                             firmware_downloader.fsm_rmt_inv_err_descr))
-        if (datetime.datetime.now() - start).total_seconds() > timeout:
-            raise Exception("Download of '%s' timed out" % image_name)
 
-    #reset encoding
-    if sys.version_info[:2] <= (2, 7):
-        # If Python 2.7 or older, then set 'ISO-8859-1' as default encoding
-        reload(sys)
-        sys.setdefaultencoding(encoding)
+def firmware_add_local_parallel(handle, image_dir, image_names,
+                                progress=None, timeout=10 * 60):
+    """
+    Uploads several firmware images to ucsm at the same time, each over its
+    own session, and waits for all the downloads together
 
-    return firmware_downloader
+    Args:
+        handle (UcsHandle)
+        image_dir (string): path of download directory
+        image_names (list): firmware image names
+        progress (callable): progress(image_name, bytes_sent, total_bytes),
+            called for every chunk streamed from disk
+        timeout (number): timeout in seconds, for all the downloads
+
+    Returns:
+        dict: {image_name: FirmwareDownloader Managed Object}
+
+    Raises:
+        Exception if an upload or a download fails or times out
+
+    Example:
+        firmware_add_local_parallel(
+            handle, image_dir="/home/imagedir",
+            image_names=["ucs-k9-bundle-infra.2.2.5b.A.bin",
+                         "ucs-k9-bundle-b-series.2.2.5b.B.bin"])
+    """
+
+    from ucsmsdk.ucshandle import UcsHandle
+
+    for image_name in image_names:
+        if not os.path.exists(os.path.join(image_dir, image_name)):
+            raise IOError("File '%s' does not exist" % image_name)
+
+    downloaders = {}
+    errors = {}
+    # image name -> time its upload ended, then its download
+    uploaded = {}
+    downloaded = {}
+
+    # the driver headers of a handle are not thread safe, every upload gets
+    # a clone of the handle, without its cookie so it opens its own session
+    frozen = json.loads(handle.freeze())
+    frozen.update(cookie=None, session_id=None, auto_refresh=False)
+    frozen = json.dumps(frozen)
+
+    def upload(image_name):
+        session = UcsHandle.unfreeze(frozen)
+        try:
+            session.login()
+            downloaders[image_name] = _upload_image(session, image_dir,
+                                                    image_name, progress)
+            uploaded[image_name] = time.time()
+        except Exception as e:
+            log.exception("Upload of '%s' failed", image_name)
+            errors[image_name] = e
+        finally:
+            session.logout()
+
+    threads = [threading.Thread(target=upload, args=(image_name,))
+               for image_name in image_names]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise Exception("Upload of %s failed: %s" %
+                        (sorted(errors), errors[sorted(errors)[0]]))
+
+    dns = dict((downloader.dn, image_name) for image_name, downloader in
+               downloaders.items())
+
+    def transfer_states():
+        for dn, mo in handle.query_dns(list(dns)).items():
+            if mo is not None:
+                downloaders[dns[dn]] = mo
+        states = dict((image_name, downloader.transfer_state) for
+                      image_name, downloader in downloaders.items())
+        for image_name, state in states.items():
+            if image_name in downloaded:
+                continue
+            if state == FirmwareDownloaderConsts.TRANSFER_STATE_DOWNLOADED:
+                downloaded[image_name] = (time.time(), OUTCOME_DONE)
+            elif state == FirmwareDownloaderConsts.TRANSFER_STATE_FAILED:
+                downloaded[image_name] = (time.time(), OUTCOME_FAILED)
+        return states
+
+    poller = Poller(timeout=timeout, initial_interval=2, max_interval=30,
+                    name="download of %d images" % len(image_names))
+    states = poller.poll(
+        transfer_states,
+        done=lambda states: all(
+            state == FirmwareDownloaderConsts.TRANSFER_STATE_DOWNLOADED
+            for state in states.values()),
+        fail=lambda states: any(
+            state == FirmwareDownloaderConsts.TRANSFER_STATE_FAILED
+            for state in states.values()))
+    for image_name in image_names:
+        end, outcome = downloaded.get(image_name,
+                                      (time.time(), OUTCOME_TIMEOUT))
+        emit("download.end", domain=handle.uri, image=image_name,
+             outcome=outcome, seconds=end - uploaded[image_name])
+    if poller.outcome == "failed":
+        failed = sorted(image_name for image_name, state in states.items()
+                        if state ==
+                        FirmwareDownloaderConsts.TRANSFER_STATE_FAILED)
+        raise Exception("Download of %s failed. Error: %s" %
+                        (failed,
+                         downloaders[failed[0]].fsm_rmt_inv_err_descr))
+    if poller.outcome == "timeout":
+        raise Exception("Download of %s timed out" % sorted(image_names))
+
+    firmware_version_cache_clear(handle)
+    return downloaders
+
+
+def _image_md5_key(file_path):
+    stat = os.stat(file_path)
+    return (os.path.abspath(file_path), stat.st_size, stat.st_mtime)
+
+
+def firmware_image_md5(file_path, block_size=1024 * 1024):
+    """
+    Returns the md5 of a local firmware image. The file is read in fixed
+    size blocks, never whole, and the digest is remembered until the file
+    changes
+
+    Args:
+        file_path (string): path of the image
+        block_size (int): size in bytes of the read buffer
+
+    Returns:
+        string: hex digest
+
+    Example:
+        firmware_image_md5("/home/imagedir/ucs-k9-bundle-infra.3.1.2b.A.bin")
+    """
+
+    key = _image_md5_key(file_path)
+    if key in _image_md5_cache:
+        return _image_md5_cache[key]
+
+    md5 = hashlib.md5()
+    buf = bytearray(block_size)
+    view = memoryview(buf)
+    with open(file_path, "rb") as image:
+        while True:
+            size = image.readinto(buf)
+            if not size:
+                break
+            md5.update(view[:size])
+    _image_md5_cache[key] = md5.hexdigest()
+    return _image_md5_cache[key]
+
+
+def _firmware_distributable(handle, image_name):
+    """
+    Returns the FirmwareDistributable of an image if ucsm holds it and none
+    of its images were deleted, None otherwise
+    """
+
+    dn = "sys/fw-catalogue/distrib-" + image_name
+    mos = handle.query_dn(dn, hierarchy=True)
+    if not mos:
+        return None
+
+    distributable = None
+    for mo in mos:
+        if mo.get_class_id() == "FirmwareDistributable":
+            distributable = mo
+        elif mo.get_class_id() == "FirmwareDistImage" and \
+                mo.image_deleted != "":
+            return None
+    return distributable
+
+
+def firmware_add_local_verified(handle, image_dir, image_name,
+                                timeout=10 * 60, retries=2, progress=None):
+    """
+    Uploads a local firmware image unless ucsm already holds an intact copy
+    of it, then checks the md5 reported by ucsm against the local file and
+    uploads again on a mismatch or a failed transfer.
+
+    The md5 of the local image is computed while it streams to UCSM.
+
+    The md5sum of FirmwareDistributable is reported from UCSM 3.2(1d) on.
+    Older releases do not report it, an image present on them is trusted
+    as is_image_available_on_ucsm does, with a warning and an
+    "image.verify" telemetry event of outcome "unverified" rather than
+    "verified".
+
+    Args:
+        handle (UcsHandle)
+        image_dir (string): path of download directory
+        image_name (string): firmware image name
+        timeout (number): timeout in seconds of every transfer
+        retries (int): number of uploads attempted after the first one
+        progress (callable): progress(image_name, sent, total) called for
+                             every chunk read from the image file
+
+    Returns:
+        FirmwareDistributable: Managed Object
+
+    Raises:
+        IOError if the file does not exist
+        Exception if no upload produced an intact image
+
+    Example:
+        firmware_add_local_verified(
+            handle, image_dir="/home/imagedir",
+            image_name="ucs-k9-bundle-c-series.2.2.5b.C.bin")
+    """
+
+    file_path = os.path.join(image_dir, image_name)
+    if not os.path.exists(file_path):
+        raise IOError("File does not exist")
+
+    def checked(distributable):
+        if distributable.md5sum:
+            outcome = "verified"
+        else:
+            outcome = "unverified"
+            log.warning("UCSM reports no md5 of image '%s', its integrity "
+                        "is not verified", image_name)
+        emit("image.verify", domain=handle.uri, image=image_name,
+             outcome=outcome)
+        return distributable
+
+    md5sum = None
+    distributable = _firmware_distributable(handle, image_name)
+    if distributable is not None:
+        if distributable.md5sum:
+            md5sum = firmware_image_md5(file_path)
+        if distributable.md5sum in (None, "", md5sum):
+            log.debug("Image '%s' is already on UCSM, skipping upload",
+                      image_name)
+            return checked(distributable)
+
+    error = None
+    for attempt in range(retries + 1):
+        if distributable is not None:
+            log.debug("Image '%s' on UCSM has md5 %s, expected %s",
+                      image_name, distributable.md5sum, md5sum)
+        try:
+            # the md5 is computed while the image streams
+            firmware_add_local(handle, image_dir, image_name,
+                               timeout=timeout, progress=progress,
+                               checksum=True)
+        except Exception as e:
+            log.debug("Upload %d of '%s' failed: %s", attempt + 1,
+                      image_name, str(e))
+            error = e
+            distributable = None
+            continue
+
+        md5sum = firmware_image_md5(file_path)
+        distributable = _firmware_distributable(handle, image_name)
+        if distributable is None:
+            error = Exception("Image '%s' is missing from the catalogue" %
+                              image_name)
+        elif distributable.md5sum in (None, "", md5sum):
+            return checked(distributable)
+        else:
+            emit("image.verify", domain=handle.uri, image=image_name,
+                 outcome="mismatch")
+            error = Exception("Image '%s' md5 mismatch, ucsm %s, local %s" %
+                              (image_name, distributable.md5sum, md5sum))
+
+    raise Exception("Upload of '%s' failed after %d attempts: %s" %
+                    (image_name, retries + 1, error))
 
 
 def firmware_add_remote(handle, file_name, remote_path, protocol, server,
@@ -401,6 +814,7 @@ def firmware_add_remote(handle, file_name, remote_path, protocol, server,
     handle.add_mo(firmware_downloader)
     # handle.set_dump_xml()
     handle.commit()
+    firmware_version_cache_clear(handle)
     return firmware_downloader
 
 
@@ -437,15 +851,44 @@ def firmware_remove(handle, image_name):
     handle.remove_mo(mo)
     # handle.set_dump_xml()
     handle.commit()
+    firmware_version_cache_clear(handle)
 
 
-def validate_connection(handle, timeout=15 * 60):
+def _probe_ucsm(handle, timeout):
+    """
+    Returns True if the UCSM port accepts a TCP connection within timeout
+    seconds. Always True behind a proxy, the FI may not be reachable
+    directly.
+    """
+
+    if handle.proxy:
+        return True
+    uri = urlparse(handle.uri)
+    port = uri.port or (443 if uri.scheme == "https" else 80)
+    try:
+        sock = socket.create_connection((uri.hostname, port), timeout)
+    except (socket.error, socket.timeout) as e:
+        log.debug("UCSM %s:%d is not reachable: %s", uri.hostname, port,
+                  str(e))
+        return False
+    sock.close()
+    return True
+
+
+def validate_connection(handle, timeout=15 * 60, probe_timeout=0.5):
     """
     Montiors UCSM Connection, if connection exists return True else False
 
+    Every attempt first probes the UCSM port with a TCP connect, so that an
+    FI still rebooting costs probe_timeout instead of an HTTP timeout. Once
+    UCSM answers, the session cookie is validated, then refreshed, and a
+    new login happens only if both fail. Attempts back off from 1 to 30
+    seconds, the duration of each is in the debug log.
+
     Args:
         handle (UcsHandle)
         timeout (number): timeout in seconds
+        probe_timeout (number): timeout in seconds of the TCP probe
 
     Returns:
         True/False(bool)
@@ -458,31 +901,54 @@ def validate_connection(handle, timeout=15 * 60):
                             file_name="ucs-k9-bundle-c-series.2.2.5b.C.bin")
     """
 
-    connected = False
-    start = datetime.datetime.now()
-    while not connected:
+    def reconnect():
+        if not _probe_ucsm(handle, probe_timeout):
+            return "unreachable"
+
+        if handle.cookie:
+            # the session survives a UCSM process restart on the same FI
+            if handle.is_valid():
+                return "reused"
+            try:
+                if handle._refresh():
+                    return "refreshed"
+            except Exception as e:
+                log.debug("Session refresh failed: %s", str(e))
+
         try:
             # If the session is already established,
             # this will validate the session
-            connected = handle.login()
+            if handle.login():
+                return "login"
         except Exception as e:
             # UCSM may been in the middle of activation,
             # hence connection would fail
             log.debug("Login to UCSM failed: %s", str(e))
 
-        if not connected:
-            try:
-                log.debug("Login to UCS Manager, elapsed time %ds",
-                          (datetime.datetime.now() - start).total_seconds())
-                # handle.set_dump_xml()
-                handle.login(force=True)
-                log.debug("Login successful")
-                connected = True
-            except:
-                log.debug("Login failed. Sleeping for 60 seconds")
-                time.sleep(60)
-            if (datetime.datetime.now() - start).total_seconds() > timeout:
-                raise Exception("TimeOut: Unable to login to UCS Manager")
+        try:
+            log.debug("Login to UCS Manager")
+            # handle.set_dump_xml()
+            handle.login(force=True)
+            log.debug("Login successful")
+            return "login"
+        except Exception:
+            log.debug("Login failed.")
+        return "failed"
+
+    def connect():
+        start = time.time()
+        result = reconnect()
+        log.debug("Connection to UCS Manager: %s in %.2fs", result,
+                  time.time() - start)
+        emit("ucsm.reconnect", domain=handle.uri, result=result,
+             seconds=time.time() - start)
+        return result in ("reused", "refreshed", "login")
+
+    poller = Poller(timeout=timeout, initial_interval=1, max_interval=30,
+                    name="connection to UCS Manager")
+    connected = poller.poll(connect, done=lambda connected: connected)
+    if not connected:
+        raise Exception("TimeOut: Unable to login to UCS Manager")
     return connected
 
 
@@ -562,9 +1028,7 @@ def wait_for_firmware_activation(handle, bundle_version,
                                     timeout=600)
     """
 
-    is_running_desired_version = False
-    start = datetime.datetime.now()
-    while not is_running_desired_version:
+    def check():
         validate_connection(handle, timeout)
 
         try:
@@ -572,7 +1036,9 @@ def wait_for_firmware_activation(handle, bundle_version,
             running_firmware_list = _get_running_firmware_version(handle,
                                                                   subject)
 
-            firmware_map = get_infra_firmware_version(handle, bundle_version)
+            # bundle contents do not change during an upgrade
+            firmware_map = get_infra_firmware_version(handle, bundle_version,
+                                                      use_cache=True)
 
             for image_type in image_types:
                 found_image_type_match = False
@@ -595,14 +1061,12 @@ def wait_for_firmware_activation(handle, bundle_version,
                 if not wait_for_upgrade_completion:
                     log.debug("UCS %s is not running at desired version",
                               subject)
-                    break
                 else:
                     log.debug("UCS %s is not running at desired version. "
                               "Waiting for activation completion", subject)
                     # if observer: observer.fw_observer_cb("UCS %s is not
                     # running at desired version. Waiting for activation
                     # completion", subject)
-                    time.sleep(60)
 
                     # Check if there is a pending switch reboot
                     firmware_ack = handle.query_dn('sys/fw-system/ack')
@@ -615,24 +1079,31 @@ def wait_for_firmware_activation(handle, bundle_version,
                             observer.fw_observer_cb('Acknowledging UCS '
                                                     'primary Fabric '
                                                     'Interconnect reboot')
-                        firmware_ack.adminState = \
+                        firmware_ack.admin_state = \
                             FirmwareAckConsts.ADMIN_STATE_TRIGGER_IMMEDIATE
                         handle.set_mo(firmware_ack)
                         handle.commit()
+                        emit("fi.ack", domain=handle.uri,
+                             version=bundle_version)
+            return is_running_desired_version
         except Exception:
             # Login session may become invalid during upgrade because UCSM will
             # restart, or FIs will reboot.
             log.exception("Script lost connectivity to UCSM during upgrade. "
                           "This is expected")
-            time.sleep(30)
+            return None
 
-        if (datetime.datetime.now() - start).total_seconds() > timeout:
-            log.warning("UCS %s activation timeout. Elapsed time: %ds",
-                        subject,
-                        (datetime.datetime.now() - start).total_seconds())
-            break
+    poller = Poller(timeout=timeout, initial_interval=10, max_interval=60,
+                    name="UCS %s activation" % subject)
+    is_running_desired_version = poller.poll(
+        check,
+        done=lambda running: running or
+        (running is False and not wait_for_upgrade_completion))
+    if poller.outcome == "timeout":
+        log.warning("UCS %s activation timeout. Elapsed time: %ds",
+                    subject, poller.metrics["elapsed"])
 
-    return is_running_desired_version
+    return bool(is_running_desired_version)
 
 
 def wait_for_ucsm_activation(handle, version,
@@ -740,8 +1211,11 @@ def firmware_activate_infra(handle, version="2.2(2c)",
     if observer:
         observer.fw_observer_cb('Activating UCS Manager version %s', version)
 
+    start = time.time()
     ucsm_has_desired_version = wait_for_ucsm_activation(
         handle, version, wait_for_upgrade_completion=True)
+    emit("ucsm.activate", domain=handle.uri, version=version,
+         done=ucsm_has_desired_version, seconds=time.time() - start)
 
     if ucsm_has_desired_version:
         log.debug("UCS Manager successfully updated to version '%s'" % version)
@@ -753,8 +1227,11 @@ def firmware_activate_infra(handle, version="2.2(2c)",
         observer.fw_observer_cb('Activating UCS switch firmware version %s',
                                 version)
 
-    wait_for_fi_activation(
+    start = time.time()
+    fis_have_desired_version = wait_for_fi_activation(
         handle, version, wait_for_upgrade_completion=True, observer=observer)
+    emit("fi.activate", domain=handle.uri, version=version,
+         done=fis_have_desired_version, seconds=time.time() - start)
 
 
 def _get_blade_firmware_running(handle, blade):
@@ -778,11 +1255,21 @@ def _get_blade_firmware_running(handle, blade):
     mgmt_controllers = handle.query_children(in_mo=blade,
                                              class_id="MgmtController")
 
+    firmware_runnings_ = []
     for mgmt_controller in mgmt_controllers:
         if mgmt_controller.subject == "blade":
             firmware_runnings_ = handle.query_children(
                 in_mo=mgmt_controller, class_id="FirmwareRunning")
 
+    return _select_blade_firmware_running(firmware_runnings_)
+
+
+def _select_blade_firmware_running(firmware_runnings_):
+    """
+    Returns the only system FirmwareRunning among the FirmwareRunning
+    objects of a blade management controller, or None
+    """
+
     firmware_runnings = []
     for firmware_running_ in firmware_runnings_:
         if firmware_running_.deployment == "system":
@@ -798,21 +1285,164 @@ def _get_blade_firmware_running(handle, blade):
     return firmware_running
 
 
+def _prefetch_blade_inventory(handle):
+    """
+    Fetches blades, their management controllers, running firmware and the
+    service profiles with a single class query and joins them by dn
+
+    Args:
+        handle (UcsHandle)
+
+    Returns:
+        (blades, firmware_running_map, service_profiles) where blades is the
+        list of ComputeBlade sorted by dn, firmware_running_map is
+        {blade_dn: FirmwareRunning or None} and service_profiles is
+        {sp_dn: LsServer}
+
+    Example:
+        blades, firmware_runnings, sps = _prefetch_blade_inventory(handle)
+    """
+
+    mos = handle.query_classids("ComputeBlade", "MgmtController",
+                                "FirmwareRunning", "LsServer")
+
+    blades = sorted(mos["ComputeBlade"], key=lambda blade_: blade_.dn)
+    blade_dns = set(blade.dn for blade in blades)
+
+    # blade management controller dn -> blade dn
+    mgmt_controllers = {}
+    for mgmt_controller in mos["MgmtController"]:
+        parent_dn = mgmt_controller.dn.rsplit("/", 1)[0]
+        if mgmt_controller.subject == "blade" and parent_dn in blade_dns:
+            mgmt_controllers[mgmt_controller.dn] = parent_dn
+
+    firmware_runnings = dict((blade_dn, []) for blade_dn in blade_dns)
+    for firmware_running in mos["FirmwareRunning"]:
+        parent_dn = firmware_running.dn.rsplit("/", 1)[0]
+        if parent_dn in mgmt_controllers:
+            firmware_runnings[mgmt_controllers[parent_dn]].append(
+                firmware_running)
+
+    firmware_running_map = {}
+    for blade_dn in firmware_runnings:
+        firmware_running_map[blade_dn] = _select_blade_firmware_running(
+            firmware_runnings[blade_dn])
+
+    service_profiles = dict((sp.dn, sp) for sp in mos["LsServer"])
+    return blades, firmware_running_map, service_profiles
+
+
+def _confirm_blade_reboot():
+    """
+    Asks the user to acknowledge the reboot of the blades
+
+    Returns:
+        True/False(bool)
+    """
+
+    set_str = input("The update process will need to reboot the "
+                    "server(s). Would you like to acknowledge the same?"
+                    "Enter 'yes' to proceed.")
+    if set_str.strip().lower() != "yes":
+        log.warning("Acknowledgement is required to update blade "
+                    "server.")
+        return False
+    return True
+
+
+def _acknowledge_blade_reboot(handle, sp_dns, acked=None, grace=60):
+    """
+    Acknowledges the pending reboot of the service profiles waiting for user
+    acknowledgement, with one LsmaintAck class query and at most two commits
+
+    An acknowledgement still waiting for user right after it was set to
+    trigger-immediate is left alone, it is toggled again only grace seconds
+    after the last acknowledgement, as UCSM may not have picked it up yet.
+
+    Args:
+        handle (UcsHandle)
+        sp_dns (list): dns of the service profiles to acknowledge
+        acked (dict): {sp dn: time of its last acknowledgement}, updated
+            with the acknowledgements of this call
+        grace (number): seconds before an acknowledgement is toggled again
+
+    Returns:
+        set: dns of the service profiles acknowledged by this call
+    """
+
+    if acked is None:
+        acked = {}
+    ack_dns = set(sp_dn + '/ack' for sp_dn in sp_dns if sp_dn)
+    if not ack_dns:
+        return set()
+    now = time.time()
+    ls_maint_acks = []
+    for ls_maint_ack in handle.query_classid(
+            "LsmaintAck",
+            filter_str='(oper_state, "waiting-for-user", type="eq")'):
+        if ls_maint_ack.dn not in ack_dns:
+            continue
+        sp_dn = os.path.dirname(ls_maint_ack.dn)
+        if ls_maint_ack.admin_state == 'trigger-immediate' and \
+                sp_dn in acked and now - acked[sp_dn] < grace:
+            continue
+        ls_maint_acks.append(ls_maint_ack)
+    if not ls_maint_acks:
+        return set()
+
+    re_acks = [ls_maint_ack for ls_maint_ack in ls_maint_acks
+               if ls_maint_ack.admin_state == 'trigger-immediate']
+    if re_acks:
+        for ls_maint_ack in re_acks:
+            ls_maint_ack.admin_state = 'untriggered'
+            handle.set_mo(ls_maint_ack)
+            log.debug("Re-Acknowledging service profile '%s'." %
+                      os.path.dirname(ls_maint_ack.dn))
+        handle.commit()
+        time.sleep(5)
+
+    for ls_maint_ack in ls_maint_acks:
+        ls_maint_ack.admin_state = 'trigger-immediate'
+        handle.set_mo(ls_maint_ack)
+        log.debug("Acknowledging service profile '%s'." %
+                  os.path.dirname(ls_maint_ack.dn))
+    handle.commit()
+
+    sp_dns = set(os.path.dirname(ls_maint_ack.dn)
+                 for ls_maint_ack in ls_maint_acks)
+    now = time.time()
+    for sp_dn in sp_dns:
+        acked[sp_dn] = now
+    return sp_dns
+
+
 def wait_for_blade_activation(handle,
                               bundle_version,
                               firmware_running_map,
                               require_user_confirmation=True,
-                              timeout=15 * 60):
+                              timeout=15 * 60,
+                              poll_interval=60):
     """
     Returns True if firmware is already running at the specified version
     If not running at the desired version, optionally wait until activation.
 
+    Every poll resolves the FirmwareRunning objects of all pending blades in
+    a single request and acknowledges their reboots with one LsmaintAck
+    class query, whatever the number of blades.
+    A blade is acknowledged again only when its acknowledgement has been
+    waiting for a minute or poll_interval, whichever is longer.
+
     Args:
         handle (UcsHandle)
         bundle_version(string): version
         firmware_running_map (dict): {'blade_dn' :
-                                        'FirmwareRunning ManagedObject'}
+                                        ['FirmwareRunning ManagedObject',
+                                         'service profile dn']}
+        require_user_confirmation (bool): ask before acknowledging the
+            reboot, once per blade
         timeout (number): timeout in seconds
+        poll_interval (number): longest wait in seconds between two polls,
+            polls start more often and back off up to it
 
 
     Returns:
@@ -823,96 +1453,237 @@ def wait_for_blade_activation(handle,
         desired version
 
     Example:
-        wait_for_firmware_activation(handle,
-                                    version="1.0.1.0", subject="system",
-                                    image_types=['system'],
-                                    wait_for_upgrade_completion=True,
-                                    acknowledge_reboot=False,
-                                    timeout=600)
+        wait_for_blade_activation(handle, bundle_version="2.2(5b)",
+                                  firmware_running_map=firmware_running_map,
+                                  require_user_confirmation=False)
     """
 
-    firmware_running_state = {}
-    is_running_desired_version = False
-    start = datetime.datetime.now()
-    while not is_running_desired_version:
-        log.debug("sleeping for 60 seconds.")
-        time.sleep(60)
-        try:
-            is_running_desired_version = True
-            for blade in sorted(firmware_running_map):
-                firmware_running = firmware_running_map[blade][0]
-
-                if firmware_running.version == bundle_version:
-                    firmware_running_state[firmware_running.dn] = True
+    start = time.time()
+    # service profile dn -> time of its last acknowledgement
+    acked = {}
+    confirmed = set()
+    declined = set()
 
-                if firmware_running.dn in firmware_running_state and \
-                        firmware_running_state[firmware_running.dn]:
-                    log.debug("Blade '%s' is running at version '%s': "
-                              "Expected '%s'"
-                              % (blade, firmware_running.version,
-                                 bundle_version))
-                    continue
+    def check():
+        try:
+            pending = [blade for blade in sorted(firmware_running_map)
+                       if firmware_running_map[blade][0].version !=
+                       bundle_version]
+            if pending:
+                firmware_runnings = handle.query_dns(
+                    [firmware_running_map[blade][0].dn for blade in pending])
+                for blade in pending:
+                    firmware_running = firmware_runnings.get(
+                        firmware_running_map[blade][0].dn)
+                    if firmware_running is not None:
+                        firmware_running_map[blade][0] = firmware_running
 
-                firmware_running = handle.query_dn(firmware_running.dn)
+            for blade in sorted(firmware_running_map):
                 log.debug("Blade '%s' is running at version '%s': Expected "
                           "'%s'"
-                          % (blade, firmware_running.version,
+                          % (blade, firmware_running_map[blade][0].version,
                              bundle_version))
-                if firmware_running.version != bundle_version:
-                    is_running_desired_version = False
-
-                    if require_user_confirmation:
-                        set_flag = False
-                        set_str = input("The update process will need to "
-                                        "reboot the server(s). "
-                                        "Would you like to acknowledge "
-                                        "the same?"
-                                        "Enter 'yes' to proceed.")
-                        if set_str.strip().lower() == "yes":
-                            set_flag = True
-
-                        if not set_flag:
-                            log.warning("Acknowledgement is required to "
-                                        "update blade server.")
-                            continue
-
-                    sp_dn = firmware_running_map[blade][1]
-                    dn = sp_dn + '/ack'
-                    ls_maint_ack = handle.query_dn(dn)
-                    if ls_maint_ack:
-                        if ls_maint_ack.oper_state == "waiting-for-user":
-                            if ls_maint_ack.admin_state == 'trigger-immediate':
-                                ls_maint_ack.admin_state = 'untriggered'
-                                handle.set_mo(ls_maint_ack)
-                                handle.commit()
-                                log.debug("Re-Acknowledging blade '%s' with "
-                                          "service profile '%s'." % (blade,
-                                                                     sp_dn))
-                                time.sleep(5)
-
-                            ls_maint_ack.admin_state = 'trigger-immediate'
-                            handle.set_mo(ls_maint_ack)
-                            handle.commit()
-                            log.debug("Acknowledging blade '%s' with service "
-                                      "profile '%s'." % (blade, sp_dn))
-
-                    continue
 
-                firmware_running_map[blade][0] = firmware_running
+            for blade in pending:
+                if firmware_running_map[blade][0].version == bundle_version:
+                    emit("blade.version", domain=handle.uri, blade=blade,
+                         version=bundle_version, seconds=time.time() - start)
+            pending = [blade for blade in pending
+                       if firmware_running_map[blade][0].version !=
+                       bundle_version]
+            sp_dns = [firmware_running_map[blade][1] for blade in pending]
+            new_sp_dns = [sp_dn for sp_dn in sp_dns
+                          if sp_dn not in confirmed and sp_dn not in declined]
+            if new_sp_dns:
+                # the user is asked once per blade
+                if not require_user_confirmation or _confirm_blade_reboot():
+                    confirmed.update(new_sp_dns)
+                else:
+                    declined.update(new_sp_dns)
+            sp_dns = [sp_dn for sp_dn in sp_dns if sp_dn in confirmed]
+            if sp_dns:
+                _acknowledge_blade_reboot(handle, sp_dns, acked,
+                                          grace=max(poll_interval, 60))
+            return not pending
         except Exception as e:
-            log.exception(e.message)
-            log.debug("sleeping for 30 seconds")
-            time.sleep(30)
-        if (datetime.datetime.now() - start).total_seconds() > timeout:
-            log.warning("Blade activation timeout. Elapsed time: %ds",
-                        (datetime.datetime.now() - start).total_seconds())
-            is_running_desired_version = False
-            break
+            log.exception(e)
+            return False
+
+    poller = Poller(timeout=timeout, initial_interval=min(5, poll_interval),
+                    max_interval=poll_interval, name="blade activation")
+    is_running_desired_version = poller.poll(check, done=lambda done: done)
+    if poller.outcome == "timeout":
+        log.warning("Blade activation timeout. Elapsed time: %ds",
+                    poller.metrics["elapsed"])
 
     return is_running_desired_version
 
 
-def firmware_activate_blade(handle, version, require_user_confirmation=True):
+def rolling_blade_activation(handle,
+                             bundle_version,
+                             firmware_running_map,
+                             max_per_chassis=1,
+                             max_per_domain=8,
+                             require_user_confirmation=True,
+                             blade_timeout=15 * 60,
+                             poll_interval=60,
+                             progress=None):
+    """
+    Acknowledges the pending blade reboots in waves and waits for the blades
+    to run bundle_version. At most max_per_chassis blades of a chassis and
+    max_per_domain blades in total reboot at the same time, a blade is
+    acknowledged as soon as a slot frees up.
+
+    Relies on a user-ack maintenance policy: blades whose service profile
+    reboots without acknowledgement are not held back.
+
+    Every poll resolves the FirmwareRunning objects of the rebooting blades
+    in a single request and acknowledges the next wave with one LsmaintAck
+    class query and one commit.
+
+    A blade whose acknowledgement is not waiting for user yet keeps its
+    slot and is acknowledged again on every poll.
+
+    A blade not at bundle_version blade_timeout seconds after its
+    acknowledgement is given up on. It keeps its chassis slot, the other
+    blades of its chassis are then skipped rather than rebooted next to it.
+    A blade never acknowledged within blade_timeout is given up on too, and
+    frees its slot.
+
+    Args:
+        handle (UcsHandle)
+        bundle_version (string): version
+        firmware_running_map (dict): {'blade_dn' :
+                                        ['FirmwareRunning ManagedObject',
+                                         'service profile dn']}
+        max_per_chassis (int): blades of a chassis rebooting at once
+        max_per_domain (int): blades rebooting at once
+        require_user_confirmation (bool): ask once before the first wave
+        blade_timeout (number): timeout in seconds of a blade
+        poll_interval (number): longest wait in seconds between two polls
+        progress (callable): progress(stats) called after every poll, stats
+            is {"done", "rebooting", "pending", "failed", "elapsed",
+            "throughput" (blades per hour), "eta" (seconds or None)}
+
+    Returns:
+        dict: {blade_dn: "done", "timeout" or "skipped"}
+
+    Example:
+        rolling_blade_activation(handle, bundle_version="2.2(5b)",
+                                 firmware_running_map=firmware_running_map,
+                                 max_per_chassis=2, max_per_domain=16,
+                                 require_user_confirmation=False)
+    """
+
+    if require_user_confirmation and not _confirm_blade_reboot():
+        return dict((blade_dn, "skipped") for blade_dn in
+                    firmware_running_map if
+                    firmware_running_map[blade_dn][0].version !=
+                    bundle_version)
+
+    def chassis(blade_dn):
+        return blade_dn.rsplit("/", 1)[0]
+
+    status = {}
+    pending = [blade_dn for blade_dn in sorted(firmware_running_map) if
+               firmware_running_map[blade_dn][0].version != bundle_version]
+    # blade dn -> time of its first acknowledgement attempt, for the blades
+    # whose acknowledgement is not waiting for user yet
+    waiting = {}
+    # blade dn -> time of its acknowledgement
+    rebooting = {}
+    # blades given up on while rebooting, they keep their chassis slot
+    stuck = []
+    start = time.time()
+
+    def busy(blade_dns):
+        # chassis -> blades waiting, rebooting or given up on
+        counts = {}
+        for blade_dn in blade_dns:
+            counts[chassis(blade_dn)] = counts.get(chassis(blade_dn), 0) + 1
+        return counts
+
+    def check():
+        active = dict(waiting)
+        active.update(rebooting)
+        if active:
+            firmware_runnings = handle.query_dns(
+                [firmware_running_map[blade_dn][0].dn for blade_dn in
+                 active])
+            for blade_dn in sorted(active):
+                firmware_running = firmware_runnings.get(
+                    firmware_running_map[blade_dn][0].dn)
+                if firmware_running is not None:
+                    firmware_running_map[blade_dn][0] = firmware_running
+                if firmware_running_map[blade_dn][0].version == \
+                        bundle_version:
+                    log.debug("Blade '%s' is running at version '%s'",
+                              blade_dn, bundle_version)
+                    emit("blade.version", domain=handle.uri, blade=blade_dn,
+                         version=bundle_version,
+                         seconds=time.time() - active[blade_dn])
+                    status[blade_dn] = "done"
+                elif time.time() - active[blade_dn] > blade_timeout:
+                    log.warning("Blade '%s' did not reach version '%s'",
+                                blade_dn, bundle_version)
+                    status[blade_dn] = "timeout"
+                    if blade_dn in rebooting:
+                        stuck.append(blade_dn)
+                else:
+                    continue
+                waiting.pop(blade_dn, None)
+                rebooting.pop(blade_dn, None)
+
+        held = busy(list(waiting) + list(rebooting) + stuck)
+        for blade_dn in list(pending):
+            if held.get(chassis(blade_dn), 0) >= max_per_chassis:
+                continue
+            if len(waiting) + len(rebooting) >= max_per_domain:
+                break
+            waiting[blade_dn] = time.time()
+            held[chassis(blade_dn)] = held.get(chassis(blade_dn), 0) + 1
+            pending.remove(blade_dn)
+        if waiting:
+            # the acknowledgements may not be waiting for user yet, e.g.
+            # right after the host firmware pack commit, those blades are
+            # acknowledged again on the next poll
+            log.debug("Acknowledging the reboot of %s", sorted(waiting))
+            sp_dns = _acknowledge_blade_reboot(
+                handle, [firmware_running_map[blade_dn][1] for blade_dn in
+                         waiting])
+            for blade_dn in sorted(waiting):
+                if firmware_running_map[blade_dn][1] in sp_dns:
+                    rebooting[blade_dn] = time.time()
+                    del waiting[blade_dn]
+
+        finished = not rebooting and not waiting
+        if finished:
+            for blade_dn in pending:
+                status[blade_dn] = "skipped"
+
+        if progress:
+            elapsed = time.time() - start
+            done = list(status.values()).count("done")
+            throughput = done * 3600.0 / elapsed if elapsed and done else 0
+            remaining = len(pending) + len(waiting) + len(rebooting)
+            progress({"done": done, "rebooting": len(rebooting),
+                      "pending": 0 if finished else
+                      len(pending) + len(waiting),
+                      "failed": len(status) - done, "elapsed": elapsed,
+                      "throughput": throughput,
+                      "eta": remaining * 3600.0 / throughput if throughput
+                      else None})
+        return finished
+
+    poller = Poller(initial_interval=min(5, poll_interval),
+                    max_interval=poll_interval, name="rolling blade "
+                    "activation")
+    poller.poll(check, done=lambda finished: finished)
+    return status
+
+
+def firmware_activate_blade(handle, version, require_user_confirmation=True,
+                            max_per_chassis=None, max_per_domain=None):
     """
     Activate blade bundle on UCSM
 
@@ -921,6 +1692,10 @@ def firmware_activate_blade(handle, version, require_user_confirmation=True):
         version: version
         require_user_confirmation (bool): by default True. If False needs no
                                           user intervention.
+        max_per_chassis (int): if set, with max_per_domain, the reboots are
+                               acknowledged in waves by
+                               rolling_blade_activation
+        max_per_domain (int): see max_per_chassis
 
     Returns:
         None
@@ -929,17 +1704,18 @@ def firmware_activate_blade(handle, version, require_user_confirmation=True):
         firmware_activate_blade(handle, version="2.2.5b")
     """
 
+    rolling = max_per_chassis is not None or max_per_domain is not None
+
     blade_bundle = version + "B"
     # rack_bundle = version + "C"
 
     host_firmware_packs = []
     firmware_running_map = {}
 
-    blades_ = handle.query_classid("ComputeBlade")
-    blades = sorted(blades_, key=lambda blade_: blade_.dn)
+    blades, blade_firmware_runnings, sps = _prefetch_blade_inventory(handle)
     for blade in blades:
         blade_dn = blade.dn
-        firmware_running = _get_blade_firmware_running(handle, blade)
+        firmware_running = blade_firmware_runnings[blade_dn]
         if not firmware_running:
             log.debug("Improper firmware on blade '%s'" % blade_dn)
             continue
@@ -958,7 +1734,7 @@ def firmware_activate_blade(handle, version, require_user_confirmation=True):
             else:
                 # sp_name = re.search(r'^ls-(?P<sp_name>\w+)$',
                 # os.path.basename(assigned_to_dn)).groupdict()['sp_name']
-                sp = handle.query_dn(assigned_to_dn)
+                sp = sps[assigned_to_dn]
                 host_firmware_pack_dn = sp.oper_host_fw_policy_name
 
             if host_firmware_pack_dn in host_firmware_packs:
@@ -996,32 +1772,51 @@ def firmware_activate_blade(handle, version, require_user_confirmation=True):
                               "server.")
                     sys.exit()
 
-            sps = handle.query_classid(class_id="LsServer")
-            for sp in sps:
-                if sp.type == 'instance' and sp.assoc_state == 'associated':
-                    if sp.oper_host_fw_policy_name and \
-                            sp.oper_host_fw_policy_name == \
-                            host_firmware_pack_dn:
-                        dn = sp.dn + '/ack'
-                        ls_maint_ack = handle.query_dn(dn)
-                        if ls_maint_ack:
-                            ls_maint_ack.admin_state = 'trigger-immediate'
-                            handle.set_mo(ls_maint_ack)
-                            handle.commit()
-                            log.debug("Acknowledging blade '%s', service "
-                                      "profile '%s' using hostfirmwarepack "
-                                      "'%s'." % (sp.pn_dn, sp.dn,
-                                                 sp.oper_host_fw_policy_name))
+            if rolling:
+                host_firmware_packs.append(host_firmware_pack_dn)
+                continue
+
+            pack_sps = [sp for sp in sorted(sps.values(),
+                                            key=lambda sp_: sp_.dn)
+                        if sp.type == 'instance' and
+                        sp.assoc_state == 'associated' and
+                        sp.oper_host_fw_policy_name and
+                        sp.oper_host_fw_policy_name == host_firmware_pack_dn]
+            if pack_sps:
+                ls_maint_acks = handle.query_dns(
+                    [sp.dn + '/ack' for sp in pack_sps])
+                for sp in pack_sps:
+                    ls_maint_ack = ls_maint_acks.get(sp.dn + '/ack')
+                    if ls_maint_ack:
+                        ls_maint_ack.admin_state = 'trigger-immediate'
+                        handle.set_mo(ls_maint_ack)
+                        log.debug("Acknowledging blade '%s', service "
+                                  "profile '%s' using hostfirmwarepack "
+                                  "'%s'." % (sp.pn_dn, sp.dn,
+                                             sp.oper_host_fw_policy_name))
+                handle.commit()
 
             host_firmware_packs.append(host_firmware_pack_dn)
     status = False
-    if firmware_running_map:
+    start = time.time()
+    if firmware_running_map and rolling:
+        log.debug("Rolling blade activation")
+        statuses = rolling_blade_activation(
+            handle, version, firmware_running_map,
+            max_per_chassis=max_per_chassis or max_per_domain,
+            max_per_domain=max_per_domain or len(firmware_running_map),
+            require_user_confirmation=False)
+        status = all(state == "done" for state in statuses.values())
+    elif firmware_running_map:
         log.debug("Waiting for blade activation")
         status = wait_for_blade_activation(handle,
                                            version,
                                            firmware_running_map,
                                            require_user_confirmation,
                                            timeout=15 * 60)
+    if firmware_running_map:
+        emit("blade.activate", domain=handle.uri, version=version,
+             done=bool(status), seconds=time.time() - start)
     return status
 
 
@@ -1088,7 +1883,9 @@ def is_image_available_on_ucsm(handle, image):
 
 def firmware_auto_install(handle, version, image_dir, infra_only=False,
                           infra=True, blade=True, rack=False,
-                          require_user_confirmation=True):
+                          require_user_confirmation=True,
+                          parallel_upload=False, progress=None,
+                          repository=None):
     """
     This will do end-to-end processing to update firmware on ucsm.
 
@@ -1100,6 +1897,13 @@ def firmware_auto_install(handle, version, image_dir, infra_only=False,
                           firmware of FI only
         require_user_confirmation (bool): by default True. If False needs no
                                           user intervention.
+        parallel_upload (bool): by default False. If set to True, uploads
+                                the bundles concurrently over separate
+                                sessions, see firmware_add_local_parallel
+        progress (callable): progress(image_name, sent, total) called while
+                             the bundles are uploaded
+        repository (FirmwareRepository): index of image_dir, checked for
+                                         the bundles instead of the disk
 
     Returns:
         None
@@ -1135,8 +1939,11 @@ def firmware_auto_install(handle, version, image_dir, infra_only=False,
         for image in images_to_upload:
             log.debug("Checking if image file: '%s' is exist in local "
                       "directory" % image)
-            file_path = os.path.join(image_dir, image)
-            if os.path.exists(file_path):
+            if repository is not None:
+                present = repository.has(image)
+            else:
+                present = os.path.exists(os.path.join(image_dir, image))
+            if present:
                 log.debug("Image already exist in image directory ")
             else:
                 cco_image_list.append(image)
@@ -1147,9 +1954,16 @@ def firmware_auto_install(handle, version, image_dir, infra_only=False,
                              cco_image_list)
 
         # upload images on ucsm
+        if parallel_upload and images_to_upload:
+            log.debug("Uploading images %s to UCSM." % images_to_upload)
+            firmware_add_local_parallel(handle, image_dir, images_to_upload,
+                                        progress=progress)
+            images_to_upload = []
+
         for image in images_to_upload:
             log.debug("Uploading image '%s' to UCSM." % image)
-            firmware = firmware_add_local(handle, image_dir, image)
+            firmware = firmware_add_local(handle, image_dir, image,
+                                          progress=progress)
             eh = UcsEventHandle(handle)
             eh.add(managed_object=firmware, prop="transfer_state",
                    success_value=['downloaded'], poll_sec=30,
@@ -0,0 +1,200 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains a drift check of a UCS domain against a desired-state
+document, run on a snapshot of the domain taken in one request.
+"""
+
+import json
+import logging
+
+log = logging.getLogger('ucs')
+
+try:
+    string_types = (basestring,)
+except NameError:
+    string_types = (str,)
+
+DRIFT_MISSING = "missing"
+DRIFT_UNEXPECTED = "unexpected"
+DRIFT_CHANGED = "changed"
+
+
+def load_desired_state(path):
+    """
+    Reads a desired-state document from a json file, see drift_check
+    """
+
+    with open(path) as desired_fh:
+        return json.load(desired_fh)
+
+
+def _normalize(desired):
+    """
+    Validates the entries of a desired-state document and returns them
+    with their class id as known to the sdk and property names as python
+    names
+    """
+
+    from ucsmsdk import ucscoreutils
+
+    entries = []
+    for entry in desired.get("objects", []):
+        class_id = ucscoreutils.find_class_id_in_mo_meta_ignore_case(
+            entry.get("class_id", ""))
+        if class_id is None:
+            raise ValueError("Unknown class id '%s'" % entry.get("class_id"))
+        properties = {}
+        for prop, value in entry.get("properties", {}).items():
+            prop_meta = ucscoreutils.get_mo_property_meta(class_id, prop)
+            if prop_meta is None:
+                raise ValueError("Unknown property '%s' of %s" %
+                                 (prop, class_id))
+            # UCSM values are strings, json booleans and nulls have no
+            # single UCSM spelling, e.g. "yes" or "enabled"
+            if isinstance(value, bool) or \
+                    not isinstance(value, string_types + (int, float)):
+                raise ValueError("Value of %s.%s must be a string, not %r" %
+                                 (class_id, prop, value))
+            properties[prop_meta.name] = "%s" % value
+        entries.append({"class_id": class_id, "dn": entry.get("dn"),
+                        "parent_dn": entry.get("parent_dn"),
+                        "present": entry.get("present", True),
+                        "properties": properties})
+    return entries
+
+
+def drift_snapshot(handle, class_ids):
+    """
+    Reads every object of class_ids with one configResolveClasses request
+
+    Returns:
+        dict: {class_id: {dn: Managed Object}}
+    """
+
+    if not class_ids:
+        return {}
+    mos = handle.query_classids(*sorted(set(class_ids)))
+    return dict((class_id, dict((mo.dn, mo) for mo in class_mos))
+                for class_id, class_mos in mos.items())
+
+
+def _diff(entry, mo):
+    diffs = []
+    for prop in sorted(entry["properties"]):
+        expected = entry["properties"][prop]
+        actual = getattr(mo, prop, None)
+        if actual != expected:
+            diffs.append({"kind": DRIFT_CHANGED, "class_id": entry["class_id"],
+                          "dn": mo.dn, "property": prop,
+                          "expected": expected, "actual": actual})
+    return diffs
+
+
+def drift_check(handle, desired, snapshot=None):
+    """
+    Compares a domain to a desired-state document and reports every
+    difference, property by property.
+
+    The document lists objects, each one either a single object by dn or,
+    without dn, every object of its class, optionally limited to the
+    subtree of parent_dn. Property values are the strings UCSM reports,
+    numbers being compared as strings. An entry with "present": false
+    reports the objects it matches as unexpected:
+
+        {"objects": [
+            {"class_id": "FabricVlan", "dn": "fabric/lan/net-vlan100",
+             "properties": {"id": "100", "sharing": "none"}},
+            {"class_id": "FabricVlan", "dn": "fabric/lan/net-test",
+             "present": false},
+            {"class_id": "LsServer", "parent_dn": "org-root/org-web",
+             "properties": {"host_fw_policy_name": "hfp-3.1"}}]}
+
+    Every class of the document is read with one configResolveClasses
+    request, then the whole comparison runs in memory.
+
+    Args:
+        handle (UcsHandle)
+        desired (dict): desired-state document
+        snapshot (dict): drift_snapshot result to compare instead of
+            reading the domain, e.g. to check several documents
+
+    Returns:
+        list of dict: {"kind", "class_id", "dn"}, kind being "missing",
+        "unexpected" or "changed", changed ones also having "property",
+        "expected" and "actual"
+
+    Raises:
+        ValueError: If a class id or a property is unknown, or a value is
+            not a string or a number
+
+    Example:
+        diffs = drift_check(handle, load_desired_state("domain.json"))
+        print(format_drift(diffs))
+    """
+
+    entries = _normalize(desired)
+    if not entries:
+        return []
+    if snapshot is None:
+        snapshot = drift_snapshot(handle, [entry["class_id"]
+                                           for entry in entries])
+
+    diffs = []
+    for entry in entries:
+        mos = snapshot.get(entry["class_id"], {})
+        if entry["dn"] is not None:
+            mo = mos.get(entry["dn"])
+            if mo is None and entry["present"]:
+                diffs.append({"kind": DRIFT_MISSING,
+                              "class_id": entry["class_id"],
+                              "dn": entry["dn"]})
+            elif mo is not None and not entry["present"]:
+                diffs.append({"kind": DRIFT_UNEXPECTED,
+                              "class_id": entry["class_id"],
+                              "dn": entry["dn"]})
+            elif mo is not None:
+                diffs.extend(_diff(entry, mo))
+            continue
+
+        prefix = entry["parent_dn"] + "/" if entry["parent_dn"] else ""
+        for dn in sorted(mos):
+            if not dn.startswith(prefix):
+                continue
+            if entry["present"]:
+                diffs.extend(_diff(entry, mos[dn]))
+            else:
+                diffs.append({"kind": DRIFT_UNEXPECTED,
+                              "class_id": entry["class_id"], "dn": dn})
+
+    log.debug("Checked %d desired objects, %d differences", len(entries),
+              len(diffs))
+    return diffs
+
+
+def format_drift(diffs):
+    """
+    Returns the differences as text, one line each
+    """
+
+    lines = []
+    for diff in diffs:
+        if diff["kind"] == DRIFT_CHANGED:
+            lines.append("%-10s %s %s: expected '%s', found '%s'" % (
+                diff["kind"], diff["dn"], diff["property"],
+                diff["expected"], diff["actual"]))
+        else:
+            lines.append("%-10s %s (%s)" % (diff["kind"], diff["dn"],
+                                            diff["class_id"]))
+    return "\n".join(lines)
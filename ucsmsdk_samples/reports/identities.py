@@ -0,0 +1,154 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains an export of the MAC and WWPN addresses of every
+service profile of a domain, read with a single class query.
+"""
+
+import csv
+import json
+import logging
+
+log = logging.getLogger('ucs')
+
+IDENTITY_FIELDS = ["sp_dn", "sp_name", "server_dn", "vnic", "type",
+                   "address", "switch_id"]
+
+# vNIC class -> identity type
+_VNIC_TYPES = {"VnicEther": "mac", "VnicFc": "wwpn"}
+
+
+def sp_identities(handle):
+    """
+    This function yields one row per vNIC and vHBA of every service
+    profile, the LsServer, VnicEther and VnicFc objects being read with one
+    configResolveClasses request and joined by dn
+
+    Args:
+        handle (UcsHandle)
+
+    Returns:
+        generator of dict with the keys of IDENTITY_FIELDS, type being
+        "mac" or "wwpn", sorted by service profile and vNIC
+
+    Example:
+        for row in sp_identities(handle):
+            print(row["sp_name"], row["vnic"], row["address"])
+    """
+
+    mos = handle.query_classids("LsServer", *sorted(_VNIC_TYPES))
+    sps = dict((sp.dn, sp) for sp in mos["LsServer"]
+               if sp.type == "instance")
+
+    # sp dn -> vNICs, the vNICs of policies and templates are left out
+    vnics = {}
+    for class_id, identity_type in _VNIC_TYPES.items():
+        for vnic in mos[class_id]:
+            sp_dn = vnic.dn.rsplit("/", 1)[0]
+            if sp_dn in sps:
+                vnics.setdefault(sp_dn, []).append((vnic, identity_type))
+
+    for sp_dn in sorted(vnics):
+        sp = sps[sp_dn]
+        for vnic, identity_type in sorted(vnics[sp_dn],
+                                          key=lambda item: item[0].dn):
+            yield {"sp_dn": sp_dn, "sp_name": sp.name,
+                   "server_dn": sp.pn_dn or "", "vnic": vnic.name,
+                   "type": identity_type, "address": vnic.addr,
+                   "switch_id": vnic.switch_id}
+
+
+class IdentityIndex(object):
+    """
+    Reverse index of the identity rows, from MAC or WWPN address to row
+
+    Addresses are matched regardless of case. Addresses UCSM has not
+    assigned yet, e.g. "derived", are not indexed.
+
+    Example:
+        index = IdentityIndex(sp_identities(handle))
+        index.sp_dn("00:25:b5:00:00:1a")
+    """
+
+    def __init__(self, rows=()):
+        self._rows = {}
+        for row in rows:
+            self.add(row)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def add(self, row):
+        address = row["address"]
+        if address and ":" in address:
+            self._rows[address.upper()] = row
+
+    def lookup(self, address):
+        """
+        Returns the row of an address, None if it is unknown
+        """
+
+        return self._rows.get(address.upper())
+
+    def sp_dn(self, address):
+        """
+        Returns the dn of the service profile of an address, None if it is
+        unknown
+        """
+
+        row = self.lookup(address)
+        return row["sp_dn"] if row else None
+
+
+def identity_export(handle, out, output_format="csv"):
+    """
+    This function writes the identity rows of every service profile to
+    out, row by row, and indexes them by address on the way
+
+    Args:
+        handle (UcsHandle)
+        out (file): open text file
+        output_format (string): "csv" or "jsonl", one json object per line
+
+    Returns:
+        IdentityIndex
+
+    Raises:
+        ValueError: If output_format is not supported
+
+    Example:
+        with open("ucs-identities.csv", "w") as out:
+            index = identity_export(handle, out)
+        index.sp_dn("20:00:00:25:b5:00:00:0f")
+    """
+
+    if output_format == "csv":
+        writer = csv.DictWriter(out, fieldnames=IDENTITY_FIELDS)
+        writer.writeheader()
+        write = writer.writerow
+    elif output_format == "jsonl":
+        def write(row):
+            out.write(json.dumps(row, sort_keys=True) + "\n")
+    else:
+        raise ValueError("Unsupported output format '%s'" % output_format)
+
+    index = IdentityIndex()
+    count = 0
+    for row in sp_identities(handle):
+        write(row)
+        index.add(row)
+        count += 1
+    log.debug("Exported %d identities, %d addresses indexed", count,
+              len(index))
+    return index
@@ -11,6 +11,164 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import importlib
+
+# BiosVf* class id -> BIOS tokens (read-write vp_* properties) of that class
+_BIOS_TOKEN_TABLE = {
+    "BiosVfAllUSBDevices": ["vp_all_usb_devices"],
+    "BiosVfAltitude": ["vp_altitude"],
+    "BiosVfAssertNMIOnPERR": ["vp_assert_nmi_on_perr"],
+    "BiosVfAssertNMIOnSERR": ["vp_assert_nmi_on_serr"],
+    "BiosVfBootOptionRetry": ["vp_boot_option_retry"],
+    "BiosVfCPUPerformance": ["vp_cpu_performance"],
+    "BiosVfConsistentDeviceNameControl": ["vp_cdn_control"],
+    "BiosVfConsoleRedirection": [
+        "vp_baud_rate", "vp_console_redirection", "vp_flow_control",
+        "vp_legacy_os_redirection", "vp_putty_key_pad", "vp_terminal_type"],
+    "BiosVfCoreMultiProcessing": ["vp_core_multi_processing"],
+    "BiosVfDRAMClockThrottling": ["vp_dram_clock_throttling"],
+    "BiosVfDirectCacheAccess": ["vp_direct_cache_access"],
+    "BiosVfDramRefreshRate": ["vp_dram_refresh_rate"],
+    "BiosVfEnhancedIntelSpeedStepTech": ["vp_enhanced_intel_speed_step_tech"],
+    "BiosVfExecuteDisableBit": ["vp_execute_disable_bit"],
+    "BiosVfFRB2Timer": ["vp_fr_b2_timer"],
+    "BiosVfFrequencyFloorOverride": ["vp_frequency_floor_override"],
+    "BiosVfFrontPanelLockout": ["vp_front_panel_lockout"],
+    "BiosVfIntelEntrySASRAIDModule": ["vp_sasraid", "vp_sasraid_module"],
+    "BiosVfIntelHyperThreadingTech": ["vp_intel_hyper_threading_tech"],
+    "BiosVfIntelTrustedExecutionTechnology": [
+        "vp_intel_trusted_execution_technology_support"],
+    "BiosVfIntelTurboBoostTech": ["vp_intel_turbo_boost_tech"],
+    "BiosVfIntelVTForDirectedIO": [
+        "vp_intel_vt_for_directed_io", "vp_intel_vtd_coherency_support",
+        "vp_intel_vtd_interrupt_remapping",
+        "vp_intel_vtd_pass_through_dma_support", "vp_intel_vtdats_support"],
+    "BiosVfIntelVirtualizationTechnology": [
+        "vp_intel_virtualization_technology"],
+    "BiosVfInterleaveConfiguration": [
+        "vp_channel_interleaving", "vp_memory_interleaving",
+        "vp_rank_interleaving"],
+    "BiosVfLocalX2Apic": ["vp_local_x2_apic"],
+    "BiosVfLvDIMMSupport": ["vp_lv_ddr_mode"],
+    "BiosVfMaxVariableMTRRSetting": ["vp_processor_mtrr"],
+    "BiosVfMaximumMemoryBelow4GB": ["vp_maximum_memory_below4_gb"],
+    "BiosVfMemoryMappedIOAbove4GB": ["vp_memory_mapped_io_above4_gb"],
+    "BiosVfNUMAOptimized": ["vp_numa_optimized"],
+    "BiosVfOSBootWatchdogTimer": ["vp_os_boot_watchdog_timer"],
+    "BiosVfOSBootWatchdogTimerPolicy": ["vp_os_boot_watchdog_timer_policy"],
+    "BiosVfOSBootWatchdogTimerTimeout": ["vp_os_boot_watchdog_timer_timeout"],
+    "BiosVfOnboardStorage": ["vp_onboard_scu_storage_support"],
+    "BiosVfPCISlotOptionROMEnable": [
+        "vp_pc_ie_slot_hba_option_rom", "vp_pc_ie_slot_mlom_option_rom",
+        "vp_pc_ie_slot_n1_option_rom", "vp_pc_ie_slot_n2_option_rom",
+        "vp_pc_ie_slot_sas_option_rom", "vp_slot10_state", "vp_slot1_state",
+        "vp_slot2_state", "vp_slot3_state", "vp_slot4_state",
+        "vp_slot5_state", "vp_slot6_state", "vp_slot7_state",
+        "vp_slot8_state", "vp_slot9_state"],
+    "BiosVfPOSTErrorPause": ["vp_post_error_pause"],
+    "BiosVfPSTATECoordination": ["vp_pstate_coordination"],
+    "BiosVfProcessorC1E": ["vp_processor_c1_e"],
+    "BiosVfProcessorC3Report": ["vp_processor_c3_report"],
+    "BiosVfProcessorC6Report": ["vp_processor_c6_report"],
+    "BiosVfProcessorC7Report": ["vp_processor_c7_report"],
+    "BiosVfProcessorCState": ["vp_processor_c_state"],
+    "BiosVfProcessorEnergyConfiguration": [
+        "vp_energy_performance", "vp_power_technology"],
+    "BiosVfProcessorPrefetchConfig": [
+        "vp_adjacent_cache_line_prefetcher", "vp_dcu_streamer_prefetch",
+        "vp_dcuip_prefetcher", "vp_hardware_prefetcher"],
+    "BiosVfQPILinkFrequencySelect": ["vp_qpi_link_frequency_select"],
+    "BiosVfQPISnoopMode": ["vp_qpi_snoop_mode"],
+    "BiosVfQuietBoot": ["vp_quiet_boot"],
+    "BiosVfResumeOnACPowerLoss": ["vp_resume_on_ac_power_loss"],
+    "BiosVfScrubPolicies": ["vp_demand_scrub", "vp_patrol_scrub"],
+    "BiosVfSelectMemoryRASConfiguration": [
+        "vp_select_memory_ras_configuration"],
+    "BiosVfSerialPortAEnable": ["vp_serial_port_a_enable"],
+    "BiosVfTrustedPlatformModule": ["vp_trusted_platform_module_support"],
+    "BiosVfUSBBootConfig": [
+        "vp_legacy_usb_support", "vp_make_device_non_bootable"],
+    "BiosVfUSBConfiguration": ["vp_xhci_mode"],
+    "BiosVfUSBFrontPanelAccessLock": ["vp_usb_front_panel_lock"],
+    "BiosVfUSBPortConfiguration": [
+        "vp_port6064_emulation", "vp_usb_port_front", "vp_usb_port_internal",
+        "vp_usb_port_kvm", "vp_usb_port_rear", "vp_usb_port_sd_card",
+        "vp_usb_port_v_media"],
+    "BiosVfUSBSystemIdlePowerOptimizingSetting": [
+        "vp_usb_idle_power_optimizing"],
+    "BiosVfVGAPriority": ["vp_vga_priority"]
+}
+
+
+def _bios_token_classes():
+    """
+    Returns {token: class_id}, the reverse of _BIOS_TOKEN_TABLE
+    """
+
+    token_classes = {}
+    for class_id, tokens in _BIOS_TOKEN_TABLE.items():
+        for token in tokens:
+            token_classes[token] = class_id
+    return token_classes
+
+
+_BIOS_TOKEN_CLASSES = _bios_token_classes()
+
+# BiosVf* class id -> mometa class, filled in on first use by _bios_class
+_BIOS_CLASSES = {}
+
+
+def _bios_class(class_id):
+    """
+    Returns the mometa class of a BiosVf* class id. Its module is imported
+    the first time the class is asked for and the class is memoized.
+    """
+
+    mo_class = _BIOS_CLASSES.get(class_id)
+    if mo_class is None:
+        module = importlib.import_module("ucsmsdk.mometa.bios." + class_id)
+        mo_class = getattr(module, class_id)
+        _BIOS_CLASSES[class_id] = mo_class
+    return mo_class
+
+
+def _bios_token(token):
+    """
+    Looks up a BIOS token in the registry
+
+    Args:
+        token (string): vp_* property, e.g. "vp_quiet_boot"
+
+    Returns:
+        (mo_class, prop_name, xml_attribute), e.g.
+        (BiosVfQuietBoot, "vp_quiet_boot", "vpQuietBoot")
+
+    Raises:
+        ValueError: If the token is unknown
+    """
+
+    class_id = _BIOS_TOKEN_CLASSES.get(token)
+    if class_id is None:
+        raise ValueError("Unknown bios token '%s'" % token)
+    mo_class = _bios_class(class_id)
+    return mo_class, token, mo_class.prop_meta[token].xml_attribute
+
+
+def _bios_conf_vf(handle, name, parent_org_dn, class_id, **kwargs):
+    """
+    Sets the properties of one BiosVf* object of a Bios Policy and commits
+    """
+
+    profile_dn = parent_org_dn + "/bios-prof-" + name
+    obj = handle.query_dn(profile_dn)
+    if obj:
+        mo = _bios_class(class_id)(parent_mo_or_dn=obj, **kwargs)
+        handle.add_mo(mo, True)
+        handle.commit()
+        return mo
+    else:
+        raise ValueError("Bios policy '%s' not found." % profile_dn)
+
 
 def bios_create(handle, parent_org_dn, name, descr="",
                 reboot_on_update="no",
@@ -64,18 +222,6 @@ def bios_create(handle, parent_org_dn, name, descr="",
     """
 
     from ucsmsdk.mometa.bios.BiosVProfile import BiosVProfile
-    from ucsmsdk.mometa.bios.BiosVfConsistentDeviceNameControl import \
-        BiosVfConsistentDeviceNameControl
-    from ucsmsdk.mometa.bios.BiosVfFrontPanelLockout import \
-        BiosVfFrontPanelLockout
-    from ucsmsdk.mometa.bios.BiosVfPOSTErrorPause import BiosVfPOSTErrorPause
-    from ucsmsdk.mometa.bios.BiosVfQuietBoot import BiosVfQuietBoot
-    from ucsmsdk.mometa.bios.BiosVfResumeOnACPowerLoss import \
-        BiosVfResumeOnACPowerLoss
-    from ucsmsdk.mometa.bios.BiosVfSerialPortAEnable import \
-        BiosVfSerialPortAEnable
-    from ucsmsdk.mometa.bios.BiosVfConsoleRedirection import \
-        BiosVfConsoleRedirection
 
     obj = handle.query_dn(parent_org_dn)
     if obj is None:
@@ -85,27 +231,28 @@ def bios_create(handle, parent_org_dn, name, descr="",
         parent_mo_or_dn=obj, name=name, descr=descr,
         reboot_on_update=reboot_on_update)
 
-    BiosVfConsistentDeviceNameControl(
+    _bios_class("BiosVfConsistentDeviceNameControl")(
         parent_mo_or_dn=mo,
         vp_cdn_control=vp_cdn_control)
 
-    BiosVfFrontPanelLockout(
+    _bios_class("BiosVfFrontPanelLockout")(
         parent_mo_or_dn=mo,
         vp_front_panel_lockout=vp_front_panel_lockout)
 
-    BiosVfPOSTErrorPause(
+    _bios_class("BiosVfPOSTErrorPause")(
         parent_mo_or_dn=mo, vp_post_error_pause=vp_post_error_pause)
 
-    BiosVfQuietBoot(parent_mo_or_dn=mo, vp_quiet_boot=vp_quiet_boot)
+    _bios_class("BiosVfQuietBoot")(
+        parent_mo_or_dn=mo, vp_quiet_boot=vp_quiet_boot)
 
-    BiosVfResumeOnACPowerLoss(
+    _bios_class("BiosVfResumeOnACPowerLoss")(
         parent_mo_or_dn=mo,
         vp_resume_on_ac_power_loss=vp_resume_on_ac_power_loss)
 
-    BiosVfSerialPortAEnable(
+    _bios_class("BiosVfSerialPortAEnable")(
         parent_mo_or_dn=mo, vp_serial_port_a_enable=vp_serial_port_a_enable)
 
-    BiosVfConsoleRedirection(
+    _bios_class("BiosVfConsoleRedirection")(
         parent_mo_or_dn=mo,
         vp_baud_rate=vp_baud_rate,
         vp_console_redirection=vp_console_redirection,
@@ -149,8 +296,100 @@ def bios_remove(handle, name, parent_org_dn):
 
 
 def bios_add_token(handle, name, parent_org_dn, token_name, token_value):
-    # TODO
-    pass
+    """
+    This method configures a single token of Bios Policy.
+
+    Args:
+        handle (UcsHandle)
+        parent_org_dn (string): Dn of parent Org.
+        name (string): Name of Bios policy.
+        token_name (string): token, e.g. "vp_quiet_boot"
+        token_value (string): value of the token
+
+    Returns:
+        BiosVProfile: Managed Object
+
+    Raises:
+        ValueError: If token or value is invalid Or
+                    If BiosVProfile is not present
+
+    Example:
+        bios_add_token(handle, name="sample_bios",
+                       parent_org_dn="org-root/org-sample",
+                       token_name="vp_quiet_boot", token_value="enabled")
+    """
+
+    return bios_conf_tokens(handle, name, parent_org_dn,
+                            {token_name: token_value})
+
+
+def bios_conf_tokens(handle, name, parent_org_dn, tokens,
+                     skip_unchanged=True):
+    """
+    This method configures many tokens of Bios Policy with a single query
+    and a single commit.
+
+    Args:
+        handle (UcsHandle)
+        parent_org_dn (string): Dn of parent Org.
+        name (string): Name of Bios policy.
+        tokens (dict): {token_name: value}, token names are the vp_*
+            properties of the BiosVf* objects, e.g. "vp_quiet_boot"
+        skip_unchanged (bool): by default True. Tokens already set to the
+            requested value are not sent.
+
+    Returns:
+        BiosVProfile: Managed Object, holding the BiosVf* children that
+            were committed
+
+    Raises:
+        ValueError: If a token is unknown or its value is invalid Or
+                    If BiosVProfile is not present
+
+    Example:
+        bios_conf_tokens(handle, name="sample_bios",
+                         parent_org_dn="org-root/org-sample",
+                         tokens={"vp_quiet_boot": "enabled",
+                                 "vp_intel_turbo_boost_tech": "disabled",
+                                 "vp_baud_rate": "115200"})
+    """
+
+    from ucsmsdk.mometa.bios.BiosVProfile import BiosVProfile
+
+    unknown = sorted(token for token in tokens
+                     if token not in _BIOS_TOKEN_CLASSES)
+    if unknown:
+        raise ValueError("Unknown bios token(s): %s" % ", ".join(unknown))
+
+    # group the requested tokens by the BiosVf* class carrying them
+    requested = {}
+    for token, value in tokens.items():
+        mo_class = _bios_token(token)[0]
+        if not mo_class.prop_meta[token].validate_property_value(value):
+            raise ValueError("Invalid value '%s' for bios token '%s'" %
+                             (value, token))
+        requested.setdefault(mo_class.__name__, {})[token] = value
+
+    profile_dn = parent_org_dn + "/bios-prof-" + name
+    current = handle.query_dn(profile_dn, hierarchy=True)
+    if not current:
+        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    current_mos = dict((mo.get_class_id(), mo) for mo in current)
+
+    mo = BiosVProfile(parent_mo_or_dn=parent_org_dn, name=name)
+    for class_id in sorted(requested):
+        props = requested[class_id]
+        existing = current_mos.get(class_id)
+        if skip_unchanged and existing is not None:
+            props = dict((token, value) for token, value in props.items()
+                         if getattr(existing, token) != value)
+        if props:
+            _bios_class(class_id)(parent_mo_or_dn=mo, **props)
+
+    if mo.child:
+        handle.add_mo(mo, modify_present=True)
+        handle.commit()
+    return mo
 
 
 def bios_serial_port(handle, name, parent_org_dn,
@@ -177,20 +416,9 @@ def bios_serial_port(handle, name, parent_org_dn,
 
     """
 
-    from ucsmsdk.mometa.bios.BiosVfSerialPortAEnable import \
-        BiosVfSerialPortAEnable
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfSerialPortAEnable(
-            parent_mo_or_dn=obj,
-            vp_serial_port_a_enable=vp_serial_port_a_enable)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfSerialPortAEnable",
+        vp_serial_port_a_enable=vp_serial_port_a_enable)
 
 
 def bios_console_redirection(handle, name, parent_org_dn,
@@ -228,25 +456,14 @@ def bios_console_redirection(handle, name, parent_org_dn,
                                 vp_baud_rate="115200")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfConsoleRedirection import \
-        BiosVfConsoleRedirection
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfConsoleRedirection(
-            parent_mo_or_dn=obj,
-            vp_baud_rate=vp_baud_rate,
-            vp_console_redirection=vp_console_redirection,
-            vp_flow_control=vp_flow_control,
-            vp_legacy_os_redirection=vp_legacy_os_redirection,
-            vp_putty_key_pad=vp_putty_key_pad,
-            vp_terminal_type=vp_terminal_type)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfConsoleRedirection",
+        vp_baud_rate=vp_baud_rate,
+        vp_console_redirection=vp_console_redirection,
+        vp_flow_control=vp_flow_control,
+        vp_legacy_os_redirection=vp_legacy_os_redirection,
+        vp_putty_key_pad=vp_putty_key_pad,
+        vp_terminal_type=vp_terminal_type)
 
 
 def bios_conf_quiet_boot(handle, name, parent_org_dn,
@@ -272,17 +489,8 @@ def bios_conf_quiet_boot(handle, name, parent_org_dn,
                             vp_quite_boot="enabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfQuietBoot import BiosVfQuietBoot
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfQuietBoot(parent_mo_or_dn=obj, vp_quiet_boot=vp_quiet_boot)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(handle, name, parent_org_dn, "BiosVfQuietBoot",
+                         vp_quiet_boot=vp_quiet_boot)
 
 
 def bios_conf_error_pause(handle, name, parent_org_dn,
@@ -308,18 +516,8 @@ def bios_conf_error_pause(handle, name, parent_org_dn,
                             vp_post_error_pause="enabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfPOSTErrorPause import BiosVfPOSTErrorPause
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfPOSTErrorPause(
-            parent_mo_or_dn=obj, vp_post_error_pause=vp_post_error_pause)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(handle, name, parent_org_dn, "BiosVfPOSTErrorPause",
+                         vp_post_error_pause=vp_post_error_pause)
 
 
 def bios_conf_power_loss(handle, name, parent_org_dn,
@@ -345,20 +543,9 @@ def bios_conf_power_loss(handle, name, parent_org_dn,
                             vp_resume_on_ac_power_loss="enabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfResumeOnACPowerLoss import \
-        BiosVfResumeOnACPowerLoss
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfResumeOnACPowerLoss(
-            parent_mo_or_dn=obj,
-            vp_resume_on_ac_power_loss=vp_resume_on_ac_power_loss)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfResumeOnACPowerLoss",
+        vp_resume_on_ac_power_loss=vp_resume_on_ac_power_loss)
 
 
 def bios_conf_front_panel_lockout(handle, name, parent_org_dn,
@@ -384,20 +571,9 @@ def bios_conf_front_panel_lockout(handle, name, parent_org_dn,
                                     vp_front_panel_lockout="enabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfFrontPanelLockout import \
-        BiosVfFrontPanelLockout
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfFrontPanelLockout(
-            parent_mo_or_dn=obj,
-            vp_front_panel_lockout=vp_front_panel_lockout)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfFrontPanelLockout",
+        vp_front_panel_lockout=vp_front_panel_lockout)
 
 
 def bios_conf_device_name_control(handle, name, parent_org_dn,
@@ -423,19 +599,9 @@ def bios_conf_device_name_control(handle, name, parent_org_dn,
                                     vp_cdn_control="enabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfConsistentDeviceNameControl import \
-        BiosVfConsistentDeviceNameControl
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfConsistentDeviceNameControl(
-            parent_mo_or_dn=obj, vp_cdn_control=vp_cdn_control)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfConsistentDeviceNameControl",
+        vp_cdn_control=vp_cdn_control)
 
 
 def bios_conf_turbo_boost(handle, name, parent_org_dn,
@@ -461,20 +627,9 @@ def bios_conf_turbo_boost(handle, name, parent_org_dn,
                                     vp_intel_turbo_boost_tech="enabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfIntelTurboBoostTech import \
-        BiosVfIntelTurboBoostTech
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfIntelTurboBoostTech(
-            parent_mo_or_dn=obj,
-            vp_intel_turbo_boost_tech=vp_intel_turbo_boost_tech)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfIntelTurboBoostTech",
+        vp_intel_turbo_boost_tech=vp_intel_turbo_boost_tech)
 
 
 def bios_conf_intel_speed_step(
@@ -502,20 +657,9 @@ def bios_conf_intel_speed_step(
                                 vp_enhanced_intel_speed_step_tech="enabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfEnhancedIntelSpeedStepTech import \
-        BiosVfEnhancedIntelSpeedStepTech
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfEnhancedIntelSpeedStepTech(
-            parent_mo_or_dn=obj,
-            vp_enhanced_intel_speed_step_tech=vp_enhanced_intel_speed_step_tech
-        )
-        handle.add_mo(mo, True)
-        handle.commit()
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfEnhancedIntelSpeedStepTech",
+        vp_enhanced_intel_speed_step_tech=vp_enhanced_intel_speed_step_tech)
 
 
 def bios_conf_hyper_threading(
@@ -543,20 +687,9 @@ def bios_conf_hyper_threading(
                                 vp_intel_hyper_threading_tech="enabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfIntelHyperThreadingTech import \
-        BiosVfIntelHyperThreadingTech
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfIntelHyperThreadingTech(
-            parent_mo_or_dn=obj,
-            vp_intel_hyper_threading_tech=vp_intel_hyper_threading_tech)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfIntelHyperThreadingTech",
+        vp_intel_hyper_threading_tech=vp_intel_hyper_threading_tech)
 
 
 def bios_conf_core_multi_processing(
@@ -583,20 +716,9 @@ def bios_conf_core_multi_processing(
                                         vp_core_multi_processing="enabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfCoreMultiProcessing import \
-        BiosVfCoreMultiProcessing
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfCoreMultiProcessing(
-            parent_mo_or_dn=obj,
-            vp_core_multi_processing=vp_core_multi_processing)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfCoreMultiProcessing",
+        vp_core_multi_processing=vp_core_multi_processing)
 
 
 def bios_conf_disable_bit(handle, name, parent_org_dn,
@@ -622,19 +744,9 @@ def bios_conf_disable_bit(handle, name, parent_org_dn,
                             vp_execute_disable_bit="enabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfExecuteDisableBit import \
-        BiosVfExecuteDisableBit
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfExecuteDisableBit(
-            parent_mo_or_dn=obj, vp_execute_disable_bit=vp_execute_disable_bit)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfExecuteDisableBit",
+        vp_execute_disable_bit=vp_execute_disable_bit)
 
 
 def bios_conf_virtual_tech(
@@ -662,23 +774,12 @@ def bios_conf_virtual_tech(
                             vp_execute_disable_bit="enabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfIntelVirtualizationTechnology import \
-        BiosVfIntelVirtualizationTechnology
-
     # Shorten variable name to satisfy flake8, but keep backward compatibility
     vp_intel_virt_tech = vp_intel_virtualization_technology
 
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfIntelVirtualizationTechnology(
-            parent_mo_or_dn=obj,
-            vp_intel_virtualization_technology=vp_intel_virt_tech)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfIntelVirtualizationTechnology",
+        vp_intel_virtualization_technology=vp_intel_virt_tech)
 
 
 def bios_conf_processor_prefetch(
@@ -713,26 +814,15 @@ def bios_conf_processor_prefetch(
                                     vp_hardware_prefetcher="enabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfProcessorPrefetchConfig import \
-        BiosVfProcessorPrefetchConfig
-
     # Shorten variable name to satisfy flake8, but keep backward compatibility
     vp_adj_cache_line_prefetcher = vp_adjacent_cache_line_prefetcher
 
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfProcessorPrefetchConfig(
-            parent_mo_or_dn=obj,
-            vp_dcuip_prefetcher=vp_dcuip_prefetcher,
-            vp_adjacent_cache_line_prefetcher=vp_adj_cache_line_prefetcher,
-            vp_hardware_prefetcher=vp_hardware_prefetcher,
-            vp_dcu_streamer_prefetch=vp_dcu_streamer_prefetch)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfProcessorPrefetchConfig",
+        vp_dcuip_prefetcher=vp_dcuip_prefetcher,
+        vp_adjacent_cache_line_prefetcher=vp_adj_cache_line_prefetcher,
+        vp_hardware_prefetcher=vp_hardware_prefetcher,
+        vp_dcu_streamer_prefetch=vp_dcu_streamer_prefetch)
 
 
 def bios_conf_direct_cache_access(handle, name, parent_org_dn,
@@ -758,20 +848,9 @@ def bios_conf_direct_cache_access(handle, name, parent_org_dn,
                                     vp_direct_cache_access="enabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfDirectCacheAccess import \
-        BiosVfDirectCacheAccess
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfDirectCacheAccess(
-            parent_mo_or_dn=obj,
-            vp_direct_cache_access=vp_direct_cache_access)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfDirectCacheAccess",
+        vp_direct_cache_access=vp_direct_cache_access)
 
 
 def bios_conf_processor_c_state(handle, name, parent_org_dn,
@@ -797,18 +876,8 @@ def bios_conf_processor_c_state(handle, name, parent_org_dn,
                                     vp_processor_c_state="enabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfProcessorCState import BiosVfProcessorCState
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfProcessorCState(parent_mo_or_dn=obj,
-                                   vp_processor_c_state=vp_processor_c_state)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(handle, name, parent_org_dn, "BiosVfProcessorCState",
+                         vp_processor_c_state=vp_processor_c_state)
 
 
 def bios_conf_processor_c1_e(handle, name, parent_org_dn,
@@ -834,18 +903,8 @@ def bios_conf_processor_c1_e(handle, name, parent_org_dn,
                                 vp_processor_c1_e="enabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfProcessorC1E import BiosVfProcessorC1E
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfProcessorC1E(parent_mo_or_dn=obj,
-                                vp_processor_c1_e=vp_processor_c1_e)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(handle, name, parent_org_dn, "BiosVfProcessorC1E",
+                         vp_processor_c1_e=vp_processor_c1_e)
 
 
 def bios_conf_processor_c3_report(handle, name, parent_org_dn,
@@ -872,20 +931,9 @@ def bios_conf_processor_c3_report(handle, name, parent_org_dn,
                     vp_processor_c3_report="enabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfProcessorC3Report import \
-        BiosVfProcessorC3Report
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfProcessorC3Report(
-            parent_mo_or_dn=obj,
-            vp_processor_c3_report=vp_processor_c3_report)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfProcessorC3Report",
+        vp_processor_c3_report=vp_processor_c3_report)
 
 
 def bios_conf_processor_c6_report(handle, name, parent_org_dn,
@@ -911,19 +959,9 @@ def bios_conf_processor_c6_report(handle, name, parent_org_dn,
                     vp_processor_c6_report="enabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfProcessorC6Report import \
-        BiosVfProcessorC6Report
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfProcessorC6Report(
-            parent_mo_or_dn=obj, vp_processor_c6_report=vp_processor_c6_report)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfProcessorC6Report",
+        vp_processor_c6_report=vp_processor_c6_report)
 
 
 def bios_conf_processor_c7_report(handle, name, parent_org_dn,
@@ -949,19 +987,9 @@ def bios_conf_processor_c7_report(handle, name, parent_org_dn,
                     vp_processor_c7_report="enabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfProcessorC7Report import \
-        BiosVfProcessorC7Report
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfProcessorC7Report(
-            parent_mo_or_dn=obj, vp_processor_c7_report=vp_processor_c7_report)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfProcessorC7Report",
+        vp_processor_c7_report=vp_processor_c7_report)
 
 
 def bios_conf_cpu_performance(handle, name, parent_org_dn,
@@ -988,18 +1016,8 @@ def bios_conf_cpu_performance(handle, name, parent_org_dn,
                     vp_cpu_performance="higt-throughput")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfCPUPerformance import BiosVfCPUPerformance
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfCPUPerformance(parent_mo_or_dn=obj,
-                                  vp_cpu_performance=vp_cpu_performance)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(handle, name, parent_org_dn, "BiosVfCPUPerformance",
+                         vp_cpu_performance=vp_cpu_performance)
 
 
 def bios_conf_max_variable_mtrr(handle, name, parent_org_dn,
@@ -1025,19 +1043,9 @@ def bios_conf_max_variable_mtrr(handle, name, parent_org_dn,
                     vp_processor_mtrr="8")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfMaxVariableMTRRSetting import \
-        BiosVfMaxVariableMTRRSetting
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfMaxVariableMTRRSetting(parent_mo_or_dn=obj,
-                                          vp_processor_mtrr=vp_processor_mtrr)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfMaxVariableMTRRSetting",
+        vp_processor_mtrr=vp_processor_mtrr)
 
 
 def bios_conf_local_x2_apic(handle, name, parent_org_dn,
@@ -1063,18 +1071,8 @@ def bios_conf_local_x2_apic(handle, name, parent_org_dn,
                     vp_local_x2_apic="auto")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfLocalX2Apic import BiosVfLocalX2Apic
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfLocalX2Apic(parent_mo_or_dn=obj,
-                               vp_local_x2_apic=vp_local_x2_apic)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(handle, name, parent_org_dn, "BiosVfLocalX2Apic",
+                         vp_local_x2_apic=vp_local_x2_apic)
 
 
 def bios_conf_processor_energy(handle, name, parent_org_dn,
@@ -1102,21 +1100,10 @@ def bios_conf_processor_energy(handle, name, parent_org_dn,
                     vp_power_technology="performance")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfProcessorEnergyConfiguration import \
-        BiosVfProcessorEnergyConfiguration
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfProcessorEnergyConfiguration(
-            parent_mo_or_dn=obj,
-            vp_power_technology=vp_power_technology,
-            vp_energy_performance=vp_energy_performance)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfProcessorEnergyConfiguration",
+        vp_power_technology=vp_power_technology,
+        vp_energy_performance=vp_energy_performance)
 
 
 def bios_conf_frequency_floor_override(
@@ -1143,20 +1130,9 @@ def bios_conf_frequency_floor_override(
                     vp_frequency_floor_override="disabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfFrequencyFloorOverride import \
-        BiosVfFrequencyFloorOverride
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfFrequencyFloorOverride(
-            parent_mo_or_dn=obj,
-            vp_frequency_floor_override=vp_frequency_floor_override)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfFrequencyFloorOverride",
+        vp_frequency_floor_override=vp_frequency_floor_override)
 
 
 def bios_conf_pstate_coordination(handle, name, parent_org_dn,
@@ -1183,20 +1159,9 @@ def bios_conf_pstate_coordination(handle, name, parent_org_dn,
                     vp_pstate_coordination="hw-all")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfPSTATECoordination import \
-        BiosVfPSTATECoordination
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfPSTATECoordination(
-            parent_mo_or_dn=obj,
-            vp_pstate_coordination=vp_pstate_coordination)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfPSTATECoordination",
+        vp_pstate_coordination=vp_pstate_coordination)
 
 
 def bios_conf_dram_clock(handle, name, parent_org_dn,
@@ -1222,20 +1187,9 @@ def bios_conf_dram_clock(handle, name, parent_org_dn,
                     vp_dram_clock_throttling="performance")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfDRAMClockThrottling import \
-        BiosVfDRAMClockThrottling
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfDRAMClockThrottling(
-            parent_mo_or_dn=obj,
-            vp_dram_clock_throttling=vp_dram_clock_throttling)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfDRAMClockThrottling",
+        vp_dram_clock_throttling=vp_dram_clock_throttling)
 
 
 def bios_conf_inter_leave(handle, name, parent_org_dn,
@@ -1265,22 +1219,11 @@ def bios_conf_inter_leave(handle, name, parent_org_dn,
                     vp_rank_interleaving="1-way")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfInterleaveConfiguration import \
-        BiosVfInterleaveConfiguration
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfInterleaveConfiguration(
-            parent_mo_or_dn=obj,
-            vp_channel_interleaving=vp_channel_interleaving,
-            vp_rank_interleaving=vp_rank_interleaving,
-            vp_memory_interleaving=vp_memory_interleaving)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfInterleaveConfiguration",
+        vp_channel_interleaving=vp_channel_interleaving,
+        vp_rank_interleaving=vp_rank_interleaving,
+        vp_memory_interleaving=vp_memory_interleaving)
 
 
 def bios_conf_scrub_policy(handle, name, parent_org_dn,
@@ -1308,19 +1251,9 @@ def bios_conf_scrub_policy(handle, name, parent_org_dn,
                     vp_demand_scrub="enabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfScrubPolicies import BiosVfScrubPolicies
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfScrubPolicies(parent_mo_or_dn=obj,
-                                 vp_patrol_scrub=vp_patrol_scrub,
-                                 vp_demand_scrub=vp_demand_scrub)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(handle, name, parent_org_dn, "BiosVfScrubPolicies",
+                         vp_patrol_scrub=vp_patrol_scrub,
+                         vp_demand_scrub=vp_demand_scrub)
 
 
 def bios_conf_altitude(handle, name, parent_org_dn,
@@ -1345,17 +1278,9 @@ def bios_conf_altitude(handle, name, parent_org_dn,
                     parent_dn="org-root/org-sample",
                     vp_altitude="3000-m")
     """
-    from ucsmsdk.mometa.bios.BiosVfAltitude import BiosVfAltitude
 
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfAltitude(parent_mo_or_dn=obj, vp_altitude=vp_altitude)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(handle, name, parent_org_dn, "BiosVfAltitude",
+                         vp_altitude=vp_altitude)
 
 
 def bios_conf_intel_directed_io(
@@ -1393,27 +1318,16 @@ def bios_conf_intel_directed_io(
                     vp_intel_vtd_coherency_support="enabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfIntelVTForDirectedIO import \
-        BiosVfIntelVTForDirectedIO
-
-    # Shorten variable name to satisfy flake8, but keep backward compatibility
-    vp_intel_vtd_pass_thru_dma = vp_intel_vtd_pass_through_dma_support
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfIntelVTForDirectedIO(
-            parent_mo_or_dn=obj,
-            vp_intel_vtd_pass_through_dma_support=vp_intel_vtd_pass_thru_dma,
-            vp_intel_vtdats_support=vp_intel_vtdats_support,
-            vp_intel_vtd_interrupt_remapping=vp_intel_vtd_interrupt_remapping,
-            vp_intel_vtd_coherency_support=vp_intel_vtd_coherency_support,
-            vp_intel_vt_for_directed_io=vp_intel_vt_for_directed_io)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    # Shorten variable name to satisfy flake8, but keep backward compatibility
+    vp_intel_vtd_pass_thru_dma = vp_intel_vtd_pass_through_dma_support
+
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfIntelVTForDirectedIO",
+        vp_intel_vtd_pass_through_dma_support=vp_intel_vtd_pass_thru_dma,
+        vp_intel_vtdats_support=vp_intel_vtdats_support,
+        vp_intel_vtd_interrupt_remapping=vp_intel_vtd_interrupt_remapping,
+        vp_intel_vtd_coherency_support=vp_intel_vtd_coherency_support,
+        vp_intel_vt_for_directed_io=vp_intel_vt_for_directed_io)
 
 
 def bios_conf_ras_memory(
@@ -1440,23 +1354,12 @@ def bios_conf_ras_memory(
                     vp_select_memory_ras_configuration="maximum-performance")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfSelectMemoryRASConfiguration import \
-        BiosVfSelectMemoryRASConfiguration
-
     # Shorten variable name to satisfy flake8, but keep backward compatibility
     vp_select_memory_ras_config = vp_select_memory_ras_configuration
 
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfSelectMemoryRASConfiguration(
-            parent_mo_or_dn=obj,
-            vp_select_memory_ras_configuration=vp_select_memory_ras_config)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfSelectMemoryRASConfiguration",
+        vp_select_memory_ras_configuration=vp_select_memory_ras_config)
 
 
 def bios_conf_numa_optimized(handle, name, parent_org_dn,
@@ -1482,18 +1385,8 @@ def bios_conf_numa_optimized(handle, name, parent_org_dn,
                     vp_numa_optimized="disabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfNUMAOptimized import BiosVfNUMAOptimized
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfNUMAOptimized(parent_mo_or_dn=obj,
-                                 vp_numa_optimized=vp_numa_optimized)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(handle, name, parent_org_dn, "BiosVfNUMAOptimized",
+                         vp_numa_optimized=vp_numa_optimized)
 
 
 def bios_conf_ddr_mode(handle, name, parent_org_dn,
@@ -1519,18 +1412,8 @@ def bios_conf_ddr_mode(handle, name, parent_org_dn,
                     vp_lv_ddr_mode="auto")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfLvDIMMSupport import BiosVfLvDIMMSupport
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfLvDIMMSupport(parent_mo_or_dn=obj,
-                                 vp_lv_ddr_mode=vp_lv_ddr_mode)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(handle, name, parent_org_dn, "BiosVfLvDIMMSupport",
+                         vp_lv_ddr_mode=vp_lv_ddr_mode)
 
 
 def bios_conf_dram_refresh_rate(handle, name, parent_org_dn,
@@ -1556,18 +1439,8 @@ def bios_conf_dram_refresh_rate(handle, name, parent_org_dn,
                     vp_dram_refresh_rate="2x")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfDramRefreshRate import BiosVfDramRefreshRate
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfDramRefreshRate(parent_mo_or_dn=obj,
-                                   vp_dram_refresh_rate=vp_dram_refresh_rate)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(handle, name, parent_org_dn, "BiosVfDramRefreshRate",
+                         vp_dram_refresh_rate=vp_dram_refresh_rate)
 
 
 def bios_conf_serial_port_a(handle, name, parent_org_dn,
@@ -1593,20 +1466,9 @@ def bios_conf_serial_port_a(handle, name, parent_org_dn,
                     vp_serial_port_a_enable="2x")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfSerialPortAEnable import \
-        BiosVfSerialPortAEnable
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfSerialPortAEnable(
-            parent_mo_or_dn=obj,
-            vp_serial_port_a_enable=vp_serial_port_a_enable)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfSerialPortAEnable",
+        vp_serial_port_a_enable=vp_serial_port_a_enable)
 
 
 def bios_conf_usb_boot(handle, name, parent_org_dn,
@@ -1635,20 +1497,10 @@ def bios_conf_usb_boot(handle, name, parent_org_dn,
                     vp_legacy_usb_support="auto")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfUSBBootConfig import BiosVfUSBBootConfig
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfUSBBootConfig(
-            parent_mo_or_dn=obj,
-            vp_legacy_usb_support=vp_legacy_usb_support,
-            vp_make_device_non_bootable=vp_make_device_non_bootable)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfUSBBootConfig",
+        vp_legacy_usb_support=vp_legacy_usb_support,
+        vp_make_device_non_bootable=vp_make_device_non_bootable)
 
 
 def bios_conf_usb_idle_power(handle, name, parent_org_dn,
@@ -1674,20 +1526,10 @@ def bios_conf_usb_idle_power(handle, name, parent_org_dn,
                     vp_usb_idle_power_optimizing="high-performance")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfUSBSystemIdlePowerOptimizingSetting import \
-        BiosVfUSBSystemIdlePowerOptimizingSetting
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfUSBSystemIdlePowerOptimizingSetting(
-            parent_mo_or_dn=obj,
-            vp_usb_idle_power_optimizing=vp_usb_idle_power_optimizing)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn,
+        "BiosVfUSBSystemIdlePowerOptimizingSetting",
+        vp_usb_idle_power_optimizing=vp_usb_idle_power_optimizing)
 
 
 def bios_conf_usb_front_panel_lock(handle, name, parent_org_dn,
@@ -1713,20 +1555,9 @@ def bios_conf_usb_front_panel_lock(handle, name, parent_org_dn,
                     vp_usb_front_panel_lock="disabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfUSBFrontPanelAccessLock import \
-        BiosVfUSBFrontPanelAccessLock
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfUSBFrontPanelAccessLock(
-            parent_mo_or_dn=obj,
-            vp_usb_front_panel_lock=vp_usb_front_panel_lock)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfUSBFrontPanelAccessLock",
+        vp_usb_front_panel_lock=vp_usb_front_panel_lock)
 
 
 def bios_conf_usb_port(handle, name, parent_org_dn,
@@ -1764,26 +1595,15 @@ def bios_conf_usb_port(handle, name, parent_org_dn,
                     vp_usb_port_front="enabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfUSBPortConfiguration import \
-        BiosVfUSBPortConfiguration
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfUSBPortConfiguration(
-            parent_mo_or_dn=obj,
-            vp_usb_port_front=vp_usb_port_front,
-            vp_usb_port_v_media=vp_usb_port_v_media,
-            vp_usb_port_kvm=vp_usb_port_kvm,
-            vp_port6064_emulation=vp_port6064_emulation,
-            vp_usb_port_rear=vp_usb_port_rear,
-            vp_usb_port_internal=vp_usb_port_internal,
-            vp_usb_port_sd_card=vp_usb_port_sd_card)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfUSBPortConfiguration",
+        vp_usb_port_front=vp_usb_port_front,
+        vp_usb_port_v_media=vp_usb_port_v_media,
+        vp_usb_port_kvm=vp_usb_port_kvm,
+        vp_port6064_emulation=vp_port6064_emulation,
+        vp_usb_port_rear=vp_usb_port_rear,
+        vp_usb_port_internal=vp_usb_port_internal,
+        vp_usb_port_sd_card=vp_usb_port_sd_card)
 
 
 def bios_conf_usb_all(handle, name, parent_org_dn,
@@ -1809,18 +1629,8 @@ def bios_conf_usb_all(handle, name, parent_org_dn,
                     vp_all_usb_devices="disabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfAllUSBDevices import BiosVfAllUSBDevices
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfAllUSBDevices(parent_mo_or_dn=obj,
-                                 vp_all_usb_devices=vp_all_usb_devices)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(handle, name, parent_org_dn, "BiosVfAllUSBDevices",
+                         vp_all_usb_devices=vp_all_usb_devices)
 
 
 def bios_conf_usb_vf(handle, name, parent_org_dn,
@@ -1848,21 +1658,9 @@ def bios_conf_usb_vf(handle, name, parent_org_dn,
                     vp_legacy_usb_support="disabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfUSBConfiguration import \
-        BiosVfUSBConfiguration
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfUSBConfiguration(
-            parent_mo_or_dn=obj,
-            vp_xhci_mode=vp_xhci_mode,
-            vp_legacy_usb_support=vp_legacy_usb_support)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(handle, name, parent_org_dn, "BiosVfUSBConfiguration",
+                         vp_xhci_mode=vp_xhci_mode,
+                         vp_legacy_usb_support=vp_legacy_usb_support)
 
 
 def bios_conf_max_mem_below_4gb(
@@ -1889,20 +1687,9 @@ def bios_conf_max_mem_below_4gb(
                     vp_maximum_memory_below4_gb="disabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfMaximumMemoryBelow4GB import \
-        BiosVfMaximumMemoryBelow4GB
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfMaximumMemoryBelow4GB(
-            parent_mo_or_dn=obj,
-            vp_maximum_memory_below4_gb=vp_maximum_memory_below4_gb)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfMaximumMemoryBelow4GB",
+        vp_maximum_memory_below4_gb=vp_maximum_memory_below4_gb)
 
 
 def bios_conf_mapped_mem_io(handle, name, parent_org_dn,
@@ -1929,20 +1716,9 @@ def bios_conf_mapped_mem_io(handle, name, parent_org_dn,
                     vp_memory_mapped_io_above4_gb="disabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfMemoryMappedIOAbove4GB import \
-        BiosVfMemoryMappedIOAbove4GB
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfMemoryMappedIOAbove4GB(
-            parent_mo_or_dn=obj,
-            vp_memory_mapped_io_above4_gb=vp_memory_mapped_io_above4_gb)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfMemoryMappedIOAbove4GB",
+        vp_memory_mapped_io_above4_gb=vp_memory_mapped_io_above4_gb)
 
 
 def bios_conf_vga_priority(handle, name, parent_org_dn,
@@ -1968,18 +1744,8 @@ def bios_conf_vga_priority(handle, name, parent_org_dn,
                     vp_vga_priority="offboard")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfVGAPriority import BiosVfVGAPriority
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfVGAPriority(parent_mo_or_dn=obj,
-                               vp_vga_priority=vp_vga_priority)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(handle, name, parent_org_dn, "BiosVfVGAPriority",
+                         vp_vga_priority=vp_vga_priority)
 
 
 def bios_conf_qpi_link_frequency(
@@ -2006,20 +1772,9 @@ def bios_conf_qpi_link_frequency(
                     vp_qpi_link_frequency_select="7200")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfQPILinkFrequencySelect import \
-        BiosVfQPILinkFrequencySelect
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfQPILinkFrequencySelect(
-            parent_mo_or_dn=obj,
-            vp_qpi_link_frequency_select=vp_qpi_link_frequency_select)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfQPILinkFrequencySelect",
+        vp_qpi_link_frequency_select=vp_qpi_link_frequency_select)
 
 
 def bios_conf_qpi_snoop_mode(handle, name, parent_org_dn,
@@ -2045,18 +1800,8 @@ def bios_conf_qpi_snoop_mode(handle, name, parent_org_dn,
                     vp_qpi_snoop_mode="home-snoop")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfQPISnoopMode import BiosVfQPISnoopMode
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfQPISnoopMode(parent_mo_or_dn=obj,
-                                vp_qpi_snoop_mode=vp_qpi_snoop_mode)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(handle, name, parent_org_dn, "BiosVfQPISnoopMode",
+                         vp_qpi_snoop_mode=vp_qpi_snoop_mode)
 
 
 def bios_conf_rom_slot_option(
@@ -2096,34 +1841,23 @@ def bios_conf_rom_slot_option(
                     vp_qpi_snoop_mode="home-snoop")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfPCISlotOptionROMEnable import \
-        BiosVfPCISlotOptionROMEnable
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfPCISlotOptionROMEnable(
-            parent_mo_or_dn=obj,
-            vp_slot3_state=vp_slot3_state,
-            vp_slot4_state=vp_slot4_state,
-            vp_slot1_state=vp_slot1_state,
-            vp_pc_ie_slot_sas_option_rom=vp_pc_ie_slot_sas_option_rom,
-            vp_pc_ie_slot_hba_option_rom=vp_pc_ie_slot_hba_option_rom,
-            vp_slot6_state=vp_slot6_state,
-            vp_slot9_state=vp_slot9_state,
-            vp_pc_ie_slot_n2_option_rom=vp_pc_ie_slot_n2_option_rom,
-            vp_slot7_state=vp_slot7_state,
-            vp_pc_ie_slot_n1_option_rom=vp_pc_ie_slot_n1_option_rom,
-            vp_slot8_state=vp_slot8_state,
-            vp_slot2_state=vp_slot2_state,
-            vp_slot5_state=vp_slot5_state,
-            vp_slot10_state=vp_slot10_state,
-            vp_pc_ie_slot_mlom_option_rom=vp_pc_ie_slot_mlom_option_rom)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfPCISlotOptionROMEnable",
+        vp_slot3_state=vp_slot3_state,
+        vp_slot4_state=vp_slot4_state,
+        vp_slot1_state=vp_slot1_state,
+        vp_pc_ie_slot_sas_option_rom=vp_pc_ie_slot_sas_option_rom,
+        vp_pc_ie_slot_hba_option_rom=vp_pc_ie_slot_hba_option_rom,
+        vp_slot6_state=vp_slot6_state,
+        vp_slot9_state=vp_slot9_state,
+        vp_pc_ie_slot_n2_option_rom=vp_pc_ie_slot_n2_option_rom,
+        vp_slot7_state=vp_slot7_state,
+        vp_pc_ie_slot_n1_option_rom=vp_pc_ie_slot_n1_option_rom,
+        vp_slot8_state=vp_slot8_state,
+        vp_slot2_state=vp_slot2_state,
+        vp_slot5_state=vp_slot5_state,
+        vp_slot10_state=vp_slot10_state,
+        vp_pc_ie_slot_mlom_option_rom=vp_pc_ie_slot_mlom_option_rom)
 
 
 def bios_conf_trusted_platform(
@@ -2150,23 +1884,12 @@ def bios_conf_trusted_platform(
                     vp_trusted_platform_module_support="enabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfTrustedPlatformModule import \
-        BiosVfTrustedPlatformModule
-
     # Shorten variable name to satisfy flake8, but keep backward compatibility
     vp_trusted_platform_mod_support = vp_trusted_platform_module_support
 
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfTrustedPlatformModule(
-            parent_mo_or_dn=obj,
-            vp_trusted_platform_module_support=vp_trusted_platform_mod_support)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfTrustedPlatformModule",
+        vp_trusted_platform_module_support=vp_trusted_platform_mod_support)
 
 
 def bios_conf_trusted_execution(
@@ -2193,23 +1916,12 @@ def bios_conf_trusted_execution(
                     vp_intel_trusted_execution_technology_support="enabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfIntelTrustedExecutionTechnology import \
-        BiosVfIntelTrustedExecutionTechnology
-
     # Shorten variable name to satisfy flake8, but keep backward compatibility
     vp_trust_exec_tech = vp_intel_trusted_execution_technology_support
 
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfIntelTrustedExecutionTechnology(
-            parent_mo_or_dn=obj,
-            vp_intel_trusted_execution_technology_support=vp_trust_exec_tech)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfIntelTrustedExecutionTechnology",
+        vp_intel_trusted_execution_technology_support=vp_trust_exec_tech)
 
 
 def bios_conf_boot_option_retry(handle, name, parent_org_dn,
@@ -2235,18 +1947,8 @@ def bios_conf_boot_option_retry(handle, name, parent_org_dn,
                     vp_boot_option_retry="enabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfBootOptionRetry import BiosVfBootOptionRetry
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfBootOptionRetry(parent_mo_or_dn=obj,
-                                   vp_boot_option_retry=vp_boot_option_retry)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(handle, name, parent_org_dn, "BiosVfBootOptionRetry",
+                         vp_boot_option_retry=vp_boot_option_retry)
 
 
 def bios_conf_intel_sas_raid(handle, name, parent_org_dn,
@@ -2274,20 +1976,10 @@ def bios_conf_intel_sas_raid(handle, name, parent_org_dn,
                     vp_sasraid="enabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfIntelEntrySASRAIDModule import \
-        BiosVfIntelEntrySASRAIDModule
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfIntelEntrySASRAIDModule(parent_mo_or_dn=obj,
-                                           vp_sasraid=vp_sasraid,
-                                           vp_sasraid_module=vp_sasraid_module)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfIntelEntrySASRAIDModule",
+        vp_sasraid=vp_sasraid,
+        vp_sasraid_module=vp_sasraid_module)
 
 
 def bios_conf_onboard_scu__storage(
@@ -2314,19 +2006,9 @@ def bios_conf_onboard_scu__storage(
                     vp_onboard_scu_storage_support="enabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfOnboardStorage import BiosVfOnboardStorage
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfOnboardStorage(
-            parent_mo_or_dn=obj,
-            vp_onboard_scu_storage_support=vp_onboard_scu_storage_support)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfOnboardStorage",
+        vp_onboard_scu_storage_support=vp_onboard_scu_storage_support)
 
 
 def bios_conf_assert_nmi_serr(handle, name, parent_org_dn,
@@ -2352,18 +2034,8 @@ def bios_conf_assert_nmi_serr(handle, name, parent_org_dn,
                     vp_assert_nmi_on_serr="enabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfAssertNMIOnSERR import BiosVfAssertNMIOnSERR
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfAssertNMIOnSERR(parent_mo_or_dn=obj,
-                                   vp_assert_nmi_on_serr=vp_assert_nmi_on_serr)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(handle, name, parent_org_dn, "BiosVfAssertNMIOnSERR",
+                         vp_assert_nmi_on_serr=vp_assert_nmi_on_serr)
 
 
 def bios_conf_assert_nmi_perr(handle, name, parent_org_dn,
@@ -2389,18 +2061,8 @@ def bios_conf_assert_nmi_perr(handle, name, parent_org_dn,
                     vp_assert_nmi_on_perr="enabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfAssertNMIOnPERR import BiosVfAssertNMIOnPERR
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfAssertNMIOnPERR(parent_mo_or_dn=obj,
-                                   vp_assert_nmi_on_perr=vp_assert_nmi_on_perr)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(handle, name, parent_org_dn, "BiosVfAssertNMIOnPERR",
+                         vp_assert_nmi_on_perr=vp_assert_nmi_on_perr)
 
 
 def bios_conf_boot_watchdog_timer(
@@ -2427,20 +2089,9 @@ def bios_conf_boot_watchdog_timer(
                     vp_os_boot_watchdog_timer="enabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfOSBootWatchdogTimer import \
-        BiosVfOSBootWatchdogTimer
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfOSBootWatchdogTimer(
-            parent_mo_or_dn=obj,
-            vp_os_boot_watchdog_timer=vp_os_boot_watchdog_timer)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfOSBootWatchdogTimer",
+        vp_os_boot_watchdog_timer=vp_os_boot_watchdog_timer)
 
 
 def bios_conf_boot_watchdog_timer_policy(
@@ -2467,20 +2118,9 @@ def bios_conf_boot_watchdog_timer_policy(
                     vp_os_boot_watchdog_timer_policy="enabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfOSBootWatchdogTimerPolicy import \
-        BiosVfOSBootWatchdogTimerPolicy
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfOSBootWatchdogTimerPolicy(
-            parent_mo_or_dn=obj,
-            vp_os_boot_watchdog_timer_policy=vp_os_boot_watchdog_timer_policy)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfOSBootWatchdogTimerPolicy",
+        vp_os_boot_watchdog_timer_policy=vp_os_boot_watchdog_timer_policy)
 
 
 def bios_conf_boot_watchdog_timer_timeout(
@@ -2507,22 +2147,12 @@ def bios_conf_boot_watchdog_timer_timeout(
                     vp_os_boot_watchdog_timer_timeout="enabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfOSBootWatchdogTimerTimeout import \
-        BiosVfOSBootWatchdogTimerTimeout
-
     # Shorten variable name to satisfy flake8, but keep backward compatibility
     vp_boot_watchdog_timer_timeout = vp_os_boot_watchdog_timer_timeout
 
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfOSBootWatchdogTimerTimeout(
-            parent_mo_or_dn=obj,
-            vp_os_boot_watchdog_timer_timeout=vp_boot_watchdog_timer_timeout)
-        handle.add_mo(mo, True)
-        handle.commit()
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(
+        handle, name, parent_org_dn, "BiosVfOSBootWatchdogTimerTimeout",
+        vp_os_boot_watchdog_timer_timeout=vp_boot_watchdog_timer_timeout)
 
 
 def bios_conf_fr_b2_timer(handle, name, parent_org_dn,
@@ -2548,15 +2178,5 @@ def bios_conf_fr_b2_timer(handle, name, parent_org_dn,
                     vp_fr_b2_timer="enabled")
     """
 
-    from ucsmsdk.mometa.bios.BiosVfFRB2Timer import BiosVfFRB2Timer
-
-    profile_dn = parent_org_dn + "/bios-prof-" + name
-    obj = handle.query_dn(profile_dn)
-    if obj:
-        mo = BiosVfFRB2Timer(parent_mo_or_dn=obj,
-                             vp_fr_b2_timer=vp_fr_b2_timer)
-        handle.add_mo(mo, True)
-        handle.commit()
-        return mo
-    else:
-        raise ValueError("Bios policy '%s' not found." % profile_dn)
+    return _bios_conf_vf(handle, name, parent_org_dn, "BiosVfFRB2Timer",
+                         vp_fr_b2_timer=vp_fr_b2_timer)
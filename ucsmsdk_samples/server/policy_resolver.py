@@ -0,0 +1,340 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains an in-memory index of the org tree and its policies,
+so that a policy name resolves to the policy of the nearest org without a
+round-trip per org level.
+"""
+
+import json
+import logging
+import threading
+import time
+
+from ucsmsdk_samples.utils.eventchannel import open_event_channel, \
+    read_event, close_event_channel
+
+log = logging.getLogger('ucs')
+
+# policies UCSM resolves by name from an org up to org-root, LsServer being
+# indexed for its templates only
+POLICY_CLASS_IDS = ["LsServer", "FirmwareComputeHostPack",
+                    "FirmwareComputeMgmtPack", "LsbootPolicy",
+                    "BiosVProfile", "LsmaintMaintPolicy",
+                    "StorageLocalDiskConfigPolicy", "VnicLanConnPolicy",
+                    "VnicSanConnPolicy", "ComputeScrubPolicy", "SolPolicy",
+                    "PowerPolicy", "ComputePool", "VnicDynamicConPolicy"]
+
+_TEMPLATE_TYPES = ["initial-template", "updating-template"]
+
+
+def _parent_dn(dn):
+    return dn.rsplit("/", 1)[0] if "/" in dn else None
+
+
+class PolicyResolver(object):
+    """
+    Resolves policy names the way UCSM does, to the policy of that name in
+    the nearest org from a given org up to org-root.
+
+    The org tree and the policies are read with one configResolveClasses
+    request, after which a resolution is a dictionary lookup. When started,
+    the resolver follows the event channel on a session of its own and
+    applies every org and policy change to the index as it happens,
+    reading everything again only when the channel had to be reopened.
+
+    A name that does not resolve reads the index again before giving up,
+    in case the policy is newer than the index, unless the index was read
+    less than reload_interval seconds ago. The miss is then remembered for
+    reload_interval seconds, or until the next change or load.
+
+    Args:
+        handle (UcsHandle)
+        class_ids (list): policy class ids to index
+        stall_timeout (number): seconds of silence after which the event
+            channel is reopened
+        reload_interval (number): least seconds between two loads caused
+            by names that do not resolve
+
+    Example:
+        with PolicyResolver(handle) as resolver:
+            resolver.resolve("FirmwareComputeHostPack", "hfp-3.1",
+                             "org-root/org-web/org-front")
+            hfp_sp_attach(handle, sp_dn, "hfp-3.1", resolver=resolver)
+    """
+
+    def __init__(self, handle, class_ids=None, stall_timeout=10*60,
+                 reload_interval=10):
+        self._handle = handle
+        self.class_ids = list(class_ids or POLICY_CLASS_IDS)
+        self.stall_timeout = stall_timeout
+        self.reload_interval = reload_interval
+        self._class_ids = dict((class_id.lower(), class_id)
+                               for class_id in self.class_ids)
+        self._lock = threading.Lock()
+        # org dn -> parent org dn, None for org-root
+        self._orgs = {}
+        # class id -> {(org dn, name): policy dn}
+        self._names = {}
+        # policy dn -> (class id, org dn, name)
+        self._dns = {}
+        # (class id, name, org dn) -> policy dn
+        self._resolved = {}
+        # (class id, name, org dn) -> time it did not resolve
+        self._missed = {}
+        self._loaded_at = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._session = None
+        self.loads = 0
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def load(self):
+        """
+        Reads the org tree and the policies, replacing the index
+        """
+
+        self._load(self._handle)
+
+    def _load(self, handle):
+        mos = handle.query_classids("OrgOrg", *self.class_ids)
+        orgs = {}
+        for org in mos["OrgOrg"]:
+            orgs[org.dn] = _parent_dn(org.dn)
+        names = {}
+        dns = {}
+        for class_id in self.class_ids:
+            names[class_id] = {}
+            for mo in mos[class_id]:
+                if class_id == "LsServer" and mo.type not in _TEMPLATE_TYPES:
+                    continue
+                org_dn = _parent_dn(mo.dn)
+                names[class_id][(org_dn, mo.name)] = mo.dn
+                dns[mo.dn] = (class_id, org_dn, mo.name)
+        with self._lock:
+            self._orgs = orgs
+            self._names = names
+            self._dns = dns
+            self._invalidate()
+            self._loaded_at = time.time()
+            self.loads += 1
+        log.debug("Indexed %d orgs and %d policies", len(orgs), len(dns))
+
+    def _invalidate(self):
+        # caller holds self._lock
+        self._resolved = {}
+        self._missed = {}
+
+    def _lookup(self, class_id, name, org_dn):
+        # caller holds self._lock
+        key = (class_id, name, org_dn)
+        if key in self._resolved:
+            return self._resolved[key]
+        names = self._names.get(class_id, {})
+        org = org_dn
+        while org is not None and org in self._orgs:
+            dn = names.get((org, name))
+            if dn is not None:
+                self._resolved[key] = dn
+                return dn
+            org = self._orgs[org]
+        return None
+
+    def resolve(self, class_id, name, org_dn="org-root"):
+        """
+        Returns the dn of the policy named name in org_dn or its nearest
+        parent org, None if there is none
+
+        Args:
+            class_id (string): policy class id, e.g. "FirmwareComputeHostPack"
+            name (string): policy name
+            org_dn (string): org to resolve from
+        """
+
+        indexed_class_id = self._class_ids.get(class_id.lower())
+        if indexed_class_id is None:
+            raise ValueError("Class '%s' is not indexed" % class_id)
+        class_id = indexed_class_id
+        if self._loaded_at is None:
+            self.load()
+        key = (class_id, name, org_dn)
+        with self._lock:
+            dn = self._lookup(class_id, name, org_dn)
+            if dn is not None:
+                return dn
+            if time.time() - self._missed.get(key, 0) < \
+                    self.reload_interval:
+                return None
+            reload = time.time() - self._loaded_at >= self.reload_interval
+        if reload:
+            # the policy or its org may be newer than the index
+            self.load()
+        with self._lock:
+            dn = self._lookup(class_id, name, org_dn)
+            if dn is None:
+                self._missed[key] = time.time()
+        return dn
+
+    def apply(self, class_id, dn, status, name=None, type=None):
+        """
+        Applies one change to the index, as reported by an event
+
+        Args:
+            class_id (string): class id of the changed managed object
+            dn (string): its dn
+            status (string): "created", "modified" or "deleted"
+            name (string): its name, if known
+            type (string): its type, if known, for LsServer
+        """
+
+        class_id = "OrgOrg" if class_id.lower() == "orgorg" else \
+            self._class_ids.get(class_id.lower())
+        if class_id is None:
+            return
+        with self._lock:
+            if class_id == "OrgOrg":
+                self._invalidate()
+                if "deleted" not in status:
+                    self._orgs[dn] = _parent_dn(dn)
+                    return
+                for org_dn in list(self._orgs):
+                    if org_dn == dn or org_dn.startswith(dn + "/"):
+                        del self._orgs[org_dn]
+                for policy_dn in list(self._dns):
+                    if policy_dn.startswith(dn + "/"):
+                        self._forget(policy_dn)
+                return
+
+            indexed = self._dns.get(dn)
+            if "deleted" in status or (class_id == "LsServer" and type and
+                                       type not in _TEMPLATE_TYPES):
+                self._forget(dn)
+                return
+            if class_id == "LsServer" and indexed is None and \
+                    type not in _TEMPLATE_TYPES:
+                return
+            name = name or (indexed[2] if indexed else None)
+            if name is None or (indexed and indexed[2] == name):
+                return
+            self._forget(dn)
+            org_dn = _parent_dn(dn)
+            self._invalidate()
+            self._names.setdefault(class_id, {})[(org_dn, name)] = dn
+            self._dns[dn] = (class_id, org_dn, name)
+
+    def _forget(self, dn):
+        # caller holds self._lock
+        indexed = self._dns.pop(dn, None)
+        if indexed is not None:
+            self._invalidate()
+            class_id, org_dn, name = indexed
+            self._names[class_id].pop((org_dn, name), None)
+
+    def start(self):
+        """
+        Loads the index and keeps it up to date from the event channel, in
+        a background thread, until stop()
+        """
+
+        if self._thread is None:
+            # a clone of the handle without its cookie, the driver of a
+            # handle is not thread safe
+            frozen = json.loads(self._handle.freeze())
+            frozen.update(cookie=None, session_id=None, auto_refresh=False)
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run,
+                                            args=(json.dumps(frozen),),
+                                            name="policy-resolver")
+            self._thread.daemon = True
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stops following the events and waits for the background thread to
+        end
+        """
+
+        thread = self._thread
+        if thread is None:
+            return
+        self._stop.set()
+        # the channel is closed by the thread reading it, a close from
+        # another thread would block on the reader. Ending the session
+        # ends the channel too.
+        with self._lock:
+            session, self._session = self._session, None
+        if session is not None:
+            try:
+                session.logout()
+            except Exception as e:
+                log.debug("Policy resolver logout failed: %s", e)
+        thread.join(self.stall_timeout)
+        self._thread = None
+
+    def _run(self, frozen):
+        from ucsmsdk.ucshandle import UcsHandle
+
+        while not self._stop.is_set():
+            session = UcsHandle.unfreeze(frozen)
+            try:
+                session.login()
+            except Exception as e:
+                log.debug("Policy resolver login failed: %s", e)
+                self._stop.wait(self.stall_timeout)
+                continue
+            with self._lock:
+                self._session = session
+            if not self._stop.is_set():
+                self._follow(session)
+            with self._lock:
+                # None once stop() logged the session out
+                owned = self._session is session
+                self._session = None
+            if owned:
+                try:
+                    session.logout()
+                except Exception as e:
+                    log.debug("Policy resolver logout failed: %s", e)
+
+    def _follow(self, session):
+        """
+        Applies the events of one subscription, until it stalls, fails or
+        stop()
+        """
+
+        while not self._stop.is_set():
+            channel = open_event_channel(session, self.stall_timeout)
+            try:
+                # changes before the channel opened are in the load
+                self._load(session)
+            except Exception as e:
+                log.debug("Policy index load failed: %s", e)
+            if channel is None:
+                self._stop.wait(self.stall_timeout)
+                return
+            while not self._stop.is_set():
+                elems = read_event(channel)
+                if elems is None:
+                    break
+                for elem in elems:
+                    self.apply(elem.tag, elem.get("dn"),
+                               elem.get("status", ""), name=elem.get("name"),
+                               type=elem.get("type"))
+            close_event_channel(channel)
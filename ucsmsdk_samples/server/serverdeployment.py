@@ -12,18 +12,19 @@
 # limitations under the License.
 
 
+import json
 import time
-import datetime
 import logging
+import threading
+import weakref
 from ucsmsdk.ucseventhandler import UcsEventHandle
 from ucsmsdk.mometa.ls.LsServer import LsServerConsts
 
-log = logging.getLogger('ucs')
-
+from ucsmsdk_samples.utils.eventchannel import open_event_channel, \
+    read_event, close_event_channel
+from ucsmsdk_samples.utils.poller import Poller
 
-# TODO: should not be global. This will not work when multiple nodes are
-# associate in parallel
-end_script = False
+log = logging.getLogger('ucs')
 
 
 # ###########################################
@@ -31,31 +32,304 @@ end_script = False
 # ###########################################
 
 
-def _sp_associate_callback(mce):
+def _sp_config_qualifier(handle, sp_mo):
     """
-    Callback for service profile association
+    Returns a readable qualifier for a service profile that failed to apply
+    its configuration, built from its config-issue object when present
     """
 
-    global end_script
-    if mce.mo.assoc_state == LsServerConsts.ASSOC_STATE_ASSOCIATED:
-        log.debug("SP:" + mce.mo.dn + " Assoc Successful. assoc_state: " +
-                  mce.mo.assoc_state)
-    elif mce.mo.assoc_state == LsServerConsts.ASSIGN_STATE_FAILED:
-        log.error("SP:" + mce.mo.dn + " Assoc Failed. assoc_state: " +
-                  mce.mo.assoc_state)
-    end_script = True
+    ls_issues = handle.query_dn(sp_mo.dn + "/config-issue")
+    qualifier = sp_mo.config_qualifier
+    if ls_issues:
+        qualifier = ""
+        if ls_issues.iscsi_config_issues:
+            qualifier = qualifier + "iSCSI: " + \
+                ls_issues.iscsi_config_issues
+        if ls_issues.network_config_issues:
+            if len(qualifier) > 0:
+                qualifier += ". "
+            qualifier = qualifier + "Network: " + \
+                ls_issues.network_config_issues
+        if ls_issues.server_config_issues:
+            if len(qualifier) > 0:
+                qualifier += ". "
+            qualifier = qualifier + "Server: " + \
+                ls_issues.server_config_issues
+        if ls_issues.storage_config_issues:
+            if len(qualifier) > 0:
+                qualifier += ". "
+            qualifier = qualifier + "Storage: " + \
+                ls_issues.storage_config_issues
+        if ls_issues.vnic_config_issues:
+            if len(qualifier) > 0:
+                qualifier += ". "
+            qualifier = qualifier + "vNIC: " + \
+                ls_issues.vnic_config_issues
+    return qualifier
+
+
+class AssociationWaiter(object):
+    """
+    Waits for the association FSM of any number of servers at once, for
+    any number of concurrent callers.
+
+    A single background thread follows the UCSM event channel and
+    completes a wait as soon as its server reports association, or its
+    service profile a config failure. Whenever the channel cannot be
+    opened, drops or stays silent for stall_timeout seconds, the thread
+    falls back to one query of every pending service profile and server
+    per poll_interval for stall_timeout seconds before it opens the channel
+    again.
 
+    The thread uses a session of its own, as the driver of a handle is not
+    thread safe, and logs it out as soon as no wait is pending, which also
+    ends the event channel.
 
-def _sp_associate_monitor(event_handle, mo):
+    Args:
+        handle (UcsHandle)
+        poll_interval (number): seconds between two fallback queries
+        stall_timeout (number): seconds of silence after which the event
+            channel is considered stalled
+        use_events (bool): False polls only
+
+    Example:
+        waiter = get_association_waiter(handle)
+        status = waiter.wait("org-root/ls-chassis1-blade1",
+                             "sys/chassis-1/blade-1")
     """
-    Adds an event handler to monitor the service profile until SP get
-    associated.
+
+    def __init__(self, handle, poll_interval=10, stall_timeout=60,
+                 use_events=True):
+        # the waiters are shared per handle, see get_association_waiter
+        self._handle = weakref.proxy(handle)
+        self.poll_interval = poll_interval
+        self.stall_timeout = stall_timeout
+        self.use_events = use_events
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._pending = {}
+        self._servers = {}
+        self._thread = None
+        self._session = None
+        self._channel = None
+        self._subscribe_at = 0
+
+    def wait(self, sp_dn, server_dn, timeout=20*60):
+        """
+        Waits until server_dn has completed association
+
+        Args:
+            sp_dn (string): dn of service profile
+            server_dn (string): dn of blade or rack
+            timeout (number): wait timeout in seconds
+
+        Returns:
+            string: "associated", "failed" (config failure of the service
+            profile) or "timeout"
+        """
+
+        with self._lock:
+            entry = self._pending.get(sp_dn)
+            if entry is None:
+                entry = {"sp_dn": sp_dn, "server_dn": server_dn,
+                         "status": None, "done": threading.Event(),
+                         "callers": 0}
+                self._pending[sp_dn] = entry
+                self._servers[server_dn] = entry
+            entry["callers"] += 1
+            start_thread = self._thread is None
+            if start_thread:
+                self._thread = threading.Thread(
+                    target=self._run, args=(self._frozen(),),
+                    name="association-waiter")
+                self._thread.daemon = True
+        if start_thread:
+            self._thread.start()
+
+        try:
+            # the entry is registered first, no change can fall in between
+            self._check(self._handle, [entry])
+            entry["done"].wait(timeout)
+        finally:
+            with self._lock:
+                entry["callers"] -= 1
+                if entry["status"] is None and not entry["callers"]:
+                    self._forget(entry)
+            self._end_channel()
+        return entry["status"] or "timeout"
+
+    def _frozen(self):
+        # a clone of the handle without its cookie, to open its own session
+        frozen = json.loads(self._handle.freeze())
+        frozen.update(cookie=None, session_id=None, auto_refresh=False)
+        return json.dumps(frozen)
+
+    def _forget(self, entry):
+        # caller holds self._lock
+        if self._pending.get(entry["sp_dn"]) is entry:
+            del self._pending[entry["sp_dn"]]
+        if self._servers.get(entry["server_dn"]) is entry:
+            del self._servers[entry["server_dn"]]
+        if not self._pending:
+            self._wake.notify()
+
+    def _complete(self, entry, status):
+        with self._lock:
+            if entry["status"] is not None:
+                return
+            entry["status"] = status
+            self._forget(entry)
+        log.debug('Server %s association %s', entry["server_dn"], status)
+        entry["done"].set()
+
+    def _check(self, handle, entries):
+        """
+        Completes the entries from one query of their service profiles and
+        servers
+        """
+
+        dns = []
+        for entry in entries:
+            dns.extend([entry["sp_dn"], entry["server_dn"]])
+        try:
+            mos = handle.query_dns(dns)
+        except Exception as e:
+            log.debug("Association query failed: %s", e)
+            return
+        for entry in entries:
+            sp_mo = mos.get(entry["sp_dn"])
+            phys_mo = mos.get(entry["server_dn"])
+            if sp_mo is not None and sp_mo.config_state == 'failed-to-apply':
+                self._complete(entry, "failed")
+            elif phys_mo is not None and phys_mo.association == 'associated':
+                self._complete(entry, "associated")
+
+    def _on_event(self, elem):
+        dn = elem.get("dn")
+        with self._lock:
+            server_entry = self._servers.get(dn)
+            sp_entry = self._pending.get(dn)
+        if server_entry is not None and \
+                elem.get("association") == 'associated':
+            self._complete(server_entry, "associated")
+        elif sp_entry is not None and \
+                elem.get("configState") == 'failed-to-apply':
+            self._complete(sp_entry, "failed")
+
+    def _end_channel(self):
+        """
+        Logs the session of the thread out once no wait is pending, UCSM
+        then ends the event channel the thread is blocked on
+        """
+
+        # the channel is closed by the thread reading it, a close from
+        # another thread would block on the reader
+        with self._lock:
+            if self._pending or self._channel is None:
+                return
+            session = self._session
+            self._session = None
+        try:
+            session.logout()
+        except Exception as e:
+            log.debug("Association waiter logout failed: %s", e)
+
+    def _read_events(self, session, channel):
+        """
+        Reads event channel messages until the channel stalls, fails or no
+        wait is pending, and checks the pending waits every stall_timeout
+        in case an event was lost
+        """
+
+        checked_at = time.time()
+        while True:
+            with self._lock:
+                if not self._pending:
+                    return
+                entries = list(self._pending.values())
+            if time.time() - checked_at >= self.stall_timeout:
+                self._check(session, entries)
+                checked_at = time.time()
+            elems = read_event(channel)
+            if elems is None:
+                return
+            for elem in elems:
+                self._on_event(elem)
+
+    def _run(self, frozen):
+        from ucsmsdk.ucshandle import UcsHandle
+
+        session = None
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._thread = None
+                    session, self._session = self._session, None
+                    break
+                entries = list(self._pending.values())
+                if self._session is None:
+                    # the first pass, or the session was logged out by the
+                    # last wait while a new one registered
+                    session = None
+
+            if session is None:
+                session = UcsHandle.unfreeze(frozen)
+                try:
+                    session.login()
+                except Exception as e:
+                    log.debug("Association waiter login failed: %s", e)
+                    with self._lock:
+                        if self._pending:
+                            self._wake.wait(self.poll_interval)
+                    session = None
+                    continue
+                with self._lock:
+                    self._session = session
+
+            channel = None
+            if self.use_events and time.time() >= self._subscribe_at:
+                channel = open_event_channel(session, self.stall_timeout)
+                if channel is None:
+                    self._subscribe_at = time.time() + self.stall_timeout
+            if channel is not None:
+                with self._lock:
+                    self._channel = channel
+                # a change may have happened before the channel opened
+                self._check(session, entries)
+                self._read_events(session, channel)
+                with self._lock:
+                    self._channel = None
+                close_event_channel(channel)
+                # the channel stalled or dropped, poll for a while
+                self._subscribe_at = time.time() + self.stall_timeout
+                continue
+
+            self._check(session, entries)
+            with self._lock:
+                if self._pending:
+                    self._wake.wait(self.poll_interval)
+        if session is not None:
+            try:
+                session.logout()
+            except Exception as e:
+                log.debug("Association waiter logout failed: %s", e)
+
+
+_association_waiters = weakref.WeakKeyDictionary()
+_association_waiters_lock = threading.Lock()
+
+
+def get_association_waiter(handle):
+    """
+    Returns the AssociationWaiter shared by every wait on handle
     """
 
-    event_handle.add(managed_object=mo, prop="assoc_state",
-                     success_value=[LsServerConsts.ASSOC_STATE_ASSOCIATED],
-                     failure_value=[LsServerConsts.ASSOC_STATE_FAILED],
-                     timeout_sec=600, call_back=_sp_associate_callback)
+    with _association_waiters_lock:
+        waiter = _association_waiters.get(handle)
+        if waiter is None:
+            waiter = AssociationWaiter(handle)
+            _association_waiters[handle] = waiter
+        return waiter
 
 
 def wait_assoc_completion(handle, sp_dn, server_dn,
@@ -63,68 +337,40 @@ def wait_assoc_completion(handle, sp_dn, server_dn,
     """
     Wait until the specified physical server has completed the association FSM
     Return an error if the Service Profile has a config error.
-    """
 
-    start = datetime.datetime.now()
-    # TODO: This event handle does not work for me....
-    # add a watch on sp
-    # event_handle = UcsEventHandle(handle)
-    # _sp_associate_monitor(event_handle=event_handle, mo=sp)
+    Concurrent waits on the same handle share one event subscription, see
+    AssociationWaiter.
+    """
 
-    sp_mo = handle.query_dn(sp_dn)
+    mos = handle.query_dns([sp_dn, server_dn])
+    sp_mo = mos.get(sp_dn)
     if sp_mo is None:
         raise Exception("Service Profile %s does not exist", sp_dn)
     if sp_mo.config_state == 'failed-to-apply':
         log.debug("Service Profile %s has config failure: %s", sp_dn,
                   sp_mo.config_qualifier)
-        ls_issues = handle.query_dn(sp_dn + "/config-issue")
-        qualifier = sp_mo.config_qualifier
-        if ls_issues:
-            qualifier = ""
-            if ls_issues.iscsi_config_issues:
-                qualifier = qualifier + "iSCSI: " + \
-                    ls_issues.iscsi_config_issues
-            if ls_issues.network_config_issues:
-                if len(qualifier) > 0:
-                    qualifier += ". "
-                qualifier = qualifier + "Network: " + \
-                    ls_issues.network_config_issues
-            if ls_issues.server_config_issues:
-                if len(qualifier) > 0:
-                    qualifier += ". "
-                qualifier = qualifier + "Server: " + \
-                    ls_issues.server_config_issues
-            if ls_issues.storage_config_issues:
-                if len(qualifier) > 0:
-                    qualifier += ". "
-                qualifier = qualifier + "Storage: " + \
-                    ls_issues.storage_config_issues
-            if ls_issues.vnic_config_issues:
-                if len(qualifier) > 0:
-                    qualifier += ". "
-                qualifier = qualifier + "vNIC: " + \
-                    ls_issues.vnic_config_issues
-
+        qualifier = _sp_config_qualifier(handle, sp_mo)
         raise Exception("Service Profile %s config failure: %s qualifier: %s" %
                         (sp_mo.name, sp_mo.config_state, qualifier))
-    phys_mo = handle.query_dn(server_dn)
+    phys_mo = mos.get(server_dn)
     if phys_mo is None:
         raise Exception("Server %s does not exist" % sp_dn)
-    while phys_mo.association != 'associated':
-        time.sleep(10)
-        if (datetime.datetime.now() - start).total_seconds() > \
-                assoc_completion_timeout:
-            log.error('Server %s has not completed association', server_dn)
-            break
-        log.debug('Server %s fsmStatus: %s, elapsed=%ds', server_dn,
-                  phys_mo.fsm_status,
-                  (datetime.datetime.now() - start).total_seconds())
-        # Query again to update association state
-        phys_mo = handle.query_dn(server_dn)
-
     if phys_mo.association == 'associated':
+        return
+
+    start = time.time()
+    status = get_association_waiter(handle).wait(
+        sp_dn, server_dn, timeout=assoc_completion_timeout)
+    if status == "timeout":
+        log.error('Server %s has not completed association', server_dn)
+    elif status == "failed":
+        sp_mo = handle.query_dn(sp_dn)
+        qualifier = _sp_config_qualifier(handle, sp_mo)
+        raise Exception("Service Profile %s config failure: %s qualifier: %s" %
+                        (sp_mo.name, sp_mo.config_state, qualifier))
+    else:
         log.debug('Server %s has completed association in %d seconds',
-                  server_dn, (datetime.datetime.now() - start).total_seconds())
+                  server_dn, time.time() - start)
 
 
 def sp_associate(handle, sp_dn, server_dn, wait_for_assoc_completion=True,
@@ -191,45 +437,182 @@ def sp_associate(handle, sp_dn, server_dn, wait_for_assoc_completion=True,
             assoc_completion_timeout=assoc_completion_timeout)
 
 
+def sp_associate_bulk(handle, pairs, wait_for_assoc_completion=True,
+                      assoc_completion_timeout=20*60, poll_interval=10):
+    """
+    Associates many service profiles to servers at once. All bindings are
+    committed in a single configConfMos and completion of all of them is
+    tracked with one batched query per poll interval, so the whole batch
+    takes about one association FSM of wall-clock time.
+
+    Args:
+        handle (UcsHandle)
+        pairs (list): [(sp_dn, server_dn), ...]
+        wait_for_assoc_completion (bool): by default True. if Set to False,
+                                         it will not monitor the completion of
+                                         association.
+        assoc_completion_timeout (number): wait timeout in seconds, for the
+                                          whole batch
+        poll_interval (number): longest wait in seconds between two status
+            queries, polls start more often and back off up to it
+
+    Returns:
+        dict: {sp_dn: {"server_dn": server_dn, "status": status,
+                       "error": message or None}}
+        status is one of "associated", "submitted" (not waited for),
+        "failed", "timeout" or "invalid" (pair rejected, nothing committed)
+
+    Example:
+        results = sp_associate_bulk(
+                    handle,
+                    pairs=[("org-root/ls-chassis1-blade1",
+                            "sys/chassis-1/blade-1"),
+                           ("org-root/ls-chassis1-blade2",
+                            "sys/chassis-1/blade-2")])
+    """
+
+    from ucsmsdk.mometa.ls.LsBinding import LsBinding
+
+    results = {}
+    if not pairs:
+        return results
+
+    # validate every pair with a single query
+    dns = []
+    for sp_dn, server_dn in pairs:
+        dns.extend([sp_dn, sp_dn + "/pn", server_dn])
+    mos = handle.query_dns(dns)
+
+    valid = []
+    servers = set()
+    for sp_dn, server_dn in pairs:
+        sp = mos.get(sp_dn)
+        binding = mos.get(sp_dn + "/pn")
+        error = None
+        if sp_dn in results:
+            error = "Service profile '%s' is listed twice." % sp_dn
+        elif server_dn in servers:
+            error = "Server '%s' is listed twice." % server_dn
+        elif sp is None:
+            error = "Service profile '%s' does not exist." % sp_dn
+        elif mos.get(server_dn) is None:
+            error = "Server '%s' does not exist." % server_dn
+        elif sp.assoc_state == LsServerConsts.ASSOC_STATE_ASSOCIATED \
+                and sp.pn_dn == server_dn:
+            error = "Service Profile is already associated with Server " \
+                    "%s" % server_dn
+        elif binding is not None and binding.pn_dn == server_dn:
+            error = "Service Profile is already administratively " \
+                    "associated with Server %s" % server_dn
+
+        if error is not None:
+            log.error(error)
+            results.setdefault(sp_dn, {"server_dn": server_dn,
+                                       "status": "invalid", "error": error})
+            continue
+        servers.add(server_dn)
+        results[sp_dn] = {"server_dn": server_dn, "status": "submitted",
+                          "error": None}
+        valid.append((sp_dn, server_dn))
+
+    if not valid:
+        return results
+
+    for sp_dn, server_dn in valid:
+        mo = LsBinding(parent_mo_or_dn=sp_dn, pn_dn=server_dn,
+                       restrict_migration="no")
+        handle.add_mo(mo, modify_present=True)
+    handle.commit()
+
+    if wait_for_assoc_completion:
+        _wait_assoc_completion_bulk(handle, valid, results,
+                                    assoc_completion_timeout, poll_interval)
+    return results
+
+
+def _wait_assoc_completion_bulk(handle, pairs, results, timeout,
+                                poll_interval):
+    """
+    Waits for a batch of associations, querying every pending service
+    profile and server in one request per tick, and updates results
+    """
+
+    start = time.time()
+    pending = dict(pairs)
+
+    def check():
+        mos = handle.query_dns(list(pending) + list(pending.values()))
+        for sp_dn, server_dn in list(pending.items()):
+            sp_mo = mos.get(sp_dn)
+            phys_mo = mos.get(server_dn)
+            if sp_mo is not None and \
+                    sp_mo.config_state == 'failed-to-apply':
+                results[sp_dn]["status"] = "failed"
+                results[sp_dn]["error"] = "config failure: %s" % \
+                    _sp_config_qualifier(handle, sp_mo)
+            elif phys_mo is not None and phys_mo.association == 'associated':
+                results[sp_dn]["status"] = "associated"
+                log.debug('Server %s has completed association in %d '
+                          'seconds', server_dn, time.time() - start)
+            else:
+                continue
+            del pending[sp_dn]
+        log.debug('%d of %d associations pending, elapsed=%ds',
+                  len(pending), len(pairs), time.time() - start)
+        return not pending
+
+    poller = Poller(timeout=timeout, initial_interval=min(2, poll_interval),
+                    max_interval=poll_interval, name="bulk association")
+    poller.poll(check, done=lambda done: done)
+    for sp_dn, server_dn in pending.items():
+        log.error('Server %s has not completed association', server_dn)
+        results[sp_dn]["status"] = "timeout"
+        results[sp_dn]["error"] = "association did not complete in %d " \
+            "seconds" % timeout
+
+
 # ###########################################
 # Service Profile Dissociation
 # ###########################################
 
-def _sp_disassociate_callback(mce):
+def _sp_disassociate_callback(mce, done):
     """
     Callback for service profile disassociation.
     """
 
-    global end_script
     if mce.mo.assoc_state == LsServerConsts.ASSOC_STATE_UNASSOCIATED:
         print("SP:" + mce.mo.dn + " Assoc Successful. assoc_state: " +
               mce.mo.assoc_state)
     elif mce.mo.assoc_state == LsServerConsts.ASSIGN_STATE_FAILED:
         print("SP:" + mce.mo.dn + " Assoc Failed. assoc_state: " +
               mce.mo.assoc_state)
-    end_script = True
+    done.set()
 
 
-def _sp_disassociate_monitor(event_handle, mo):
+def _sp_disassociate_monitor(event_handle, mo, done, timeout=10*60):
     """
     Adds an event handler to monitor the service profile until SP get
-    associated.
+    associated. done (threading.Event) is set once the watch completes.
     """
+    # the event handler has no failure values, a failure completes the
+    # watch too and the callback tells them apart
     event_handle.add(managed_object=mo,
                      prop="assoc_state",
-                     success_value=[LsServerConsts.ASSOC_STATE_UNASSOCIATED],
-                     failure_value=[LsServerConsts.ASSOC_STATE_FAILED],
-                     timeout_sec=600,
-                     call_back=_sp_disassociate_callback)
+                     success_value=[LsServerConsts.ASSOC_STATE_UNASSOCIATED,
+                                    LsServerConsts.ASSOC_STATE_FAILED],
+                     timeout_sec=timeout,
+                     call_back=lambda mce: _sp_disassociate_callback(mce,
+                                                                     done))
 
 
-def sp_disassociate(handle, sp_dn):
+def sp_disassociate(handle, sp_dn, disassoc_completion_timeout=10*60):
     """
     Dissociates a service profile from server
 
     Args:
         handle (UcsHandle)
         sp_dn (string): dn of service profile
+        disassoc_completion_timeout (number): wait timeout in seconds
 
     Returns:
         None
@@ -257,9 +640,12 @@ def sp_disassociate(handle, sp_dn):
     handle.commit()
 
     # add a watch on sp
+    done = threading.Event()
     event_handle = UcsEventHandle(handle)
-    _sp_disassociate_monitor(event_handle=event_handle, mo=sp)
+    _sp_disassociate_monitor(event_handle=event_handle, mo=sp, done=done,
+                             timeout=disassoc_completion_timeout)
 
-    while not end_script:
-        time.sleep(1)
+    if not done.wait(disassoc_completion_timeout):
+        log.error('Service Profile %s has not completed disassociation',
+                  sp_dn)
     event_handle.clean()
@@ -11,6 +11,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
+import logging
+import os
+import threading
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+from ucsmsdk_samples.utils.poller import Poller
+
+log = logging.getLogger('ucs')
+
 
 def sp_template_create(handle, name, type, resolve_remote, descr="",
                        usr_lbl="", src_templ_name="", ext_ip_state="none",
@@ -366,7 +380,8 @@ def sp_create_from_template(handle,
                             number_of_instance,
                             sp_template_name,
                             in_error_on_existing="true",
-                            parent_dn="org-root"):
+                            parent_dn="org-root",
+                            resolver=None):
     """
     This method instantiate Service profile from a template.
 
@@ -378,6 +393,8 @@ def sp_create_from_template(handle,
         sp_template_name (string): SP template name.
         in_error_on_existing (string): "true" or "false"
         parent_dn (string): Org dn in which service profile template resides.
+        resolver (PolicyResolver): resolves the template from its index
+            instead of querying every parent org
 
     Returns:
         None or List of LsServer Objects
@@ -395,28 +412,43 @@ def sp_create_from_template(handle,
 
     """
 
-    import os
+    if resolver is not None:
+        sp_template_dn = resolver.resolve("LsServer", sp_template_name,
+                                          parent_dn)
+        if sp_template_dn is None:
+            raise ValueError("SP template does not exist.")
+    else:
+        mo = None
+        org_dn = parent_dn
+        while mo is None:
+            sp_template_dn = org_dn + "/ls-" + sp_template_name
+            mo = handle.query_dn(sp_template_dn)
+            if mo:
+                break
+            elif not mo and org_dn == 'org-root':
+                raise ValueError("SP template does not exist.")
+            org_dn = os.path.dirname(org_dn)
+
+    sp_names = [naming_prefix + str(num) for num in
+                range(int(name_suffix_starting_number),
+                      int(number_of_instance) +
+                      int(name_suffix_starting_number))]
+    return _sp_instantiate(handle, sp_template_dn, sp_names, parent_dn,
+                           in_error_on_existing)
+
+
+def _sp_instantiate(handle, sp_template_dn, sp_names, parent_dn,
+                    in_error_on_existing):
+    """
+    Instantiates the named service profiles from a template in one request
+    """
 
     from ucsmsdk.ucsmethodfactory import ls_instantiate_n_named_template
     from ucsmsdk.ucsbasetype import DnSet, Dn
 
-    mo = None
-    org_dn = parent_dn
-    while mo is None:
-        sp_template_dn = org_dn + "/ls-" + sp_template_name
-        mo = handle.query_dn(sp_template_dn)
-        if mo:
-            break
-        elif not mo and org_dn == 'org-root':
-            raise ValueError("SP template does not exist.")
-        org_dn = os.path.dirname(org_dn)
-
     dn_set = DnSet()
-    for num in range(int(name_suffix_starting_number),
-                     int(number_of_instance) +
-                     int(name_suffix_starting_number)):
+    for sp_name in sp_names:
         dn = Dn()
-        sp_name = naming_prefix + str(num)
         dn.attr_set("value", sp_name)
         dn_set.child_add(dn)
 
@@ -429,6 +461,183 @@ def sp_create_from_template(handle,
     return handle.process_xml_elem(elem)
 
 
+def _sp_template_dns(handle, templates, resolver=None):
+    """
+    Resolves every (sp_template_name, parent_dn) to the dn of the template
+    in the nearest org, from the index of resolver or else from a single
+    query of all the candidate dns
+
+    Returns:
+        dict: {(sp_template_name, parent_dn): template dn}
+    """
+
+    if resolver is not None:
+        template_dns = {}
+        for template in templates:
+            template_dns[template] = resolver.resolve("LsServer", *template)
+            if template_dns[template] is None:
+                raise ValueError("SP template '%s' does not exist in '%s'."
+                                 % template)
+        return template_dns
+
+    candidates = {}
+    for sp_template_name, parent_dn in templates:
+        org_dn = parent_dn
+        dns = [org_dn + "/ls-" + sp_template_name]
+        while org_dn != 'org-root' and org_dn:
+            org_dn = os.path.dirname(org_dn)
+            dns.append(org_dn + "/ls-" + sp_template_name)
+        candidates[(sp_template_name, parent_dn)] = dns
+
+    mos = handle.query_dns(sorted(set(
+        dn for dns in candidates.values() for dn in dns)))
+    template_dns = {}
+    for template, dns in candidates.items():
+        found = [dn for dn in dns if mos.get(dn) is not None]
+        if not found:
+            raise ValueError("SP template '%s' does not exist in '%s'." %
+                             template)
+        template_dns[template] = found[0]
+    return template_dns
+
+
+def sp_create_from_template_bulk(handle, requests, chunk_size=100,
+                                 max_sessions=4,
+                                 in_error_on_existing="true",
+                                 resolver=None):
+    """
+    This method instantiates Service profiles from templates in bulk.
+
+    The names of every request are sent in chunks of chunk_size, to stay
+    well within the request size UCSM accepts. Up to max_sessions chunks,
+    of any org or template, are instantiated at once, each worker over its
+    own session. The created LsServer objects are yielded as soon as their
+    chunk completes.
+
+    Args:
+        handle (UcsHandle)
+        requests (list of dict): the arguments of sp_create_from_template,
+            {"naming_prefix", "name_suffix_starting_number",
+            "number_of_instance", "sp_template_name", "parent_dn"},
+            parent_dn being optional
+        chunk_size (int): names per lsInstantiateNNamedTemplate request
+        max_sessions (int): chunks instantiated at once
+        in_error_on_existing (string): "true" or "false"
+        resolver (PolicyResolver): resolves the templates from its index
+
+    Yields:
+        LsServer objects, chunk by chunk, in completion order
+
+    Raises:
+        ValueError: If a SP template is not present
+        Exception: once the other chunks completed, if a chunk failed
+
+    Example:
+        for sp in sp_create_from_template_bulk(
+                handle,
+                requests=[{"naming_prefix": "web",
+                           "name_suffix_starting_number": "1",
+                           "number_of_instance": "600",
+                           "sp_template_name": "web_temp",
+                           "parent_dn": "org-root/org-web"},
+                          {"naming_prefix": "db",
+                           "name_suffix_starting_number": "1",
+                           "number_of_instance": "400",
+                           "sp_template_name": "db_temp"}]):
+            print(sp.dn)
+    """
+
+    from ucsmsdk.ucshandle import UcsHandle
+
+    requests = [dict(request, parent_dn=request.get("parent_dn", "org-root"))
+                for request in requests]
+    template_dns = _sp_template_dns(handle, set(
+        (request["sp_template_name"], request["parent_dn"])
+        for request in requests), resolver)
+
+    chunks = queue.Queue()
+    chunk_count = 0
+    for request in requests:
+        start = int(request["name_suffix_starting_number"])
+        sp_names = [request["naming_prefix"] + str(num) for num in
+                    range(start, start + int(request["number_of_instance"]))]
+        template_dn = template_dns[(request["sp_template_name"],
+                                    request["parent_dn"])]
+        for index in range(0, len(sp_names), chunk_size):
+            chunks.put((template_dn, request["parent_dn"],
+                        sp_names[index:index + chunk_size]))
+            chunk_count += 1
+    if not chunk_count:
+        return
+
+    # the driver headers of a handle are not thread safe, every worker
+    # gets a clone of the handle, without its cookie so it opens its own
+    # session
+    frozen = json.loads(handle.freeze())
+    frozen.update(cookie=None, session_id=None, auto_refresh=False)
+    frozen = json.dumps(frozen)
+
+    results = queue.Queue()
+    stop = threading.Event()
+
+    def work():
+        session = UcsHandle.unfreeze(frozen)
+        try:
+            session.login()
+            while not stop.is_set():
+                try:
+                    chunk = chunks.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    results.put((chunk, _sp_instantiate(
+                        session, chunk[0], chunk[2], chunk[1],
+                        in_error_on_existing), None))
+                except Exception as e:
+                    results.put((chunk, None, e))
+        except Exception as e:
+            log.exception("SP instantiation session failed")
+            results.put((None, None, e))
+        finally:
+            session.logout()
+            results.put(None)
+
+    workers = min(max_sessions, chunk_count)
+    for _ in range(workers):
+        thread = threading.Thread(target=work)
+        thread.daemon = True
+        thread.start()
+
+    errors = []
+    created = 0
+    try:
+        while workers:
+            result = results.get()
+            if result is None:
+                workers -= 1
+                continue
+            chunk, sps, error = result
+            if error is not None:
+                if chunk is not None:
+                    log.error("Instantiation of %d SPs from '%s' failed: %s",
+                              len(chunk[2]), chunk[0], error)
+                errors.append(error)
+                continue
+            created += len(sps)
+            log.debug("Instantiated %d SPs from '%s', %d of %d chunks left",
+                      len(sps), chunk[0], chunks.qsize(), chunk_count)
+            for sp in sps:
+                yield sp
+    finally:
+        # the remaining chunks are dropped if the caller stops early
+        stop.set()
+
+    if errors or not chunks.empty():
+        raise Exception("Instantiation failed after %d SPs: %s" %
+                        (created, errors[0] if errors else
+                         "%d chunks left" % chunks.qsize()))
+
+
 def sp_delete(handle, sp_name, parent_dn="org-root"):
     """
     This method delete Service profile.
@@ -530,6 +739,164 @@ def sp_power_off(handle, sp_name, parent_dn="org-root"):
     handle.commit()
 
 
+def _sp_select(handle, sp_names, parent_dn, org_dn, template_name,
+               pool_name):
+    """
+    Returns the LsServer objects named in sp_names, or else those matching
+    every given filter, with one query
+    """
+
+    filters = [org_dn, template_name, pool_name]
+    if sp_names is None and filters == [None] * len(filters):
+        # never every service profile of the domain by default
+        raise ValueError("sp_names or one of org_dn, template_name and "
+                         "pool_name is required")
+    if sp_names is not None and filters != [None] * len(filters):
+        raise ValueError("sp_names and the org_dn, template_name and "
+                         "pool_name filters are exclusive")
+
+    if sp_names is not None:
+        dns = [parent_dn + "/ls-" + sp_name for sp_name in sp_names]
+        mos = handle.query_dns(dns)
+        missing = [dn for dn in dns if mos.get(dn) is None]
+        if missing:
+            raise ValueError("sp %s does not exist" % ", ".join(missing))
+        return [mos[dn] for dn in dns]
+
+    class_ids = ["LsServer"]
+    if pool_name is not None:
+        class_ids.append("LsRequirement")
+    mos = handle.query_classids(*class_ids)
+    # service profile or template dn -> server pool name
+    pools = dict((os.path.dirname(requirement.dn), requirement.name) for
+                 requirement in mos.get("LsRequirement", []))
+    sps = []
+    for sp in mos["LsServer"]:
+        if sp.type != "instance":
+            continue
+        if org_dn is not None and os.path.dirname(sp.dn) != org_dn:
+            continue
+        if template_name is not None and sp.src_templ_name != template_name:
+            continue
+        if pool_name is not None and pools.get(
+                sp.dn, pools.get(sp.oper_src_templ_name)) != pool_name:
+            continue
+        sps.append(sp)
+    return sorted(sps, key=lambda sp: sp.dn)
+
+
+def _sp_power_bulk(handle, state, oper_power, sp_names, parent_dn, org_dn,
+                   template_name, pool_name, wait_for_power, timeout,
+                   poll_interval):
+    """
+    Sets the power state of many service profiles in one transaction and
+    optionally waits for their servers to report oper_power
+    """
+
+    from ucsmsdk.mometa.ls.LsPower import LsPower
+
+    sps = _sp_select(handle, sp_names, parent_dn, org_dn, template_name,
+                     pool_name)
+    results = {}
+    if not sps:
+        return results
+
+    for sp in sps:
+        handle.add_mo(LsPower(parent_mo_or_dn=sp.dn, state=state), True)
+        results[sp.dn] = "submitted" if sp.pn_dn else "unassociated"
+    handle.commit()
+    log.debug("Set power state '%s' of %d SPs", state, len(sps))
+    if not wait_for_power:
+        return results
+
+    pending = dict((sp.pn_dn, sp.dn) for sp in sps if sp.pn_dn)
+
+    def check():
+        for server_dn, mo in handle.query_dns(list(pending)).items():
+            if mo is not None and mo.oper_power == oper_power:
+                results[pending.pop(server_dn)] = oper_power
+        return not pending
+
+    poller = Poller(timeout=timeout, initial_interval=min(2, poll_interval),
+                    max_interval=poll_interval,
+                    name="power %s of %d SPs" % (oper_power, len(pending)))
+    if pending:
+        poller.poll(check, done=lambda done: done)
+    for server_dn, sp_dn in pending.items():
+        log.error("Server %s of SP %s is not powered %s", server_dn, sp_dn,
+                  oper_power)
+        results[sp_dn] = "timeout"
+    return results
+
+
+def sp_power_on_bulk(handle, sp_names=None, parent_dn="org-root",
+                     org_dn=None, template_name=None, pool_name=None,
+                     wait_for_power=False, timeout=10*60, poll_interval=10):
+    """
+    This function will power on many service profiles at once
+
+    The service profiles are the ones of sp_names, or else the instances
+    matching every given filter, one of the two being required. All of
+    their LsPower objects are committed
+    in one configConfMos, and their servers are polled together, one query
+    per poll interval, when waiting.
+
+    Args:
+        handle (UcsHandle)
+        sp_names (list of string): Service Profile names, in parent_dn
+        parent_dn (string): Org of sp_names.
+        org_dn (string): filter, the org holding the service profiles
+        template_name (string): filter, the template they come from
+        pool_name (string): filter, the server pool they draw from, set
+            on them or on their template
+        wait_for_power (bool): wait for the servers to report "on"
+        timeout (number): wait timeout in seconds, for all the servers
+        poll_interval (number): longest wait in seconds between two
+            status queries
+
+    Returns:
+        dict: {sp_dn: status}, status being "on", "submitted" (not waited
+        for), "unassociated" (no server to power yet) or "timeout"
+
+    Raises:
+        ValueError: If a LsServer of sp_names is not present, if neither
+            sp_names nor a filter is given, or if both are
+
+    Example:
+        sp_power_on_bulk(handle, sp_names=["sp1", "sp2"])
+        sp_power_on_bulk(handle, org_dn="org-root/org-web",
+                         template_name="web_temp", wait_for_power=True)
+    """
+
+    from ucsmsdk.mometa.ls.LsPower import LsPowerConsts
+
+    return _sp_power_bulk(handle, LsPowerConsts.STATE_UP, "on", sp_names,
+                          parent_dn, org_dn, template_name, pool_name,
+                          wait_for_power, timeout, poll_interval)
+
+
+def sp_power_off_bulk(handle, sp_names=None, parent_dn="org-root",
+                      org_dn=None, template_name=None, pool_name=None,
+                      wait_for_power=False, timeout=10*60, poll_interval=10):
+    """
+    This function will power off many service profiles at once, see
+    sp_power_on_bulk
+
+    Returns:
+        dict: {sp_dn: status}, status being "off", "submitted" (not waited
+        for), "unassociated" (no server to power yet) or "timeout"
+
+    Example:
+        sp_power_off_bulk(handle, pool_name="rack-12", wait_for_power=True)
+    """
+
+    from ucsmsdk.mometa.ls.LsPower import LsPowerConsts
+
+    return _sp_power_bulk(handle, LsPowerConsts.STATE_DOWN, "off", sp_names,
+                          parent_dn, org_dn, template_name, pool_name,
+                          wait_for_power, timeout, poll_interval)
+
+
 def sp_wwpn(handle, sp_name, parent_dn="org-root"):
     """
     This function will return the fibre channel wwpn addresses
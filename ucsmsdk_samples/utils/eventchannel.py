@@ -0,0 +1,79 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains a reader of the UCSM event channel, the stream of
+managed object changes opened by eventSubscribe.
+"""
+
+import logging
+from xml.etree import ElementTree as ET
+
+log = logging.getLogger('ucs')
+
+
+def open_event_channel(handle, timeout=60):
+    """
+    Subscribes to the events of a logged in handle
+
+    Args:
+        handle (UcsHandle)
+        timeout (number): seconds of silence after which a read of the
+            channel fails
+
+    Returns:
+        the channel, a file like http response, None if the subscription
+        failed
+    """
+
+    try:
+        return handle.post_xml(
+            ('<eventSubscribe cookie="%s"/>' % handle.cookie).encode(),
+            read=False, timeout=timeout)
+    except Exception as e:
+        log.debug("Event channel unavailable: %s", e)
+        return None
+
+
+def read_event(channel):
+    """
+    Reads the next event of a channel
+
+    Returns:
+        list: xml elements of the managed objects of the event, with their
+        "dn" and "status" attributes, or None once the channel is closed,
+        stalled or failed
+    """
+
+    try:
+        # every message is its length on a line, then the xml
+        line = channel.readline()
+        if not line.strip().isdigit():
+            # a closed channel or an error response
+            log.debug("Event channel closed: %r", line[:200])
+            return None
+        root = ET.fromstring(channel.read(int(line)))
+    except Exception as e:
+        log.debug("Event channel stalled: %s", e)
+        return None
+    # configMoChangeEvent or methodVessel of several of them
+    return [elem for elem in root.iter() if elem.get("dn")]
+
+
+def close_event_channel(channel):
+    if channel is None:
+        return
+    try:
+        channel.close()
+    except Exception:
+        pass
@@ -0,0 +1,157 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains the polling engine used by the wait loops of the
+samples: exponential backoff with jitter, an overall deadline, early exit
+predicates and per-wait metrics.
+"""
+
+import logging
+import random
+import time
+
+log = logging.getLogger('ucs')
+
+OUTCOME_DONE = "done"
+OUTCOME_FAILED = "failed"
+OUTCOME_TIMEOUT = "timeout"
+
+_listeners = []
+
+
+def add_listener(call_back):
+    """
+    Registers call_back(metrics) to run at the end of every wait, see
+    Poller.metrics for the content
+    """
+
+    if call_back not in _listeners:
+        _listeners.append(call_back)
+
+
+def remove_listener(call_back):
+    if call_back in _listeners:
+        _listeners.remove(call_back)
+
+
+class Poller(object):
+    """
+    Calls a function until a predicate accepts its result, sleeping with
+    exponential backoff and jitter in between, up to a deadline.
+
+    Args:
+        timeout (number): deadline in seconds, None waits forever
+        initial_interval (number): first sleep in seconds
+        max_interval (number): upper bound of a sleep in seconds
+        backoff (number): factor applied to the sleep after every poll
+        jitter (number): +/- fraction of randomness applied to every sleep
+        name (string): name of the wait, used in logs and metrics
+
+    Example:
+        poller = Poller(timeout=600, initial_interval=2, max_interval=30,
+                        name="download")
+        mo = poller.poll(lambda: handle.query_dn(dn),
+                         done=lambda mo: mo.transfer_state == "downloaded",
+                         fail=lambda mo: mo.transfer_state == "failed")
+        if poller.outcome != "done":
+            raise Exception("Download %s" % poller.outcome)
+    """
+
+    def __init__(self, timeout=None, initial_interval=1.0, max_interval=60.0,
+                 backoff=2.0, jitter=0.1, name="poll"):
+        self.timeout = timeout
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.jitter = jitter
+        self.name = name
+        self.outcome = None
+        # {"name", "outcome", "polls", "errors", "elapsed", "slept",
+        #  "poll_times"}, the seconds spent in every call of func
+        self.metrics = {}
+
+    def _sleep_time(self, interval, deadline):
+        sleep_time = interval
+        if self.jitter:
+            sleep_time += interval * random.uniform(-self.jitter, self.jitter)
+        if deadline is not None:
+            sleep_time = min(sleep_time, deadline - time.time())
+        return max(sleep_time, 0)
+
+    def poll(self, func, done, fail=None, retry_on=()):
+        """
+        Calls func until done(result) or fail(result) is True or the
+        deadline expires
+
+        Args:
+            func (callable): func() returns the current state
+            done (callable): done(state) is True once the wait succeeded
+            fail (callable): fail(state) is True once the wait cannot succeed
+            retry_on (tuple): exception classes raised by func that count as
+                a failed poll instead of ending the wait
+
+        Returns:
+            the last state returned by func, None if every poll raised.
+            self.outcome tells why the wait ended, "done", "failed" or
+            "timeout"
+        """
+
+        start = time.time()
+        deadline = None
+        if self.timeout is not None:
+            deadline = start + self.timeout
+        interval = self.initial_interval
+        state = None
+        polls = 0
+        errors = 0
+        slept = 0.0
+        poll_times = []
+
+        while True:
+            polls += 1
+            poll_start = time.time()
+            try:
+                state = func()
+            except retry_on as e:
+                poll_times.append(time.time() - poll_start)
+                errors += 1
+                log.debug("%s: poll %d failed: %s", self.name, polls, str(e))
+            else:
+                poll_times.append(time.time() - poll_start)
+                if done(state):
+                    self.outcome = OUTCOME_DONE
+                    break
+                if fail is not None and fail(state):
+                    self.outcome = OUTCOME_FAILED
+                    break
+
+            if deadline is not None and time.time() >= deadline:
+                self.outcome = OUTCOME_TIMEOUT
+                break
+            sleep_time = self._sleep_time(interval, deadline)
+            log.debug("%s: not done after %d polls, sleeping %.1fs",
+                      self.name, polls, sleep_time)
+            time.sleep(sleep_time)
+            slept += sleep_time
+            interval = min(interval * self.backoff, self.max_interval)
+
+        self.metrics = {"name": self.name, "outcome": self.outcome,
+                        "polls": polls, "errors": errors,
+                        "elapsed": time.time() - start, "slept": slept,
+                        "poll_times": poll_times}
+        log.debug("%s: %s after %d polls in %.1fs", self.name, self.outcome,
+                  polls, self.metrics["elapsed"])
+        for call_back in list(_listeners):
+            call_back(dict(self.metrics))
+        return state
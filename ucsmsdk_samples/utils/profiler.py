@@ -0,0 +1,228 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains an opt-in profiler that counts and times the UcsHandle
+operations issued by the sample helpers and attributes them to the helper
+that made them.
+"""
+
+import inspect
+import logging
+import threading
+import time
+
+log = logging.getLogger('ucs')
+
+PROFILED_METHODS = ["query_dn", "query_dns", "query_classid",
+                    "query_classids", "query_children", "process_xml_elem",
+                    "add_mo", "set_mo", "remove_mo", "commit"]
+
+# commit buffer operations, they never reach the wire on their own
+_LOCAL_METHODS = ["add_mo", "set_mo", "remove_mo"]
+
+_PACKAGE = "ucsmsdk_samples."
+_DIRECT = "<direct>"
+
+
+def _caller():
+    """
+    Returns (helper, site) for the current call stack. helper is the
+    outermost ucsmsdk_samples function, site the innermost one with its line
+    """
+
+    helper = None
+    site = None
+    frame = inspect.currentframe()
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith(_PACKAGE) and module != __name__:
+            helper = frame.f_code.co_name
+            if site is None:
+                site = "%s:%d" % (helper, frame.f_lineno)
+        frame = frame.f_back
+    return helper or _DIRECT, site or _DIRECT
+
+
+def _size(data):
+    if isinstance(data, (bytes, str)):
+        return len(data)
+    return 0
+
+
+class UcsProfiler(object):
+    """
+    Wraps a UcsHandle and records, per sample helper, the number of calls,
+    XML-API round-trips, bytes on the wire and wall time of every query_*,
+    add_mo, set_mo, remove_mo and commit.
+
+    Args:
+        handle (UcsHandle)
+
+    Example:
+        with UcsProfiler(handle) as profiler:
+            firmware_activate_blade(handle, version="3.1(2b)",
+                                    require_user_confirmation=False)
+        print(profiler.format_report())
+    """
+
+    def __init__(self, handle):
+        self.handle = handle
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._records = {}
+        self._sites = {}
+        self._active = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def start(self):
+        """
+        Starts recording by shadowing the handle methods on the instance
+        """
+
+        if self._active:
+            return self
+        for method in PROFILED_METHODS:
+            setattr(self.handle, method,
+                    self._wrap(method, getattr(self.handle, method)))
+        self.handle.post_xml = self._wrap_post_xml(self.handle.post_xml)
+        self._active = True
+        return self
+
+    def stop(self):
+        """
+        Stops recording and restores the original handle methods
+        """
+
+        if not self._active:
+            return
+        for method in PROFILED_METHODS + ["post_xml"]:
+            self.handle.__dict__.pop(method, None)
+        self._active = False
+
+    def reset(self):
+        with self._lock:
+            self._records = {}
+            self._sites = {}
+
+    def _wrap(self, method, func):
+        def wrapper(*args, **kwargs):
+            local = self._local
+            if getattr(local, "op", None) is not None:
+                # nested handle call, already accounted to the outer one
+                return func(*args, **kwargs)
+
+            local.op = {"round_trips": 0, "bytes_sent": 0,
+                        "bytes_received": 0}
+            start = time.time()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.time() - start
+                op = local.op
+                local.op = None
+                helper, site = _caller()
+                self._add(helper, site, method, elapsed, op)
+        wrapper.__name__ = method
+        return wrapper
+
+    def _wrap_post_xml(self, func):
+        def post_xml(xml_str, *args, **kwargs):
+            response = func(xml_str, *args, **kwargs)
+            op = getattr(self._local, "op", None)
+            if op is not None:
+                op["round_trips"] += 1
+                op["bytes_sent"] += _size(xml_str)
+                op["bytes_received"] += _size(response)
+            return response
+        return post_xml
+
+    def _add(self, helper, site, method, elapsed, op):
+        with self._lock:
+            record = self._records.setdefault(helper, {
+                "calls": 0, "round_trips": 0, "bytes_sent": 0,
+                "bytes_received": 0, "wall_time": 0.0, "ops": {}})
+            record["calls"] += 1
+            record["wall_time"] += elapsed
+            for key in ("round_trips", "bytes_sent", "bytes_received"):
+                record[key] += op[key]
+
+            op_record = record["ops"].setdefault(
+                method, {"calls": 0, "round_trips": 0, "wall_time": 0.0})
+            op_record["calls"] += 1
+            op_record["round_trips"] += op["round_trips"]
+            op_record["wall_time"] += elapsed
+
+            site_key = (helper, site, method)
+            self._sites[site_key] = self._sites.get(site_key, 0) + 1
+
+    def report(self):
+        """
+        Returns the per-helper accounting
+
+        Returns:
+            dict: {helper: {"calls", "round_trips", "bytes_sent",
+                            "bytes_received", "wall_time",
+                            "ops": {method: {"calls", "round_trips",
+                                             "wall_time"}}}}
+        """
+
+        with self._lock:
+            report = {}
+            for helper, record in self._records.items():
+                report[helper] = dict(record)
+                report[helper]["ops"] = dict(
+                    (method, dict(op)) for method, op in
+                    record["ops"].items())
+            return report
+
+    def suspects(self, threshold=10):
+        """
+        Returns call sites that issued the same operation at least
+        `threshold` times, the signature of an N+1 query pattern
+
+        Returns:
+            list of (helper, site, method, calls), most calls first
+        """
+
+        with self._lock:
+            found = [(helper, site, method, calls) for
+                     (helper, site, method), calls in self._sites.items()
+                     if calls >= threshold and method not in _LOCAL_METHODS]
+        return sorted(found, key=lambda entry: -entry[3])
+
+    def format_report(self):
+        """
+        Returns the report as a text table, slowest helper first
+        """
+
+        report = self.report()
+        lines = ["%-40s %8s %8s %10s %10s %10s" % (
+            "helper", "calls", "rtts", "sent", "received", "wall(s)")]
+        for helper in sorted(report, key=lambda h: -report[h]["wall_time"]):
+            record = report[helper]
+            lines.append("%-40s %8d %8d %10d %10d %10.3f" % (
+                helper, record["calls"], record["round_trips"],
+                record["bytes_sent"], record["bytes_received"],
+                record["wall_time"]))
+            for method in sorted(record["ops"]):
+                op = record["ops"][method]
+                lines.append("  %-38s %8d %8d %10s %10s %10.3f" % (
+                    method, op["calls"], op["round_trips"], "", "",
+                    op["wall_time"]))
+        return "\n".join(lines)
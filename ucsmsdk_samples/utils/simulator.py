@@ -0,0 +1,969 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains an offline UCSM XML-API endpoint that answers requests
+from an in-memory managed object tree. A regular UcsHandle can log in to it,
+which makes it possible to count and time the round-trips made by the
+samples without a real Fabric Interconnect.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import socket
+import threading
+import time
+import uuid
+from xml.etree import ElementTree as ET
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+log = logging.getLogger('ucs')
+
+ERR_AUTH_REQUIRED = "552"
+ERR_OBJECT_EXISTS = "103"
+ERR_UNSUPPORTED = "1"
+
+
+def _parent_dn(dn):
+    """
+    Returns the dn of the parent, ignoring '/' inside [] naming properties
+    """
+
+    depth = 0
+    for index in range(len(dn) - 1, -1, -1):
+        char = dn[index]
+        if char == ']':
+            depth += 1
+        elif char == '[':
+            depth -= 1
+        elif char == '/' and depth == 0:
+            return dn[:index]
+    return ""
+
+
+def _class_id_l(class_id):
+    return class_id[0].lower() + class_id[1:]
+
+
+_prop_names = {}
+
+
+def _xml_prop_name(class_id, prop):
+    """
+    Maps a python property name (oper_state) to its xml name (operState)
+    """
+
+    from ucsmsdk.ucscoreutils import load_class, \
+        find_class_id_in_mo_meta_ignore_case
+
+    key = (class_id.lower(), prop)
+    if key in _prop_names:
+        return _prop_names[key]
+
+    xml_name = None
+    meta_class_id = find_class_id_in_mo_meta_ignore_case(class_id)
+    if meta_class_id:
+        mo_class = load_class(meta_class_id)
+        for xml_name_, py_name in mo_class.prop_map.items():
+            if py_name == prop:
+                xml_name = xml_name_
+                break
+    if xml_name is None:
+        words = prop.split('_')
+        xml_name = words[0] + "".join(word.capitalize()
+                                      for word in words[1:])
+    _prop_names[key] = xml_name
+    return xml_name
+
+
+def _compare(op, actual, expected):
+    try:
+        actual_, expected_ = float(actual), float(expected)
+    except (TypeError, ValueError):
+        actual_, expected_ = actual, expected
+    if op == "gt":
+        return actual_ > expected_
+    if op == "ge":
+        return actual_ >= expected_
+    if op == "lt":
+        return actual_ < expected_
+    return actual_ <= expected_
+
+
+def _filter_match(elem, attrs):
+    """
+    Evaluates an inFilter element (eq, ne, wcard, and, or, not...) against
+    the xml attributes of a managed object
+    """
+
+    tag = elem.tag
+    if tag in ("filter", "inFilter"):
+        return all(_filter_match(child, attrs) for child in elem)
+    if tag == "and":
+        return all(_filter_match(child, attrs) for child in elem)
+    if tag == "or":
+        return any(_filter_match(child, attrs) for child in elem)
+    if tag == "not":
+        return not all(_filter_match(child, attrs) for child in elem)
+
+    actual = attrs.get(elem.get("property"), "")
+    value = elem.get("value")
+    if tag == "eq":
+        return actual == value
+    if tag == "ne":
+        return actual != value
+    if tag in ("gt", "ge", "lt", "le"):
+        return _compare(tag, actual, value)
+    if tag == "wcard":
+        return re.search(value, actual) is not None
+    if tag == "anybit":
+        return bool(set(value.split(',')) & set(actual.split(',')))
+    if tag == "allbits":
+        return set(value.split(',')) <= set(actual.split(','))
+    if tag == "bw":
+        return _compare("ge", actual, elem.get("firstValue")) and \
+            _compare("le", actual, elem.get("secondValue"))
+    raise ValueError("Unsupported filter '%s'" % tag)
+
+
+class UcsSimulatorError(Exception):
+    """
+    Raised while processing a request, carries the UCSM error code
+    """
+
+    def __init__(self, error_code, error_descr):
+        Exception.__init__(self, error_descr)
+        self.error_code = error_code
+        self.error_descr = error_descr
+
+
+class UcsSimulator(object):
+    """
+    In-memory UCSM XML-API endpoint.
+
+    Answers aaaLogin/aaaRefresh/aaaLogout, configResolveDn(s),
+    configResolveClass(es), configResolveChildren, configConfMo(s),
+    lsInstantiateNNamedTemplate, eventSubscribe and file uploads on
+    127.0.0.1. Every request is delayed by `latency` seconds to model the
+    round-trip time to the Fabric Interconnect. Changes to the tree are
+    streamed to the event channels.
+
+    Example:
+        with UcsSimulator(latency=0.2) as sim:
+            populate_domain(sim, chassis_count=20, blades_per_chassis=8)
+            handle = sim.handle()
+            handle.login()
+            ...
+            print(sim.request_count)
+    """
+
+    def __init__(self, latency=0.0, version="3.1(2b)", username="admin",
+                 password="password", host="127.0.0.1", port=0):
+        self.latency = latency
+        self.version = version
+        self.username = username
+        self.password = password
+        self.available = True
+        self.events_enabled = True
+
+        self._host = host
+        self._port = port
+        self._server = None
+        self._thread = None
+
+        self._lock = threading.RLock()
+        self._mos = {}
+        self._children = {}
+        self._cookies = set()
+        self._hooks = {}
+        # event channel queue -> cookie of its session
+        self._channels = {}
+        self._event_id = 0
+        self.uploads = {}
+        self.stats = {}
+
+        self._handlers = {
+            "aaaLogin": self._aaa_login,
+            "aaaRefresh": self._aaa_refresh,
+            "aaaLogout": self._aaa_logout,
+            "aaaKeepAlive": self._aaa_keep_alive,
+            "configResolveDn": self._config_resolve_dn,
+            "configResolveDns": self._config_resolve_dns,
+            "configResolveClass": self._config_resolve_class,
+            "configResolveClasses": self._config_resolve_classes,
+            "configResolveChildren": self._config_resolve_children,
+            "configConfMo": self._config_conf_mo,
+            "configConfMos": self._config_conf_mos,
+            "lsInstantiateNNamedTemplate":
+                self._ls_instantiate_n_named_template,
+        }
+
+        self.add("TopSystem", "sys", name="ucs-sim", address=host)
+        self.add("OrgOrg", "org-root", name="root")
+
+    # ###########################################
+    # Server lifecycle
+    # ###########################################
+
+    @property
+    def ip(self):
+        return self._host
+
+    @property
+    def port(self):
+        return self._port
+
+    def start(self):
+        """
+        Starts serving requests in a background thread
+        """
+
+        if self._server is not None:
+            return self
+
+        simulator = self
+
+        class _Handler(_UcsSimulatorRequestHandler):
+            sim = simulator
+
+        self._server = _ThreadingHTTPServer((self._host, self._port),
+                                            _Handler)
+        self._port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name="ucs-simulator")
+        self._thread.daemon = True
+        self._thread.start()
+        log.debug("UCSM simulator listening on %s:%d", self._host,
+                  self._port)
+        return self
+
+    def stop(self):
+        """
+        Stops the background server
+        """
+
+        if self._server is None:
+            return
+        self.close_event_channels()
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = None
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def handle(self):
+        """
+        Returns a UcsHandle (not yet logged in) pointing at this simulator
+        """
+
+        from ucsmsdk.ucshandle import UcsHandle
+
+        self.start()
+        return UcsHandle(self._host, self.username, self.password,
+                         port=self._port, secure=False)
+
+    def expire_sessions(self):
+        """
+        Invalidates every cookie, as a UCSM restart would
+        """
+
+        with self._lock:
+            self._cookies.clear()
+        self.close_event_channels()
+
+    def close_event_channels(self):
+        """
+        Ends every event channel, as a dropped connection would
+        """
+
+        with self._lock:
+            channels = list(self._channels)
+        for channel in channels:
+            channel.put(None)
+
+    # ###########################################
+    # Managed object tree
+    # ###########################################
+
+    def add(self, class_id, dn, **kwargs):
+        """
+        Adds or updates a managed object in the tree
+
+        Args:
+            class_id (string): class id, e.g. "ComputeBlade"
+            dn (string): dn of the managed object
+            **kwargs: properties, by python name (oper_state="...")
+
+        Returns:
+            dict: xml attributes of the managed object
+
+        Example:
+            sim.add("ComputeBlade", "sys/chassis-1/blade-1",
+                    association="none")
+        """
+
+        attrs = dict((_xml_prop_name(class_id, key), str(value))
+                     for key, value in kwargs.items())
+        attrs["dn"] = dn
+        with self._lock:
+            return self._store(_class_id_l(class_id), dn, attrs)
+
+    def add_mo(self, mo):
+        """
+        Adds a ucsmsdk ManagedObject, including its children, to the tree
+        """
+
+        self._apply(mo.to_xml(), None, run_hooks=False)
+
+    def update(self, dn, **kwargs):
+        """
+        Modifies properties of an existing managed object
+
+        Example:
+            sim.update("sys/chassis-1/blade-1", association="associated")
+        """
+
+        with self._lock:
+            class_id, attrs = self._mos[dn]
+            changed = dict((_xml_prop_name(class_id, key), str(value))
+                           for key, value in kwargs.items())
+            attrs.update(changed)
+            changed["dn"] = dn
+            self._publish(class_id, changed, "modified")
+
+    def remove(self, dn):
+        """
+        Removes a managed object and its subtree
+        """
+
+        with self._lock:
+            self._remove(dn)
+
+    def exists(self, dn):
+        return dn in self._mos
+
+    def get_mo(self, dn):
+        """
+        Returns the managed object at dn as a ucsmsdk ManagedObject or None
+        """
+
+        from ucsmsdk.ucscoreutils import get_ucs_obj
+        from ucsmsdk.ucsgenutils import word_u
+
+        with self._lock:
+            if dn not in self._mos:
+                return None
+            elem = self._to_elem(dn, hierarchical=False)
+        mo = get_ucs_obj(word_u(elem.tag), elem)
+        mo.from_xml(elem)
+        return mo
+
+    def dns(self, class_id):
+        """
+        Returns the sorted dns of all managed objects of the given class
+        """
+
+        class_id = _class_id_l(class_id).lower()
+        with self._lock:
+            return sorted(dn for dn, (class_id_, _) in self._mos.items()
+                          if class_id_.lower() == class_id)
+
+    def add_hook(self, class_id, call_back):
+        """
+        Registers call_back(sim, dn, status) to run after a configConfMo(s)
+        created, modified or deleted a managed object of class_id. Hooks are
+        used to model UCSM side effects such as FSM completion.
+        """
+
+        self._hooks.setdefault(_class_id_l(class_id).lower(), []).append(
+            call_back)
+
+    def _publish(self, class_id, attrs, status):
+        # caller holds self._lock
+        if not self._channels:
+            return
+        self._event_id += 1
+        event = ET.Element("configMoChangeEvent",
+                           {"inEid": str(self._event_id)})
+        mo_attrs = dict(attrs)
+        mo_attrs["status"] = status
+        ET.SubElement(ET.SubElement(event, "inConfig"), class_id, mo_attrs)
+        body = ET.tostring(event)
+        for channel in self._channels:
+            channel.put(body)
+
+    def _store(self, class_id, dn, attrs):
+        if dn in self._mos:
+            self._mos[dn][1].update(attrs)
+            self._publish(self._mos[dn][0], attrs, "modified")
+            return self._mos[dn][1]
+        self._mos[dn] = (class_id, attrs)
+        self._publish(class_id, attrs, "created")
+        parent_dn = _parent_dn(dn)
+        self._children.setdefault(parent_dn, []).append(dn)
+        return attrs
+
+    def _remove(self, dn):
+        if dn not in self._mos:
+            return
+        for child_dn in list(self._children.get(dn, [])):
+            self._remove(child_dn)
+        self._children.pop(dn, None)
+        class_id = self._mos.pop(dn)[0]
+        self._publish(class_id, {"dn": dn}, "deleted")
+        siblings = self._children.get(_parent_dn(dn))
+        if siblings and dn in siblings:
+            siblings.remove(dn)
+
+    def _to_elem(self, dn, hierarchical):
+        class_id, attrs = self._mos[dn]
+        elem = ET.Element(class_id, attrs)
+        if hierarchical:
+            for child_dn in self._children.get(dn, []):
+                elem.append(self._to_elem(child_dn, hierarchical))
+        return elem
+
+    def _apply(self, elem, parent_dn, run_hooks=True, touched=None):
+        """
+        Applies a configuration element (and its children) to the tree
+        """
+
+        dn = elem.get("dn")
+        if not dn:
+            dn = parent_dn + "/" + elem.get("rn")
+        status = elem.get("status", "")
+        attrs = dict((key, value) for key, value in elem.attrib.items()
+                     if key not in ("status", "rn"))
+        attrs["dn"] = dn
+
+        with self._lock:
+            if "deleted" in status:
+                class_id = self._mos.get(dn, (elem.tag, None))[0]
+                self._remove(dn)
+            else:
+                class_id = elem.tag
+                self._store(class_id, dn, attrs)
+                for child in elem:
+                    self._apply(child, dn, run_hooks=False, touched=touched)
+
+        if touched is not None:
+            touched.insert(0, (class_id, dn, status))
+        if run_hooks and touched is not None:
+            for class_id_, dn_, status_ in touched:
+                for call_back in self._hooks.get(class_id_.lower(), []):
+                    call_back(self, dn_, status_)
+        return dn
+
+    # ###########################################
+    # XML-API methods
+    # ###########################################
+
+    def process(self, xml_str):
+        """
+        Processes one XML-API request and returns the response xml string
+        """
+
+        request = ET.fromstring(xml_str)
+        method = request.tag
+        response = ET.Element(method, {"response": "yes"})
+        if "cookie" in request.attrib:
+            response.set("cookie", request.get("cookie"))
+
+        try:
+            if method not in self._handlers:
+                raise UcsSimulatorError(ERR_UNSUPPORTED,
+                                        "Unsupported method '%s'" % method)
+            if not method.startswith("aaa") and \
+                    request.get("cookie") not in self._cookies:
+                raise UcsSimulatorError(ERR_AUTH_REQUIRED,
+                                        "Authorization required")
+            self._handlers[method](request, response)
+        except UcsSimulatorError as e:
+            response = ET.Element(method, {
+                "response": "yes",
+                "cookie": request.get("cookie", ""),
+                "errorCode": e.error_code,
+                "invocationResult": "unidentified-fail",
+                "errorDescr": e.error_descr})
+        return ET.tostring(response)
+
+    def _open_event_channel(self, xml_str):
+        """
+        Registers an event channel for an eventSubscribe request
+
+        Returns:
+            (Queue, None) the queue receiving the events, None once the
+            channel is closed, or (None, error response) if rejected
+        """
+
+        request = ET.fromstring(xml_str)
+        with self._lock:
+            if not self.events_enabled:
+                error = UcsSimulatorError(ERR_UNSUPPORTED,
+                                          "Event channel unavailable")
+            elif request.get("cookie") not in self._cookies:
+                error = UcsSimulatorError(ERR_AUTH_REQUIRED,
+                                          "Authorization required")
+            else:
+                channel = queue.Queue()
+                self._channels[channel] = request.get("cookie")
+                return channel, None
+        return None, ET.tostring(ET.Element("eventSubscribe", {
+            "response": "yes", "cookie": request.get("cookie", ""),
+            "errorCode": error.error_code,
+            "invocationResult": "unidentified-fail",
+            "errorDescr": error.error_descr}))
+
+    def _close_event_channel(self, channel):
+        with self._lock:
+            self._channels.pop(channel, None)
+
+    def _record(self, method, bytes_in, bytes_out):
+        with self._lock:
+            stat = self.stats.setdefault(
+                method, {"calls": 0, "bytes_in": 0, "bytes_out": 0})
+            stat["calls"] += 1
+            stat["bytes_in"] += bytes_in
+            stat["bytes_out"] += bytes_out
+
+    @property
+    def request_count(self):
+        """
+        Number of XML-API requests served, excluding aaa* session methods
+        """
+
+        return sum(stat["calls"] for method, stat in self.stats.items()
+                   if not method.startswith("aaa"))
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {}
+
+    def _new_cookie(self):
+        cookie = "%d/%s" % (int(time.time()), uuid.uuid4())
+        self._cookies.add(cookie)
+        return cookie
+
+    def _aaa_login(self, request, response):
+        if request.get("inName") != self.username or \
+                request.get("inPassword") != self.password:
+            raise UcsSimulatorError("551", "Authentication failed")
+        with self._lock:
+            cookie = self._new_cookie()
+        response.attrib.update({
+            "outCookie": cookie,
+            "outRefreshPeriod": "600",
+            "outPriv": "admin,read-only",
+            "outDomains": "",
+            "outChannel": "noencssl",
+            "outEvtChannel": "noencssl",
+            "outSessionId": "",
+            "outVersion": self.version,
+            "outName": self.username})
+
+    def _aaa_refresh(self, request, response):
+        with self._lock:
+            if request.get("inCookie") not in self._cookies:
+                raise UcsSimulatorError(ERR_AUTH_REQUIRED,
+                                        "Authorization required")
+            self._cookies.discard(request.get("inCookie"))
+            cookie = self._new_cookie()
+        response.attrib.update({
+            "outCookie": cookie,
+            "outRefreshPeriod": "600",
+            "outPriv": "admin,read-only",
+            "outDomains": ""})
+
+    def _aaa_logout(self, request, response):
+        # the event channels of the session end with it
+        with self._lock:
+            self._cookies.discard(request.get("inCookie"))
+            for channel, cookie in self._channels.items():
+                if cookie == request.get("inCookie"):
+                    channel.put(None)
+        response.set("outStatus", "success")
+
+    def _aaa_keep_alive(self, request, response):
+        if request.get("cookie") not in self._cookies:
+            raise UcsSimulatorError(ERR_AUTH_REQUIRED,
+                                    "Authorization required")
+
+    def _config_resolve_dn(self, request, response):
+        hierarchical = request.get("inHierarchical") == "true"
+        out_config = ET.SubElement(response, "outConfig")
+        with self._lock:
+            if request.get("dn") in self._mos:
+                out_config.append(self._to_elem(request.get("dn"),
+                                                hierarchical))
+
+    def _config_resolve_dns(self, request, response):
+        hierarchical = request.get("inHierarchical") == "true"
+        out_configs = ET.SubElement(response, "outConfigs")
+        out_unresolved = ET.SubElement(response, "outUnresolved")
+        with self._lock:
+            for dn_elem in request.iter("dn"):
+                dn = dn_elem.get("value")
+                if dn in self._mos:
+                    out_configs.append(self._to_elem(dn, hierarchical))
+                else:
+                    ET.SubElement(out_unresolved, "dn", {"value": dn})
+
+    def _resolve(self, dns, class_id, in_filter, hierarchical, out_configs):
+        class_id = class_id.lower() if class_id else None
+        for dn in dns:
+            class_id_, attrs = self._mos[dn]
+            if class_id and class_id_.lower() != class_id:
+                continue
+            if in_filter is not None and not _filter_match(in_filter, attrs):
+                continue
+            out_configs.append(self._to_elem(dn, hierarchical))
+
+    def _config_resolve_class(self, request, response):
+        hierarchical = request.get("inHierarchical") == "true"
+        out_configs = ET.SubElement(response, "outConfigs")
+        with self._lock:
+            self._resolve(list(self._mos), request.get("classId"),
+                          request.find("inFilter"), hierarchical,
+                          out_configs)
+
+    def _config_resolve_classes(self, request, response):
+        hierarchical = request.get("inHierarchical") == "true"
+        out_configs = ET.SubElement(response, "outConfigs")
+        with self._lock:
+            for class_id_elem in request.iter("classId"):
+                self._resolve(list(self._mos), class_id_elem.get("value"),
+                              None, hierarchical, out_configs)
+
+    def _config_resolve_children(self, request, response):
+        hierarchical = request.get("inHierarchical") == "true"
+        out_configs = ET.SubElement(response, "outConfigs")
+        with self._lock:
+            self._resolve(list(self._children.get(request.get("inDn"), [])),
+                          request.get("classId"), request.find("inFilter"),
+                          hierarchical, out_configs)
+
+    def _check_create(self, elem, parent_dn):
+        dn = elem.get("dn") or parent_dn + "/" + elem.get("rn")
+        if elem.get("status") == "created" and dn in self._mos:
+            raise UcsSimulatorError(ERR_OBJECT_EXISTS,
+                                    "can't create; object already exists.")
+        for child in elem:
+            self._check_create(child, dn)
+
+    def _conf(self, elem):
+        with self._lock:
+            self._check_create(elem, None)
+            touched = []
+            dn = self._apply(elem, None, touched=touched)
+            if dn in self._mos:
+                return self._to_elem(dn, hierarchical=False)
+            return elem
+
+    def _config_conf_mo(self, request, response):
+        out_config = ET.SubElement(response, "outConfig")
+        for elem in request.find("inConfig"):
+            out_config.append(self._conf(elem))
+
+    def _config_conf_mos(self, request, response):
+        out_configs = ET.SubElement(response, "outConfigs")
+        with self._lock:
+            for pair in request.find("inConfigs"):
+                for elem in pair:
+                    self._check_create(elem, None)
+            for pair in request.find("inConfigs"):
+                out_pair = ET.SubElement(out_configs, "pair",
+                                         {"key": pair.get("key")})
+                for elem in pair:
+                    out_pair.append(self._conf(elem))
+
+    def _ls_instantiate_n_named_template(self, request, response):
+        template_dn = request.get("dn")
+        target_org = request.get("inTargetOrg")
+        names = [dn.get("value") for dn in request.iter("dn")]
+        out_configs = ET.SubElement(response, "outConfigs")
+        with self._lock:
+            if template_dn not in self._mos or \
+                    self._mos[template_dn][0] != "lsServer":
+                raise UcsSimulatorError(ERR_UNSUPPORTED,
+                                        "No such template %s" % template_dn)
+            if target_org not in self._mos:
+                raise UcsSimulatorError(ERR_UNSUPPORTED,
+                                        "No such org %s" % target_org)
+            if request.get("inErrorOnExisting") == "true":
+                for name in names:
+                    if target_org + "/ls-" + name in self._mos:
+                        raise UcsSimulatorError(
+                            ERR_OBJECT_EXISTS,
+                            "can't create; object already exists.")
+            template = self._mos[template_dn][1]
+            for name in names:
+                dn = target_org + "/ls-" + name
+                attrs = dict(template)
+                attrs.update(dn=dn, name=name, type="instance",
+                             srcTemplName=template["name"],
+                             assocState="unassociated", pnDn="")
+                self._store("lsServer", dn, attrs)
+                out_configs.append(self._to_elem(dn, hierarchical=False))
+
+    def _upload(self, path, chunks):
+        """
+        Stores the name, size and md5 of an uploaded file
+        """
+
+        md5 = hashlib.md5()
+        size = 0
+        for data in chunks:
+            md5.update(data)
+            size += len(data)
+        match = re.search(r'file-([^/]+)/', path)
+        name = match.group(1) if match else path
+        with self._lock:
+            self.uploads[name] = {"size": size, "md5": md5.hexdigest()}
+        return size
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _UcsSimulatorRequestHandler(BaseHTTPRequestHandler):
+    sim = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _iter_body(self):
+        """
+        Yields the request body piece by piece, chunked or not
+        """
+
+        if self.headers.get("Transfer-Encoding", "") == "chunked":
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return
+                yield self.rfile.read(size)
+                self.rfile.readline()
+        length = int(self.headers.get("Content-Length", 0))
+        while length > 0:
+            data = self.rfile.read(min(1024 * 1024, length))
+            if not data:
+                return
+            length -= len(data)
+            yield data
+
+    def _read_body(self):
+        return b"".join(self._iter_body())
+
+    def _reply(self, body, content_type="text/xml"):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        sim = self.sim
+        if sim.latency:
+            time.sleep(sim.latency)
+        if not sim.available:
+            self.send_error(503, "Service Unavailable")
+            return
+
+        if self.path.startswith("/operations/"):
+            size = sim._upload(self.path, self._iter_body())
+            sim._record("fileUpload", size, 2)
+            self._reply(b"OK", content_type="text/plain")
+            return
+
+        body = self._read_body()
+        try:
+            method = ET.fromstring(body).tag
+        except ET.ParseError:
+            self.send_error(400, "Malformed request")
+            return
+        if method == "eventSubscribe":
+            self._stream_events(body)
+            return
+        response = sim.process(body)
+        sim._record(method, len(body), len(response))
+        self._reply(response)
+
+    def _stream_events(self, body):
+        """
+        Streams the events as UCSM does, each one as its length on a line
+        followed by the xml, until the channel or the connection is closed
+        """
+
+        sim = self.sim
+        channel, response = sim._open_event_channel(body)
+        sim._record("eventSubscribe", len(body), len(response or b""))
+        if channel is None:
+            self._reply(response)
+            return
+
+        self.close_connection = True
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/xml")
+            self.end_headers()
+            self.wfile.flush()
+            while True:
+                event = channel.get()
+                if event is None:
+                    break
+                self.wfile.write(b"%d\n" % len(event) + event)
+                self.wfile.flush()
+        except socket.error:
+            pass
+        finally:
+            sim._close_event_channel(channel)
+
+
+def populate_domain(sim, chassis_count=20, blades_per_chassis=8,
+                    version="3.1(2b)", associate=True, org_dn="org-root"):
+    """
+    Seeds a simulator with a typical UCS domain: two Fabric Interconnects,
+    UCSM running firmware, chassis, blades with their running firmware and,
+    optionally, one associated service profile per blade.
+
+    Args:
+        sim (UcsSimulator)
+        chassis_count (int): number of chassis
+        blades_per_chassis (int): number of blades per chassis
+        version (string): running firmware version
+        associate (bool): create one associated LsServer per blade
+        org_dn (string): org of the service profiles
+
+    Returns:
+        list of blade dns
+
+    Example:
+        populate_domain(sim, chassis_count=20, blades_per_chassis=8)
+    """
+
+    hfp_dn = org_dn + "/fw-host-pack-default"
+    sim.add("FirmwareComputeHostPack", hfp_dn, name="default",
+            blade_bundle_version="", rack_bundle_version="")
+    sim.add("FirmwareInfraPack", "org-root/fw-infra-pack-default",
+            name="default", infra_bundle_version=version + "A")
+    sim.add("FirmwareAck", "sys/fw-system/ack", oper_state="idle",
+            admin_state="untriggered", scheduler="")
+
+    sim.add("MgmtController", "sys/mgmt", subject="system")
+    sim.add("FirmwareRunning", "sys/mgmt/fw-system", deployment="system",
+            type="system", version=version)
+    for fi_id in ("A", "B"):
+        switch_dn = "sys/switch-" + fi_id
+        sim.add("NetworkElement", switch_dn, id=fi_id, model="UCS-FI-6248UP",
+                serial="SSI%s0001" % fi_id, oob_if_ip="127.0.0.1")
+        sim.add("MgmtController", switch_dn + "/mgmt", subject="switch")
+        sim.add("FirmwareRunning", switch_dn + "/mgmt/fw-kernel",
+                deployment="kernel", type="switch-kernel", version=version)
+        sim.add("FirmwareRunning", switch_dn + "/mgmt/fw-system",
+                deployment="system", type="switch-software", version=version)
+
+    blade_dns = []
+    for chassis_id in range(1, chassis_count + 1):
+        chassis_dn = "sys/chassis-%d" % chassis_id
+        sim.add("EquipmentChassis", chassis_dn, id=chassis_id,
+                model="N20-C6508", serial="FOX%04d" % chassis_id)
+        for slot_id in range(1, blades_per_chassis + 1):
+            blade_dn = "%s/blade-%d" % (chassis_dn, slot_id)
+            sp_dn = ""
+            if associate:
+                sp_dn = "%s/ls-sp-%d-%d" % (org_dn, chassis_id, slot_id)
+                sim.add("LsServer", sp_dn, name=os.path.basename(sp_dn)[3:],
+                        type="instance", assoc_state="associated",
+                        config_state="applied", pn_dn=blade_dn,
+                        oper_host_fw_policy_name=hfp_dn, oper_state="ok")
+                sim.add("LsBinding", sp_dn + "/pn", pn_dn=blade_dn)
+                sim.add("LsPower", sp_dn + "/power", state="up")
+                sim.add("LsmaintAck", sp_dn + "/ack", oper_state="idle",
+                        admin_state="untriggered")
+            sim.add("ComputeBlade", blade_dn, chassis_id=chassis_id,
+                    slot_id=slot_id, model="UCSB-B200-M4",
+                    serial="FCH%02d%02d" % (chassis_id, slot_id),
+                    association="associated" if associate else "none",
+                    assigned_to_dn=sp_dn, oper_power="on",
+                    fsm_status="nop")
+            sim.add("MgmtController", blade_dn + "/mgmt", subject="blade")
+            sim.add("FirmwareRunning", blade_dn + "/mgmt/fw-system",
+                    deployment="system", type="blade-controller",
+                    version=version)
+            blade_dns.append(blade_dn)
+    return blade_dns
+
+
+BUNDLE_IMAGE_TYPES = {
+    "A": ("infrastructure-bundle", "infra",
+          ["system", "switch-kernel", "switch-software"]),
+    "B": ("b-series-bundle", "b-series",
+          ["blade-controller", "blade-bios", "adaptor"]),
+    "C": ("c-series-bundle", "c-series",
+          ["blade-controller", "blade-bios", "adaptor"]),
+}
+
+
+def populate_bundle(sim, version, bundle="A"):
+    """
+    Seeds the firmware catalogue of a simulator with a downloaded bundle:
+    its FirmwareDistributable, one FirmwareDistImage per image type and
+    the matching FirmwareImage objects, all running at version.
+
+    Args:
+        sim (UcsSimulator)
+        version (string): bundle version without suffix, e.g. "3.1(2b)"
+        bundle (string): "A", "B" or "C"
+
+    Returns:
+        dn of the FirmwareDistributable
+
+    Example:
+        populate_bundle(sim, "3.1(3a)", bundle="B")
+    """
+
+    bundle_type, name, image_types = BUNDLE_IMAGE_TYPES[bundle]
+    version_str = version.replace("(", ".").replace(")", "")
+    file_name = "ucs-k9-bundle-%s.%s.%s.bin" % (name, version_str, bundle)
+    distrib_dn = "sys/fw-catalogue/distrib-" + file_name
+    sim.add("FirmwareDistributable", distrib_dn, name=file_name,
+            type=bundle_type, version=version + bundle)
+    for image_type in image_types:
+        image_name = "ucs-%s.%s.%s.bin" % (image_type, version_str, bundle)
+        sim.add("FirmwareDistImage", distrib_dn + "/distimage-" + image_name,
+                name=image_name, type=image_type, image_deleted="")
+        sim.add("FirmwareImage", "sys/fw-catalogue/image-" + image_name,
+                name=image_name, type=image_type, version=version)
+    return distrib_dn
@@ -0,0 +1,225 @@
+# Copyright 2017 Cisco Systems, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module contains the telemetry of the sample helpers: timestamped
+events emitted by the upgrade flow, exported as json lines and summarized
+in histograms.
+"""
+
+import bisect
+import json
+import logging
+import threading
+import time
+
+from ucsmsdk_samples.utils import poller
+
+log = logging.getLogger('ucs')
+
+_listeners = []
+
+# upper bounds of the histogram buckets, in seconds
+DEFAULT_BOUNDS = [0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600, 1200, 1800,
+                  3600, 7200]
+
+# event fields summarized in histograms, as "<event>.<field>", and the
+# upper bounds of their buckets
+MEASURED_FIELDS = {
+    "seconds": DEFAULT_BOUNDS,
+    "bytes_per_second": [1e5, 1e6, 5e6, 1e7, 5e7, 1e8, 5e8, 1e9]}
+
+
+def add_listener(call_back):
+    """
+    Registers call_back(event) to run for every emitted event
+    """
+
+    if call_back not in _listeners:
+        _listeners.append(call_back)
+
+
+def remove_listener(call_back):
+    if call_back in _listeners:
+        _listeners.remove(call_back)
+
+
+def emit(name, **fields):
+    """
+    Emits an event to the listeners, does nothing without listeners
+
+    Args:
+        name (string): event name, e.g. "upload.end"
+        fields: event fields, json serializable
+
+    Example:
+        emit("upload.end", image=image_name, seconds=12.5)
+    """
+
+    if not _listeners:
+        return
+    event = {"event": name, "time": time.time()}
+    event.update(fields)
+    for call_back in list(_listeners):
+        try:
+            call_back(dict(event))
+        except Exception:
+            log.exception("Telemetry listener failed on '%s'", name)
+
+
+class Histogram(object):
+    """
+    Counts observations in buckets of fixed upper bounds
+
+    Args:
+        bounds (list): sorted bucket upper bounds, the last bucket counts
+            what is above the last bound
+    """
+
+    def __init__(self, bounds=None):
+        self.bounds = list(bounds or DEFAULT_BOUNDS)
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, percent):
+        """
+        Returns the upper bound of the bucket holding the percentile, the
+        max for the last bucket, None without observations
+        """
+
+        if not self.count:
+            return None
+        rank = self.count * percent / 100.0
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if bucket and seen >= rank:
+                if index < len(self.bounds):
+                    return min(self.bounds[index], self.max)
+                return self.max
+        return self.max
+
+    def to_dict(self):
+        return {"count": self.count, "sum": self.sum, "min": self.min,
+                "max": self.max,
+                "mean": self.sum / self.count if self.count else None,
+                "p50": self.percentile(50), "p90": self.percentile(90),
+                "p99": self.percentile(99),
+                "buckets": dict(zip([str(bound) for bound in self.bounds] +
+                                    ["inf"], self.buckets))}
+
+
+class UpgradeTelemetry(object):
+    """
+    Records the events of the upgrade flow and the metrics of every Poller
+    wait, appends them as json lines to path when given and summarizes
+    their durations and throughputs in histograms.
+
+    Args:
+        path (string): json lines file, appended to
+
+    Example:
+        with UpgradeTelemetry("/var/log/ucs-upgrade.jsonl") as telemetry:
+            firmware_auto_install(handle, version="3.1(2b)",
+                                  image_dir="/home/imagedir")
+        print(telemetry.format_summary())
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.events = []
+        self.histograms = {}
+        self._lock = threading.Lock()
+        self._file = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def start(self):
+        if self.path and self._file is None:
+            self._file = open(self.path, "a")
+        add_listener(self.record)
+        poller.add_listener(self._on_wait)
+        return self
+
+    def stop(self):
+        remove_listener(self.record)
+        poller.remove_listener(self._on_wait)
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _on_wait(self, metrics):
+        self.record({"event": "wait", "time": time.time(),
+                     "name": metrics["name"], "outcome": metrics["outcome"],
+                     "polls": metrics["polls"],
+                     "seconds": metrics["elapsed"]})
+
+    def _observe(self, name, value, bounds):
+        # caller holds self._lock
+        if name not in self.histograms:
+            self.histograms[name] = Histogram(bounds)
+        self.histograms[name].observe(value)
+
+    def record(self, event):
+        """
+        Records one event, called for every emitted event while started
+        """
+
+        with self._lock:
+            self.events.append(event)
+            for field, bounds in MEASURED_FIELDS.items():
+                if isinstance(event.get(field), (int, float)):
+                    self._observe("%s.%s" % (event["event"], field),
+                                  event[field], bounds)
+            if self._file is not None:
+                self._file.write(json.dumps(event, sort_keys=True) + "\n")
+                self._file.flush()
+
+    def summary(self):
+        """
+        Returns {"<event>.<field>": histogram dict}
+        """
+
+        with self._lock:
+            return dict((name, histogram.to_dict()) for name, histogram in
+                        self.histograms.items())
+
+    def format_summary(self):
+        """
+        Returns the summary as a text table, largest total first
+        """
+
+        summary = self.summary()
+        lines = ["%-40s %6s %10s %10s %10s %10s" % (
+            "metric", "count", "sum", "p50", "p90", "max")]
+        for name in sorted(summary, key=lambda n: -summary[n]["sum"]):
+            metric = summary[name]
+            lines.append("%-40s %6d %10.1f %10.1f %10.1f %10.1f" % (
+                name, metric["count"], metric["sum"], metric["p50"],
+                metric["p90"], metric["max"]))
+        return "\n".join(lines)